@@ -44,6 +44,15 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 target_metadata = Base.metadata
 
+# Indexes that only exist in migrations (they need extensions that
+# metadata.create_all cannot assume), hidden from autogenerate
+MIGRATION_ONLY_INDEXES = {"ix_gateway_upstreams_name_trgm"}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Keep autogenerate from dropping migration-only indexes."""
+    return not (type_ == "index" and name in MIGRATION_ONLY_INDEXES)
+
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
@@ -74,6 +83,7 @@ def do_run_migrations(connection: Connection) -> None:
         connection=connection,
         target_metadata=target_metadata,
         compare_type=True,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -0,0 +1,52 @@
+"""Add hash_version to gateway_api_keys
+
+Revision ID: 20260119_0001
+Revises: b085bc0937cf
+Create Date: 2026-01-19 00:01:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "20260119_0001"
+down_revision: Union[str, None] = "b085bc0937cf"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add hash_version column; existing keys keep their bcrypt hashes (version 1)."""
+
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = [col['name'] for col in inspector.get_columns('gateway_api_keys')]
+
+    if 'hash_version' not in columns:
+        op.add_column(
+            "gateway_api_keys",
+            sa.Column(
+                "hash_version",
+                sa.Integer(),
+                nullable=False,
+                server_default="1",
+                comment="Key hash scheme: 1=bcrypt, 2=HMAC-SHA256",
+            ),
+        )
+
+
+def downgrade() -> None:
+    """Remove hash_version column from gateway_api_keys.
+
+    Keys already upgraded to HMAC-SHA256 will no longer verify and must be
+    rotated after downgrading.
+    """
+
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = [col['name'] for col in inspector.get_columns('gateway_api_keys')]
+
+    if "hash_version" in columns:
+        op.drop_column("gateway_api_keys", "hash_version")
@@ -0,0 +1,65 @@
+"""Make gateway_api_keys.key_prefix a unique index
+
+Revision ID: 20260119_0002
+Revises: 20260119_0001
+Create Date: 2026-01-19 00:02:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "20260119_0002"
+down_revision: Union[str, None] = "20260119_0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Replace the plain key_prefix index with a unique one, without locking writes."""
+
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    indexes = [idx['name'] for idx in inspector.get_indexes('gateway_api_keys')]
+
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        if "ix_gateway_api_keys_prefix" not in indexes:
+            op.create_index(
+                "ix_gateway_api_keys_prefix",
+                "gateway_api_keys",
+                ["key_prefix"],
+                unique=True,
+                postgresql_concurrently=True,
+            )
+        if "ix_gateway_api_keys_key_prefix" in indexes:
+            op.drop_index(
+                "ix_gateway_api_keys_key_prefix",
+                table_name="gateway_api_keys",
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Restore the plain key_prefix index."""
+
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    indexes = [idx['name'] for idx in inspector.get_indexes('gateway_api_keys')]
+
+    with op.get_context().autocommit_block():
+        if "ix_gateway_api_keys_key_prefix" not in indexes:
+            op.create_index(
+                "ix_gateway_api_keys_key_prefix",
+                "gateway_api_keys",
+                ["key_prefix"],
+                postgresql_concurrently=True,
+            )
+        if "ix_gateway_api_keys_prefix" in indexes:
+            op.drop_index(
+                "ix_gateway_api_keys_prefix",
+                table_name="gateway_api_keys",
+                postgresql_concurrently=True,
+            )
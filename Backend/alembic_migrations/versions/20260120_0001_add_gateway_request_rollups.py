@@ -0,0 +1,122 @@
+"""Add gateway_request_rollups hourly aggregate table
+
+Revision ID: 20260120_0001
+Revises: 20260119_0002
+Create Date: 2026-01-20 00:01:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "20260120_0001"
+down_revision: Union[str, None] = "20260119_0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Must match app.gateway.services.request_rollup
+LATENCY_BUCKETS = 160
+LATENCY_BUCKETS_PER_DOUBLING = 8
+
+
+def upgrade() -> None:
+    """Create the rollup table and its histogram helpers, then backfill from gateway_requests."""
+
+    # Element-wise sum of two integer arrays (shorter side padded with 0)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION gateway_int_array_add(a integer[], b integer[])
+        RETURNS integer[]
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE
+        AS $$
+            SELECT coalesce(array_agg(coalesce(x, 0) + coalesce(y, 0) ORDER BY i), '{}')
+            FROM unnest(a, b) WITH ORDINALITY AS t(x, y, i)
+        $$;
+    """)
+
+    op.execute("""
+        DO $$ BEGIN
+            CREATE AGGREGATE gateway_int_array_sum(integer[]) (
+                SFUNC = gateway_int_array_add,
+                STYPE = integer[],
+                INITCOND = '{}'
+            );
+        EXCEPTION
+            WHEN duplicate_function THEN null;
+        END $$;
+    """)
+
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "gateway_request_rollups" in inspector.get_table_names():
+        return
+
+    op.create_table(
+        "gateway_request_rollups",
+        sa.Column("tenant_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("virtual_model", sa.String(500), nullable=False, server_default=""),
+        sa.Column("upstream_id", postgresql.UUID(as_uuid=True), nullable=False,
+                  server_default=sa.text("'00000000-0000-0000-0000-000000000000'::uuid")),
+        sa.Column("request_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("error_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("latency_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("latency_sum_ms", sa.Numeric(precision=20, scale=0), nullable=False, server_default="0"),
+        sa.Column("latency_histogram", postgresql.ARRAY(sa.Integer()), nullable=False, server_default="{}"),
+        sa.Column("total_tokens", sa.Numeric(precision=20, scale=0), nullable=False, server_default="0"),
+        sa.Column("cost_usd", sa.Numeric(precision=16, scale=8), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("tenant_id", "bucket_start", "virtual_model", "upstream_id"),
+    )
+    op.create_index(
+        "ix_gateway_request_rollups_tenant_bucket",
+        "gateway_request_rollups",
+        ["tenant_id", "bucket_start"],
+    )
+
+    # Backfill from the existing request log. Each latency becomes a one-hot
+    # histogram that gateway_int_array_sum folds into the group's histogram.
+    last = LATENCY_BUCKETS - 1
+    op.execute(f"""
+        INSERT INTO gateway_request_rollups (
+            tenant_id, bucket_start, virtual_model, upstream_id,
+            request_count, error_count, latency_count, latency_sum_ms,
+            latency_histogram, total_tokens, cost_usd
+        )
+        SELECT
+            r.tenant_id,
+            date_trunc('hour', r.created_at),
+            coalesce(r.virtual_model, ''),
+            coalesce(r.upstream_id, '00000000-0000-0000-0000-000000000000'::uuid),
+            count(*),
+            count(*) FILTER (WHERE r.error_type IS NOT NULL OR r.status_code >= 400),
+            count(r.latency_ms),
+            coalesce(sum(r.latency_ms), 0),
+            coalesce(
+                gateway_int_array_sum(
+                    array_fill(0, ARRAY[b.idx]) || 1 || array_fill(0, ARRAY[{last} - b.idx])
+                ) FILTER (WHERE r.latency_ms IS NOT NULL),
+                '{{}}'
+            ),
+            coalesce(sum(r.total_tokens), 0),
+            coalesce(sum(r.cost_usd), 0)
+        FROM gateway_requests r
+        CROSS JOIN LATERAL (
+            SELECT least(
+                {last},
+                floor({LATENCY_BUCKETS_PER_DOUBLING} * ln(greatest(r.latency_ms, 0) + 1) / ln(2))
+            )::int AS idx
+        ) b
+        GROUP BY 1, 2, 3, 4
+    """)
+
+
+def downgrade() -> None:
+    """Drop the rollup table and its histogram helpers."""
+
+    op.drop_index("ix_gateway_request_rollups_tenant_bucket", table_name="gateway_request_rollups")
+    op.drop_table("gateway_request_rollups")
+    op.execute("DROP AGGREGATE IF EXISTS gateway_int_array_sum(integer[])")
+    op.execute("DROP FUNCTION IF EXISTS gateway_int_array_add(integer[], integer[])")
@@ -0,0 +1,77 @@
+"""Make the gateway_requests (tenant_id, created_at) index covering
+
+Revision ID: 20260120_0002
+Revises: 20260120_0001
+Create Date: 2026-01-20 00:02:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "20260120_0002"
+down_revision: Union[str, None] = "20260120_0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Columns aggregated over a tenant's time range (overview stats, rollup backfill)
+COVERED_COLUMNS = [
+    "latency_ms",
+    "total_tokens",
+    "cost_usd",
+    "virtual_model",
+    "upstream_id",
+    "error_type",
+    "status_code",
+]
+
+
+def upgrade() -> None:
+    """Replace the plain tenant/time index with a covering one, without locking writes."""
+
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    indexes = [idx['name'] for idx in inspector.get_indexes('gateway_requests')]
+
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        if "ix_gateway_requests_tenant_created_cover" not in indexes:
+            op.create_index(
+                "ix_gateway_requests_tenant_created_cover",
+                "gateway_requests",
+                ["tenant_id", "created_at"],
+                postgresql_include=COVERED_COLUMNS,
+                postgresql_concurrently=True,
+            )
+        if "ix_gateway_requests_tenant_created" in indexes:
+            op.drop_index(
+                "ix_gateway_requests_tenant_created",
+                table_name="gateway_requests",
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Restore the plain tenant/time index."""
+
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    indexes = [idx['name'] for idx in inspector.get_indexes('gateway_requests')]
+
+    with op.get_context().autocommit_block():
+        if "ix_gateway_requests_tenant_created" not in indexes:
+            op.create_index(
+                "ix_gateway_requests_tenant_created",
+                "gateway_requests",
+                ["tenant_id", "created_at"],
+                postgresql_concurrently=True,
+            )
+        if "ix_gateway_requests_tenant_created_cover" in indexes:
+            op.drop_index(
+                "ix_gateway_requests_tenant_created_cover",
+                table_name="gateway_requests",
+                postgresql_concurrently=True,
+            )
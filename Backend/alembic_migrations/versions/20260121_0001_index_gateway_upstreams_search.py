@@ -0,0 +1,63 @@
+"""Index gateway_upstreams for name search and newest-first listing
+
+Revision ID: 20260121_0001
+Revises: 20260120_0002
+Create Date: 2026-01-21 00:01:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "20260121_0001"
+down_revision: Union[str, None] = "20260120_0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add a trigram index for ILIKE name search and a tenant/time index, without locking writes."""
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    indexes = [idx['name'] for idx in inspector.get_indexes('gateway_upstreams')]
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        if "ix_gateway_upstreams_name_trgm" not in indexes:
+            op.create_index(
+                "ix_gateway_upstreams_name_trgm",
+                "gateway_upstreams",
+                ["name"],
+                postgresql_using="gin",
+                postgresql_ops={"name": "gin_trgm_ops"},
+                postgresql_concurrently=True,
+            )
+        if "ix_gateway_upstreams_tenant_created" not in indexes:
+            op.create_index(
+                "ix_gateway_upstreams_tenant_created",
+                "gateway_upstreams",
+                ["tenant_id", "created_at"],
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Drop the search and listing indexes (pg_trgm is left installed)."""
+
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    indexes = [idx['name'] for idx in inspector.get_indexes('gateway_upstreams')]
+
+    with op.get_context().autocommit_block():
+        for name in ("ix_gateway_upstreams_tenant_created", "ix_gateway_upstreams_name_trgm"):
+            if name in indexes:
+                op.drop_index(
+                    name,
+                    table_name="gateway_upstreams",
+                    postgresql_concurrently=True,
+                )
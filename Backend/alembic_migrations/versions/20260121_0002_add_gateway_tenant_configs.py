@@ -0,0 +1,41 @@
+"""Add gateway_tenant_configs with the per-tenant routing version
+
+Revision ID: 20260121_0002
+Revises: 20260121_0001
+Create Date: 2026-01-21 00:02:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "20260121_0002"
+down_revision: Union[str, None] = "20260121_0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the tenant config table (tenants without a row are at version 0)."""
+
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "gateway_tenant_configs" in inspector.get_table_names():
+        return
+
+    op.create_table(
+        "gateway_tenant_configs",
+        sa.Column("tenant_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("routing_version", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False,
+                  server_default=sa.text("now()")),
+    )
+
+
+def downgrade() -> None:
+    """Drop the tenant config table."""
+
+    op.drop_table("gateway_tenant_configs")
@@ -85,6 +85,8 @@ class DatabaseSettings(BaseSettings):
     password: str = ""
     pool_size: int = 20
     max_overflow: int = 10
+    # Prepared statements cached per pooled connection (asyncpg)
+    statement_cache_size: int = 500
     connect_timeout: int = 30
     auto_migrate: bool = True
 
@@ -117,7 +119,12 @@ class RedisSettings(BaseSettings):
     port: int = 6379
     password: str = ""
     db: int = 0
+    # Upper bound on open connections; roughly 2 x workers x average
+    # in-flight requests per worker is a good starting point.
     pool_size: int = 50
+    # Seconds to wait for a free connection when the pool is exhausted
+    pool_timeout: float = 5.0
+    health_check_interval: int = 30
     session_prefix: str = "session:"
     ratelimit_prefix: str = "ratelimit:"
     verify_prefix: str = "verify:"
@@ -143,6 +150,9 @@ class SecuritySettings(BaseSettings):
 
     secret_key: str = Field(default="", min_length=32)
     password_hash_rounds: int = Field(default=12, ge=4, le=31)
+    # HMAC pepper for gateway API key hashes (falls back to secret_key).
+    # Changing it invalidates every HMAC-hashed gateway API key.
+    api_key_pepper: str = ""
 
     @field_validator("secret_key")
     @classmethod
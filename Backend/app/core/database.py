@@ -24,6 +24,7 @@ engine = create_async_engine(
     echo=False,  # Disable SQL logging for cleaner output (set to True to debug SQL)
     pool_size=settings.database.pool_size,
     max_overflow=settings.database.max_overflow,
+    connect_args={"prepared_statement_cache_size": settings.database.statement_cache_size},
 )
 
 # Create async session factory
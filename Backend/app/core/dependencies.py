@@ -6,7 +6,7 @@ from typing import Annotated, Optional
 
 from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import HTTPBearer
-from redis.asyncio import Redis
+from redis.asyncio import BlockingConnectionPool, Redis
 
 from app.core.config import settings
 from app.core.database import AsyncSession, get_db
@@ -28,12 +28,15 @@ async def get_redis_pool() -> Redis:
     Get or create global Redis connection pool.
 
     This ensures we reuse the same connection pool across all requests
-    instead of creating a new connection for each request.
+    instead of creating a new connection for each request. The pool is a
+    BlockingConnectionPool: when all connections are busy, callers wait up
+    to pool_timeout for one to be released instead of failing, and
+    keepalive plus periodic health checks avoid reconnect churn.
     """
     global _redis_pool
 
     if _redis_pool is None:
-        _redis_pool = Redis(
+        pool = BlockingConnectionPool(
             host=settings.redis.host,
             port=settings.redis.port,
             password=settings.redis.password if settings.redis.password else None,
@@ -41,7 +44,11 @@ async def get_redis_pool() -> Redis:
             encoding="utf-8",
             decode_responses=True,
             max_connections=settings.redis.pool_size,
+            timeout=settings.redis.pool_timeout,
+            socket_keepalive=True,
+            health_check_interval=settings.redis.health_check_interval,
         )
+        _redis_pool = Redis(connection_pool=pool)
         # Test connection
         try:
             await _redis_pool.ping()
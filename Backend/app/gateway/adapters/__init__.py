@@ -24,6 +24,7 @@ from typing import Dict, Type
 from app.gateway.adapters.base import (
     AdapterBase,
     AdapterError,
+    LazyJSONBody,
     RouteContext,
     UpstreamRequest,
     UpstreamResponse,
@@ -97,6 +98,7 @@ __all__ = [
     # Base classes
     "AdapterBase",
     "AdapterError",
+    "LazyJSONBody",
     "RouteContext",
     "UpstreamRequest",
     "UpstreamResponse",
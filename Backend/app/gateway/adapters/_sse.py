@@ -0,0 +1,57 @@
+"""
+SSE line scanning shared by the streaming adapters.
+
+Upstream servers deliver Server-Sent Events as arbitrary byte chunks that
+do not line up with event boundaries. This module reassembles those chunks
+into complete lines so adapters only deal with the "data: " payloads.
+"""
+
+from typing import AsyncIterator
+
+
+async def iter_sse_lines(upstream_stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Split an upstream byte stream into decoded, stripped lines.
+
+    A single bytearray buffer is reused for the whole stream. Only the
+    newly received chunk is searched for a line break, and all complete
+    lines are cut from the buffer with one slice, one split() and one
+    deletion per chunk, so the per-line work happens in C and the total
+    cost stays linear in the number of bytes received.
+
+    Empty lines and lines that are not valid UTF-8 are skipped. A trailing
+    partial line without a newline terminator is discarded.
+
+    Args:
+        upstream_stream: Raw bytes stream from upstream
+
+    Yields:
+        Non-empty lines without surrounding whitespace
+    """
+    buffer = bytearray()
+
+    async for chunk in upstream_stream:
+        last_newline = chunk.rfind(b"\n")
+        if last_newline < 0:
+            # No complete line yet, keep accumulating
+            buffer += chunk
+            continue
+
+        end = len(buffer) + last_newline
+        buffer += chunk
+
+        # Process complete lines
+        lines = bytes(buffer[:end]).split(b"\n")
+        del buffer[:end + 1]
+
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                line_str = line.decode("utf-8")
+            except UnicodeDecodeError:
+                continue
+
+            yield line_str
@@ -7,11 +7,15 @@ requests/responses and the upstream provider's native format.
 """
 
 from abc import ABC, abstractmethod
+from collections.abc import Mapping
 from dataclasses import dataclass, field
-from typing import Any, AsyncIterator, Dict, Optional, Set
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Set, Tuple
 from uuid import UUID
 
 import httpx
+import orjson
 
 
 @dataclass
@@ -74,6 +78,111 @@ class UpstreamResponse:
     finish_reason: Optional[str] = None
 
 
+class LazyJSONBody(Mapping):
+    """
+    Upstream JSON body that is only decoded when a field is read.
+
+    Returned by passthrough adapters so the router can forward the raw
+    upstream bytes to the client without a decode/encode round trip,
+    while still allowing fields such as "usage" to be inspected. A body
+    that fails to decode raises the same 502 parse_error AdapterError as
+    an eagerly parsed response.
+    """
+
+    __slots__ = ("raw", "_parsed")
+
+    def __init__(self, raw: bytes):
+        self.raw = raw
+        self._parsed: Optional[Dict[str, Any]] = None
+
+    def _data(self) -> Dict[str, Any]:
+        if self._parsed is None:
+            try:
+                self._parsed = orjson.loads(self.raw)
+            except orjson.JSONDecodeError as e:
+                raise AdapterError(
+                    message=f"Failed to parse upstream response: {e}",
+                    error_type="parse_error",
+                    status_code=502
+                )
+        return self._parsed
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data())
+
+    def __len__(self) -> int:
+        return len(self._data())
+
+
+@lru_cache(maxsize=256)
+def build_auth_headers(
+    auth_type: str,
+    credentials: Optional[str]
+) -> Tuple[Tuple[str, str], ...]:
+    """
+    Derive upstream authentication headers.
+
+    Credentials are constant per upstream, so the result is memoized and
+    returned as a tuple of (name, value) pairs that can be passed straight
+    to dict.update().
+
+    Args:
+        auth_type: Upstream auth type ("bearer", "header", ...)
+        credentials: Decrypted credential, "Name: value" for header auth
+
+    Returns:
+        Header pairs to add to the upstream request
+    """
+    if not credentials:
+        return ()
+
+    if auth_type == "bearer":
+        return (("Authorization", f"Bearer {credentials}"),)
+
+    if auth_type == "header":
+        # Custom header format: "X-API-Key: value"
+        try:
+            header_name, header_value = credentials.split(":", 1)
+        except ValueError:
+            return ()
+        return ((header_name.strip(), header_value.strip()),)
+
+    return ()
+
+
+@lru_cache(maxsize=256)
+def _static_headers(
+    base_headers: Tuple[Tuple[str, str], ...],
+    auth_type: str,
+    credentials: Optional[str]
+) -> Mapping[str, str]:
+    """Merge an adapter's base headers with upstream auth headers (read-only)."""
+    headers = dict(base_headers)
+    headers.update(build_auth_headers(auth_type, credentials))
+    return MappingProxyType(headers)
+
+
+def load_response_json(upstream_response: httpx.Response) -> Any:
+    """
+    Decode an upstream JSON body once per response.
+
+    The decoded value is stashed on the response object, so later callers
+    (error handling, usage accounting) reuse it instead of parsing the
+    body again. Decoding errors propagate to the caller.
+    """
+    try:
+        return upstream_response._parsed_json
+    except AttributeError:
+        pass
+
+    parsed = orjson.loads(upstream_response.content)
+    upstream_response._parsed_json = parsed
+    return parsed
+
+
 class AdapterBase(ABC):
     """
     Base class for upstream adapters.
@@ -95,6 +204,12 @@ class AdapterBase(ABC):
     # Adapter type identifier
     ADAPTER_TYPE: str = "base"
 
+    # Default headers for JSON upstream requests
+    BASE_HEADERS: Tuple[Tuple[str, str], ...] = (
+        ("Content-Type", "application/json"),
+        ("Accept", "application/json"),
+    )
+
     def supports(self, capability: str) -> bool:
         """
         Check if this adapter supports the given capability.
@@ -107,6 +222,33 @@ class AdapterBase(ABC):
         """
         return capability in self.SUPPORTED_CAPABILITIES
 
+    def build_upstream_headers(
+        self,
+        route_ctx: RouteContext,
+        include_request_id: bool = True
+    ) -> Dict[str, str]:
+        """
+        Build the standard JSON upstream headers for a request.
+
+        Order of precedence (later wins): BASE_HEADERS, upstream auth,
+        route inject_headers, X-Request-ID. The static part is memoized per
+        (auth_type, credentials), so each request builds its headers with
+        a single dict display.
+        """
+        static = _static_headers(
+            self.BASE_HEADERS,
+            route_ctx.upstream_auth_type,
+            route_ctx.upstream_credentials
+        )
+        if not include_request_id:
+            return {**static, **route_ctx.inject_headers}
+
+        return {
+            **static,
+            **route_ctx.inject_headers,
+            "X-Request-ID": route_ctx.request_id,
+        }
+
     @abstractmethod
     async def build_upstream_request(
         self,
@@ -7,7 +7,6 @@ It translates between OpenAI-style rerank requests and Cohere's native format.
 Cohere Rerank API: https://docs.cohere.com/reference/rerank
 """
 
-import json
 from typing import Any, AsyncIterator, Dict, Set
 
 import httpx
@@ -17,6 +16,7 @@ from app.gateway.adapters.base import (
     AdapterError,
     RouteContext,
     UpstreamRequest,
+    load_response_json,
 )
 
 
@@ -181,7 +181,7 @@ class CohereRerankAdapter(AdapterBase):
 
         if upstream_response.status_code >= 400:
             try:
-                error_body = upstream_response.json()
+                error_body = load_response_json(upstream_response)
             except Exception:
                 error_body = {"message": upstream_response.text}
 
@@ -193,7 +193,7 @@ class CohereRerankAdapter(AdapterBase):
             )
 
         try:
-            response_body = upstream_response.json()
+            response_body = load_response_json(upstream_response)
         except Exception as e:
             raise AdapterError(
                 message=f"Failed to parse Cohere response: {e}",
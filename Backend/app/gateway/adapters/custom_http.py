@@ -7,22 +7,433 @@ arbitrary HTTP APIs that don't fit the standard adapter patterns.
 
 Security Note: This adapter uses a restricted template system to prevent
 code injection. Only predefined variables and operations are allowed.
+Paths are compiled to Python only when every step is an identifier or an
+integer index, and the generated code is validated against an AST
+allow-list before it is compiled.
 """
 
+import ast
 import json
 import re
-from typing import Any, AsyncIterator, Dict, Set
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
 
 import httpx
+import orjson
 
+from app.gateway.adapters._sse import iter_sse_lines
 from app.gateway.adapters.base import (
     AdapterBase,
     AdapterError,
     RouteContext,
     UpstreamRequest,
+    build_auth_headers,
+    load_response_json,
 )
 
 
+# Template variable pattern: {{variable}} or {{variable|filter:arg}}
+_TEMPLATE_PATTERN = re.compile(r"\{\{([^}]+)\}\}")
+
+# Body plan opcodes
+_OP_DICT = 0
+_OP_LIST = 1
+_OP_LITERAL = 2
+_OP_RENDER = 3
+_OP_VALUE = 4
+_OP_JSON = 5
+
+# Compiled body plans keyed by template identity (see _get_body_plan)
+BODY_PLAN_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=1024)
+def _compile_path(path: str) -> Tuple[Any, ...]:
+    """
+    Tokenize a path like "messages[-1].content" into steps.
+
+    Dict keys become strings and array indexes become ints. A malformed
+    index becomes None, which never resolves.
+    """
+    steps: List[Any] = []
+    for part in re.split(r"\.|\[", path):
+        if not part:
+            continue
+
+        if part.endswith("]"):
+            try:
+                steps.append(int(part[:-1]))
+            except ValueError:
+                steps.append(None)
+        else:
+            steps.append(part)
+
+    return tuple(steps)
+
+
+def _resolve_steps(steps: Tuple[Any, ...], context: Any) -> Any:
+    """Walk pre-tokenized path steps through nested dicts/lists."""
+    value = context
+
+    for step in steps:
+        if isinstance(step, str):
+            # Handle dict key
+            if isinstance(value, dict) and step in value:
+                value = value[step]
+            else:
+                return None
+        elif step is None:
+            return None
+        else:
+            # Handle array index
+            if isinstance(value, (list, tuple)) and -len(value) <= step < len(value):
+                value = value[step]
+            else:
+                return None
+
+    return value
+
+
+# Path steps that may be inlined into generated resolver code
+_IDENTIFIER_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# AST node types allowed in generated resolver code
+_RESOLVER_NODES = (
+    ast.Module, ast.FunctionDef, ast.arguments, ast.arg, ast.Assign,
+    ast.If, ast.Return, ast.BoolOp, ast.Or, ast.UnaryOp, ast.Not, ast.USub,
+    ast.Compare, ast.NotIn, ast.Gt, ast.GtE, ast.Call, ast.Name,
+    ast.Load, ast.Store, ast.Subscript, ast.Constant, ast.Tuple,
+)
+_RESOLVER_CALLS = {"isinstance", "len"}
+_RESOLVER_GLOBALS = {
+    "__builtins__": {},
+    "isinstance": isinstance,
+    "len": len,
+    "dict": dict,
+    "list": list,
+    "tuple": tuple,
+}
+
+
+def _validate_resolver_tree(tree: ast.AST, path: str) -> None:
+    """Raise ValueError if generated resolver code leaves the AST allow-list."""
+    for node in ast.walk(tree):
+        if not isinstance(node, _RESOLVER_NODES):
+            raise ValueError(f"Disallowed construct in path: {path}")
+        if isinstance(node, ast.Call) and (
+            not isinstance(node.func, ast.Name) or node.func.id not in _RESOLVER_CALLS
+        ):
+            raise ValueError(f"Disallowed call in path: {path}")
+
+
+@lru_cache(maxsize=1024)
+def _compile_resolver(path: str) -> Callable[[Any], Any]:
+    """
+    Compile a path into a resolver function.
+
+    Paths made only of identifier keys and integer indexes are turned into
+    straight-line Python code (one isinstance/bounds check and subscript
+    per step) so resolving does not loop over the steps at runtime. The
+    generated code is checked against an AST allow-list before it is
+    compiled. Any other path falls back to the generic step walker.
+    """
+    steps = _compile_path(path)
+
+    if not all(
+        isinstance(step, int) or (isinstance(step, str) and _IDENTIFIER_PATTERN.match(step))
+        for step in steps
+    ):
+        return lambda context: _resolve_steps(steps, context)
+
+    lines = ["def resolve(value):"]
+    for step in steps:
+        if isinstance(step, str):
+            lines.append(f"    if not isinstance(value, dict) or {step!r} not in value:")
+        elif step >= 0:
+            lines.append(f"    if not isinstance(value, (list, tuple)) or not len(value) > {step}:")
+        else:
+            lines.append(f"    if not isinstance(value, (list, tuple)) or not len(value) >= {-step}:")
+        lines.append("        return None")
+        lines.append(f"    value = value[{step!r}]")
+    lines.append("    return value")
+
+    tree = ast.parse("\n".join(lines), mode="exec")
+    _validate_resolver_tree(tree, path)
+
+    namespace = dict(_RESOLVER_GLOBALS)
+    exec(compile(tree, "<custom_http path>", "exec"), namespace)
+    return namespace["resolve"]
+
+
+@lru_cache(maxsize=1024)
+def _compile_template(template: str) -> Tuple[Any, ...]:
+    """
+    Split a template string into literal text and compiled expressions.
+
+    Each expression is a (resolver, filter_name, filter_arg) tuple.
+    """
+    segments: List[Any] = []
+    pos = 0
+
+    for match in _TEMPLATE_PATTERN.finditer(template):
+        if match.start() > pos:
+            segments.append(template[pos:match.start()])
+        pos = match.end()
+
+        expr = match.group(1).strip()
+
+        # Check for filter
+        filter_name = None
+        filter_arg = None
+        if "|" in expr:
+            expr, filter_part = expr.split("|", 1)
+            expr = expr.strip()
+            if ":" in filter_part:
+                filter_name, filter_arg = filter_part.split(":", 1)
+                filter_name = filter_name.strip()
+                filter_arg = filter_arg.strip()
+            else:
+                filter_name = filter_part.strip()
+
+        segments.append((_compile_resolver(expr), filter_name, filter_arg))
+
+    if pos < len(template):
+        segments.append(template[pos:])
+
+    return tuple(segments)
+
+
+def _parse_json_value(value: Any) -> Any:
+    """Parse a JSON string value; non-string values are already decoded."""
+    if isinstance(value, (str, bytes)):
+        return orjson.loads(value)
+    return value
+
+
+# Casts selectable with the "as" filter, e.g. {{temperature|as:float}}
+_VALUE_CASTS: Dict[str, Callable[[Any], Any]] = {
+    "int": int,
+    "float": float,
+    "str": str,
+    "json": _parse_json_value,
+}
+
+
+def _compile_string_op(template: str) -> Tuple[int, Any]:
+    """
+    Decide once how a string in a body template is turned into a value.
+
+    - No expressions: the literal is coerced now and stored as _OP_LITERAL.
+    - A single expression, optionally surrounded by whitespace: _OP_VALUE,
+      which keeps the resolved Python value (int, dict, ...) instead of
+      stringifying and re-parsing it. The "json" filter is a no-op there,
+      a "default" argument is coerced up front and "as:<type>" selects an
+      explicit cast.
+    - Anything else mixes literal text with values: _OP_RENDER, always a str.
+    """
+    segments = _compile_template(template)
+    expressions = [segment for segment in segments if not isinstance(segment, str)]
+
+    if not expressions:
+        return _literal_op(_coerce_rendered(template))
+
+    if len(expressions) > 1 or any(
+        isinstance(segment, str) and segment.strip() for segment in segments
+    ):
+        return _OP_RENDER, template
+
+    resolve, filter_name, filter_arg = expressions[0]
+    cast = None
+    if filter_name == "json":
+        filter_name = None
+    elif filter_name == "as":
+        cast = _VALUE_CASTS.get(filter_arg)
+        filter_name = None
+    elif filter_name == "default" and filter_arg is not None:
+        filter_arg = _coerce_rendered(filter_arg)
+
+    return _OP_VALUE, ((resolve, filter_name, filter_arg), cast)
+
+
+def _literal_op(value: Any) -> Tuple[int, Any]:
+    """
+    Store a literal so every built body gets its own copy.
+
+    Scalars are immutable and shared as-is; dicts and lists are kept as
+    serialized JSON (_OP_JSON) and decoded per body, so one request
+    mutating its body cannot leak into the next.
+    """
+    if isinstance(value, (dict, list)):
+        return _OP_JSON, orjson.dumps(value)
+    return _OP_LITERAL, value
+
+
+def _compile_body(template: Dict[str, Any]) -> Tuple[Tuple[int, Any, int, Any], ...]:
+    """
+    Compile a request body template into a flat instruction list.
+
+    Each instruction is (parent, key, op, arg): it stores a value under
+    `key` in container number `parent`. _OP_DICT and _OP_LIST create a new
+    container, numbered in the order they appear (0 is the root dict).
+    Strings directly under dicts or lists are compiled by
+    _compile_string_op; other values are stored by _literal_op.
+    """
+    plan: List[Tuple[int, Any, int, Any]] = []
+    pending = [(0, template)]
+    next_container = 1
+
+    while pending:
+        parent, template = pending.pop()
+
+        for key, value in template.items():
+            if isinstance(value, str):
+                plan.append((parent, key, *_compile_string_op(value)))
+            elif isinstance(value, dict):
+                plan.append((parent, key, _OP_DICT, None))
+                pending.append((next_container, value))
+                next_container += 1
+            elif isinstance(value, list):
+                plan.append((parent, key, _OP_LIST, len(value)))
+                container = next_container
+                next_container += 1
+                for index, item in enumerate(value):
+                    if isinstance(item, str):
+                        plan.append((container, index, *_compile_string_op(item)))
+                    else:
+                        plan.append((container, index, *_literal_op(item)))
+            else:
+                plan.append((parent, key, *_literal_op(value)))
+
+    return tuple(plan)
+
+
+_body_plans: "OrderedDict[int, Tuple[Dict[str, Any], Tuple[Tuple[int, Any, int, Any], ...]]]" = OrderedDict()
+
+
+def _get_body_plan(template: Dict[str, Any]) -> Tuple[Tuple[int, Any, int, Any], ...]:
+    """
+    Return the compiled plan of a request template, compiling it once.
+
+    Plans are keyed by the identity of the template object, so a config
+    reused across requests costs a dict lookup instead of a serialization.
+    The template is kept alongside its plan: it cannot be collected and
+    have its id reused while the entry exists.
+    """
+    key = id(template)
+    cached = _body_plans.get(key)
+    if cached is not None and cached[0] is template:
+        _body_plans.move_to_end(key)
+        return cached[1]
+
+    plan = _compile_body(template)
+    _body_plans[key] = (template, plan)
+    if len(_body_plans) > BODY_PLAN_CACHE_SIZE:
+        _body_plans.popitem(last=False)
+    return plan
+
+
+def _coerce_rendered(rendered: str) -> Any:
+    """Convert a literal template value to JSON, int or float if it looks like one."""
+    # Try to parse as JSON if it looks like JSON
+    if rendered.startswith(("{", "[", '"')) or rendered in ("true", "false", "null"):
+        try:
+            return json.loads(rendered)
+        except json.JSONDecodeError:
+            return rendered
+    if rendered.isdigit():
+        return int(rendered)
+    try:
+        return float(rendered)
+    except ValueError:
+        return rendered
+
+
+def _compile_writer(path: str) -> Callable[[Dict[str, Any], Any], None]:
+    """
+    Compile a dotted/bracketed target path into a writer function.
+
+    The writer creates missing dicts/lists along the way (padding lists
+    with {} for intermediate steps and None for the final one) and stores
+    the value at the end of the path.
+    """
+    steps: List[Tuple[str, Optional[int]]] = []
+    for part in path.split("."):
+        # Handle array index
+        if "[" in part:
+            key, index_str = part.split("[")
+            steps.append((key, int(index_str.rstrip("]"))))
+        else:
+            steps.append((part, None))
+
+    intermediate = tuple(steps[:-1])
+    final_key, final_index = steps[-1]
+
+    def write(obj: Dict[str, Any], value: Any) -> None:
+        current = obj
+
+        for key, index in intermediate:
+            if index is None:
+                if key not in current:
+                    current[key] = {}
+                current = current[key]
+            else:
+                items = current.setdefault(key, [])
+                missing = index + 1 - len(items)
+                if missing > 0:
+                    items.extend({} for _ in range(missing))
+                current = items[index]
+
+        # Set final value
+        if final_index is None:
+            current[final_key] = value
+        else:
+            items = current.setdefault(final_key, [])
+            missing = final_index + 1 - len(items)
+            if missing > 0:
+                items.extend([None] * missing)
+            items[final_index] = value
+
+    return write
+
+
+def _clone_skeleton(response_id: str, created: int, model: Optional[str]) -> Dict[str, Any]:
+    """
+    Return the base OpenAI structure that mapped responses are written into.
+
+    The shape is fixed, so a fresh one is built from literals on each call
+    instead of deep-copying a module-level template.
+    """
+    return {
+        "id": response_id,
+        "object": "chat.completion",
+        "created": created,
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": ""}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+@lru_cache(maxsize=256)
+def _compile_response_mapping(
+    mapping: Tuple[Tuple[str, Any], ...]
+) -> Tuple[Tuple[Optional[Callable[[Any], Any]], Any, Callable[[Dict[str, Any], Any], None]], ...]:
+    """
+    Compile response_mapping items into (resolver, literal, writer) triples.
+
+    Sources starting with "$." are compiled into path resolvers; anything
+    else is kept as a literal value with the resolver set to None.
+    """
+    compiled = []
+    for target_path, source_path in mapping:
+        if source_path.startswith("$."):
+            compiled.append((_compile_resolver(source_path[2:]), None, _compile_writer(target_path)))
+        else:
+            compiled.append((None, source_path, _compile_writer(target_path)))
+    return tuple(compiled)
+
+
 class CustomHTTPAdapter(AdapterBase):
     """
     Custom HTTP adapter with template-based transformations.
@@ -36,7 +447,8 @@ class CustomHTTPAdapter(AdapterBase):
             "path_template": "/api/v1/generate",
             "request_template": {
                 "prompt": "{{messages[-1].content}}",
-                "max_tokens": "{{max_tokens|default:1000}}"
+                "max_tokens": "{{max_tokens|default:1000}}",
+                "temperature": "{{temperature|as:float}}"
             },
             "response_mapping": {
                 "choices[0].message.content": "$.output.text",
@@ -58,7 +470,7 @@ class CustomHTTPAdapter(AdapterBase):
     }
 
     # Template variable pattern: {{variable}} or {{variable|filter:arg}}
-    TEMPLATE_PATTERN = re.compile(r"\{\{([^}]+)\}\}")
+    TEMPLATE_PATTERN = _TEMPLATE_PATTERN
 
     # Allowed filters
     ALLOWED_FILTERS = {
@@ -80,40 +492,31 @@ class CustomHTTPAdapter(AdapterBase):
         # Get configuration from model_mapping._config
         config = self._get_config(route_ctx)
 
+        # Template variables, built once for all templates of this request
+        context = self._build_context(openai_request, route_ctx)
+
         # Build URL
         base_url = route_ctx.upstream_base_url.rstrip("/")
-        path = self._render_template(
-            config.get("path_template", "/"),
-            openai_request,
-            route_ctx
-        )
+        path = self._render_template(config.get("path_template", "/"), context)
         url = f"{base_url}{path}"
 
         # Build headers
-        headers = {
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-        }
+        headers = dict(self.BASE_HEADERS)
 
         # Add authentication
-        if route_ctx.upstream_auth_type == "bearer" and route_ctx.upstream_credentials:
-            headers["Authorization"] = f"Bearer {route_ctx.upstream_credentials}"
-        elif route_ctx.upstream_auth_type == "header" and route_ctx.upstream_credentials:
-            try:
-                header_name, header_value = route_ctx.upstream_credentials.split(":", 1)
-                headers[header_name.strip()] = header_value.strip()
-            except ValueError:
-                pass
+        headers.update(build_auth_headers(
+            route_ctx.upstream_auth_type,
+            route_ctx.upstream_credentials
+        ))
 
         # Add configured headers
         for key, value in config.get("headers", {}).items():
-            headers[key] = self._render_template(value, openai_request, route_ctx)
+            headers[key] = self._render_template(value, context)
 
         headers.update(route_ctx.inject_headers)
 
         # Build request body from template
-        request_template = config.get("request_template", {})
-        body = self._build_body_from_template(request_template, openai_request, route_ctx)
+        body = self._build_body_from_template(route_ctx.extra["_body_plan"], context)
 
         method = config.get("method", "POST").upper()
         stream = openai_request.get("stream", False) and config.get("supports_stream", False)
@@ -127,7 +530,17 @@ class CustomHTTPAdapter(AdapterBase):
         )
 
     def _get_config(self, route_ctx: RouteContext) -> Dict[str, Any]:
-        """Extract configuration from route context."""
+        """
+        Extract configuration from route context.
+
+        The validated config is stashed in route_ctx.extra so the request
+        and response phases of the same request share one lookup, together
+        with the compiled plan of its request_template.
+        """
+        config = route_ctx.extra.get("_resolved_config")
+        if config is not None:
+            return config
+
         # Configuration should be in extra or from upstream model_mapping
         config = route_ctx.extra.get("custom_http_config", {})
         if not config:
@@ -136,31 +549,24 @@ class CustomHTTPAdapter(AdapterBase):
                 error_type="configuration_error",
                 status_code=500
             )
+
+        route_ctx.extra["_body_plan"] = _get_body_plan(config.get("request_template", {}))
+        route_ctx.extra["_resolved_config"] = config
         return config
 
-    def _render_template(
+    def _build_context(
         self,
-        template: str,
         request: Dict[str, Any],
         route_ctx: RouteContext
-    ) -> str:
+    ) -> Dict[str, Any]:
         """
-        Render a template string with variables.
-
-        Supports:
-        - {{variable}} - Simple variable access
-        - {{object.field}} - Nested access
-        - {{array[0]}} - Array indexing
-        - {{variable|filter:arg}} - Filters
+        Build the variable context shared by all templates of a request.
 
         Variables available:
         - All fields from the OpenAI request
-        - request_id, trace_id, virtual_model from route_ctx
+        - request_id, trace_id, virtual_model, upstream_model from route_ctx
         """
-        if not isinstance(template, str):
-            return str(template)
-
-        context = {
+        return {
             **request,
             "request_id": route_ctx.request_id,
             "trace_id": route_ctx.trace_id,
@@ -168,100 +574,91 @@ class CustomHTTPAdapter(AdapterBase):
             "upstream_model": route_ctx.upstream_model,
         }
 
-        def replace_var(match):
-            expr = match.group(1).strip()
+    def _render_template(self, template: str, context: Dict[str, Any]) -> str:
+        """
+        Render a template string with variables.
 
-            # Check for filter
-            filter_name = None
-            filter_arg = None
-            if "|" in expr:
-                expr, filter_part = expr.split("|", 1)
-                expr = expr.strip()
-                if ":" in filter_part:
-                    filter_name, filter_arg = filter_part.split(":", 1)
-                    filter_name = filter_name.strip()
-                    filter_arg = filter_arg.strip()
-                else:
-                    filter_name = filter_part.strip()
+        Supports:
+        - {{variable}} - Simple variable access
+        - {{object.field}} - Nested access
+        - {{array[0]}} - Array indexing
+        - {{variable|filter:arg}} - Filters
 
-            # Resolve variable
-            value = self._resolve_path(expr, context)
+        Templates are tokenized once and cached, so rendering only
+        resolves the pre-parsed expressions.
+        """
+        if not isinstance(template, str):
+            return str(template)
 
-            # Apply filter
-            if filter_name and filter_name in self.ALLOWED_FILTERS:
-                value = self.ALLOWED_FILTERS[filter_name](value, filter_arg)
+        parts = []
+        for segment in _compile_template(template):
+            if isinstance(segment, str):
+                parts.append(segment)
+                continue
 
-            if value is None:
-                return ""
-            return str(value)
+            value = self._evaluate(segment, context)
+            if value is not None:
+                parts.append(str(value))
 
-        return self.TEMPLATE_PATTERN.sub(replace_var, template)
+        return "".join(parts)
 
-    def _resolve_path(self, path: str, context: Dict[str, Any]) -> Any:
-        """Resolve a dotted/bracketed path to a value."""
-        # Parse path like "messages[-1].content" or "choices[0].message"
-        parts = re.split(r"\.|\[", path)
-        value = context
+    def _evaluate(self, expression: Tuple[Any, ...], context: Dict[str, Any]) -> Any:
+        """Evaluate a compiled (resolver, filter_name, filter_arg) expression."""
+        resolve, filter_name, filter_arg = expression
 
-        for part in parts:
-            if not part:
-                continue
+        # Resolve variable
+        value = resolve(context)
 
-            # Handle array index
-            if part.endswith("]"):
-                part = part[:-1]
-                try:
-                    index = int(part)
-                    if isinstance(value, (list, tuple)) and -len(value) <= index < len(value):
-                        value = value[index]
-                    else:
-                        return None
-                except ValueError:
-                    return None
-            else:
-                # Handle dict key
-                if isinstance(value, dict) and part in value:
-                    value = value[part]
-                else:
-                    return None
+        # Apply filter
+        if filter_name and filter_name in self.ALLOWED_FILTERS:
+            value = self.ALLOWED_FILTERS[filter_name](value, filter_arg)
 
         return value
 
+    def _resolve_path(self, path: str, context: Dict[str, Any]) -> Any:
+        """Resolve a dotted/bracketed path to a value."""
+        return _compile_resolver(path)(context)
+
     def _build_body_from_template(
         self,
-        template: Dict[str, Any],
-        request: Dict[str, Any],
-        route_ctx: RouteContext
+        plan: Tuple[Tuple[int, Any, int, Any], ...],
+        context: Dict[str, Any]
     ) -> Dict[str, Any]:
-        """Build request body by rendering template recursively."""
-        result = {}
+        """
+        Build request body by executing the template's compiled plan.
 
-        for key, value in template.items():
-            if isinstance(value, str):
-                rendered = self._render_template(value, request, route_ctx)
-                # Try to parse as JSON if it looks like JSON
-                if rendered.startswith(("{", "[", '"')) or rendered in ("true", "false", "null"):
-                    try:
-                        result[key] = json.loads(rendered)
-                    except json.JSONDecodeError:
-                        result[key] = rendered
-                elif rendered.isdigit():
-                    result[key] = int(rendered)
-                else:
+        The template is compiled once into a flat instruction list (see
+        _compile_body and _get_config), so rendering is a single loop
+        without recursion. Value types are decided at compile time:
+        single-expression strings keep the resolved value, mixed strings
+        render to str.
+        """
+        result: Dict[str, Any] = {}
+        containers: List[Any] = [result]
+
+        for parent, key, op, arg in plan:
+            if op == _OP_VALUE:
+                expression, cast = arg
+                value = self._evaluate(expression, context)
+                if cast is not None and value is not None:
                     try:
-                        result[key] = float(rendered)
-                    except ValueError:
-                        result[key] = rendered
-            elif isinstance(value, dict):
-                result[key] = self._build_body_from_template(value, request, route_ctx)
-            elif isinstance(value, list):
-                result[key] = [
-                    self._build_body_from_template({"_": item}, request, route_ctx).get("_", item)
-                    if isinstance(item, str) else item
-                    for item in value
-                ]
+                        value = cast(value)
+                    except (TypeError, ValueError):
+                        pass
+            elif op == _OP_RENDER:
+                value = self._render_template(arg, context)
+            elif op == _OP_LITERAL:
+                value = arg
+            elif op == _OP_JSON:
+                value = orjson.loads(arg)
+            elif op == _OP_DICT:
+                value = {}
+                containers.append(value)
             else:
-                result[key] = value
+                value = [None] * arg
+                containers.append(value)
+
+            containers[parent][key] = value
 
         return result
 
@@ -274,7 +671,7 @@ class CustomHTTPAdapter(AdapterBase):
 
         if upstream_response.status_code >= 400:
             try:
-                error_body = upstream_response.json()
+                error_body = load_response_json(upstream_response)
             except Exception:
                 error_body = {"error": upstream_response.text}
 
@@ -286,7 +683,7 @@ class CustomHTTPAdapter(AdapterBase):
             )
 
         try:
-            response_body = upstream_response.json()
+            response_body = load_response_json(upstream_response)
         except Exception as e:
             raise AdapterError(
                 message=f"Failed to parse response: {e}",
@@ -320,64 +717,27 @@ class CustomHTTPAdapter(AdapterBase):
 
         The $ prefix indicates JSONPath-like access to the source response.
         """
-        import time
-
         # Start with base OpenAI structure
-        result = {
-            "id": f"chatcmpl-{route_ctx.request_id[:8]}",
-            "object": "chat.completion",
-            "created": int(time.time()),
-            "model": route_ctx.virtual_model,
-            "choices": [{"index": 0, "message": {"role": "assistant", "content": ""}, "finish_reason": "stop"}],
-            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
-        }
+        result = _clone_skeleton(
+            "chatcmpl-" + route_ctx.request_id[:8],
+            int(time.time()),
+            route_ctx.virtual_model
+        )
 
-        for target_path, source_path in mapping.items():
+        for resolve, source_literal, write in _compile_response_mapping(
+            tuple(mapping.items())
+        ):
             # Resolve source value
-            if source_path.startswith("$."):
-                source_value = self._resolve_path(source_path[2:], response)
+            if resolve is not None:
+                source_value = resolve(response)
             else:
-                source_value = source_path
+                source_value = source_literal
 
             # Set target value
-            self._set_path(result, target_path, source_value)
+            write(result, source_value)
 
         return result
 
-    def _set_path(self, obj: Dict[str, Any], path: str, value: Any) -> None:
-        """Set a value at a dotted/bracketed path."""
-        parts = path.split(".")
-        current = obj
-
-        for i, part in enumerate(parts[:-1]):
-            # Handle array index
-            if "[" in part:
-                key, index_str = part.split("[")
-                index = int(index_str.rstrip("]"))
-
-                if key not in current:
-                    current[key] = []
-                while len(current[key]) <= index:
-                    current[key].append({})
-                current = current[key][index]
-            else:
-                if part not in current:
-                    current[part] = {}
-                current = current[part]
-
-        # Set final value
-        final_part = parts[-1]
-        if "[" in final_part:
-            key, index_str = final_part.split("[")
-            index = int(index_str.rstrip("]"))
-            if key not in current:
-                current[key] = []
-            while len(current[key]) <= index:
-                current[key].append(None)
-            current[key][index] = value
-        else:
-            current[final_part] = value
-
     async def stream_translate(
         self,
         upstream_stream: AsyncIterator[bytes],
@@ -389,29 +749,13 @@ class CustomHTTPAdapter(AdapterBase):
         This is a basic implementation that assumes the upstream
         sends line-delimited JSON.
         """
-        buffer = b""
-
-        async for chunk in upstream_stream:
-            buffer += chunk
-
-            while b"\n" in buffer:
-                line, buffer = buffer.split(b"\n", 1)
-                line = line.strip()
-
-                if not line:
-                    continue
-
-                try:
-                    line_str = line.decode("utf-8")
-                except UnicodeDecodeError:
-                    continue
-
-                # Handle SSE format
-                if line_str.startswith("data: "):
-                    data = line_str[6:]
-                    if data == "[DONE]":
-                        yield "[DONE]"
-                        return
-                    yield data
-                elif line_str.startswith("{"):
-                    yield line_str
+        async for line_str in iter_sse_lines(upstream_stream):
+            # Handle SSE format
+            if line_str.startswith("data: "):
+                data = line_str[6:]
+                if data == "[DONE]":
+                    yield "[DONE]"
+                    return
+                yield data
+            elif line_str.startswith("{"):
+                yield line_str
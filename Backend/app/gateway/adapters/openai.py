@@ -6,16 +6,19 @@ Since the gateway uses OpenAI-compatible format, this adapter is mostly
 a passthrough with minimal transformation.
 """
 
-import json
 from typing import Any, AsyncIterator, Dict, Set
 
 import httpx
+import orjson
 
+from app.gateway.adapters._sse import iter_sse_lines
 from app.gateway.adapters.base import (
     AdapterBase,
     AdapterError,
+    LazyJSONBody,
     RouteContext,
     UpstreamRequest,
+    load_response_json,
 )
 
 
@@ -81,32 +84,21 @@ class OpenAIAdapter(AdapterBase):
         base_url = route_ctx.upstream_base_url.rstrip("/")
         url = f"{base_url}{upstream_path}"
 
-        # Build headers
-        headers = {
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-        }
-
-        # Add authentication
-        if route_ctx.upstream_auth_type == "bearer" and route_ctx.upstream_credentials:
-            headers["Authorization"] = f"Bearer {route_ctx.upstream_credentials}"
-
-        # Add injected headers from route transform
-        headers.update(route_ctx.inject_headers)
-
-        # Add request tracking headers
-        headers["X-Request-ID"] = route_ctx.request_id
+        # Build headers (auth, injected headers and X-Request-ID)
+        headers = self.build_upstream_headers(route_ctx)
         if route_ctx.trace_id:
             headers["X-Trace-ID"] = route_ctx.trace_id
 
-        # Build request body
-        body = openai_request.copy()
+        # Build request body (copy-on-write: the caller's dict is reused
+        # unless the model actually has to be rewritten)
+        body = openai_request
 
         # Apply model override if specified
-        if route_ctx.model_override:
-            body["model"] = route_ctx.model_override
-        elif route_ctx.upstream_model and "model" in body:
-            body["model"] = route_ctx.upstream_model
+        model = route_ctx.model_override or (
+            route_ctx.upstream_model if "model" in body else None
+        )
+        if model and body.get("model") != model:
+            body = {**body, "model": model}
 
         # Check if streaming
         stream = body.get("stream", False)
@@ -129,7 +121,7 @@ class OpenAIAdapter(AdapterBase):
         if upstream_response.status_code >= 400:
             # Parse error response
             try:
-                error_body = upstream_response.json()
+                error_body = load_response_json(upstream_response)
             except Exception:
                 error_body = {"error": {"message": upstream_response.text}}
 
@@ -141,9 +133,16 @@ class OpenAIAdapter(AdapterBase):
                 upstream_response=upstream_response
             )
 
+        # Passthrough: hand the raw body back and let the caller decode it
+        # lazily, only if it needs to look inside (e.g. for usage)
+        if route_ctx.extra.get("passthrough_raw"):
+            raw = upstream_response.content
+            if raw.lstrip()[:1] == b"{":
+                return LazyJSONBody(raw)
+
         # Parse successful response
         try:
-            response_body = upstream_response.json()
+            response_body = load_response_json(upstream_response)
         except Exception as e:
             raise AdapterError(
                 message=f"Failed to parse upstream response: {e}",
@@ -161,39 +160,28 @@ class OpenAIAdapter(AdapterBase):
         """
         Translate OpenAI SSE stream.
 
-        OpenAI format is already compatible, so we just parse and forward.
+        OpenAI format is already compatible, so we just forward the payload.
+        Chunks that look like a JSON object are trusted as-is; anything else
+        is parsed once to decide whether it should be dropped.
         """
-        buffer = b""
-
-        async for chunk in upstream_stream:
-            buffer += chunk
-
-            # Process complete lines
-            while b"\n" in buffer:
-                line, buffer = buffer.split(b"\n", 1)
-                line = line.strip()
-
-                if not line:
+        async for line_str in iter_sse_lines(upstream_stream):
+            # Check for SSE format
+            if line_str.startswith("data: "):
+                data = line_str[6:]  # Remove "data: " prefix
+
+                if data == "[DONE]":
+                    yield "[DONE]"
+                    return
+
+                # Well-formed chunks from OpenAI are always JSON objects
+                if data.startswith("{") and data.endswith("}"):
+                    yield data
                     continue
 
-                # Decode line
+                # Validate anything unusual before forwarding
                 try:
-                    line_str = line.decode("utf-8")
-                except UnicodeDecodeError:
+                    orjson.loads(data)
+                    yield data
+                except orjson.JSONDecodeError:
+                    # Skip invalid JSON
                     continue
-
-                # Check for SSE format
-                if line_str.startswith("data: "):
-                    data = line_str[6:]  # Remove "data: " prefix
-
-                    if data == "[DONE]":
-                        yield "[DONE]"
-                        return
-
-                    # Validate JSON
-                    try:
-                        json.loads(data)
-                        yield data
-                    except json.JSONDecodeError:
-                        # Skip invalid JSON
-                        continue
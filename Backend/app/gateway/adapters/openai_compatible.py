@@ -11,16 +11,18 @@ This adapter handles communication with OpenAI-compatible servers:
 These servers implement OpenAI's API format but may have minor differences.
 """
 
-import json
 from typing import Any, AsyncIterator, Dict, Set
 
 import httpx
+import orjson
 
+from app.gateway.adapters._sse import iter_sse_lines
 from app.gateway.adapters.base import (
     AdapterBase,
     AdapterError,
     RouteContext,
     UpstreamRequest,
+    load_response_json,
 )
 
 
@@ -59,8 +61,18 @@ class OpenAICompatibleAdapter(AdapterBase):
         "/v1/rerank": "/v1/rerank",
     }
 
+    # Object type to fill in when the upstream omits "object"
+    ENDPOINT_OBJECT_TYPES = {
+        "/v1/chat/completions": "chat.completion",
+        "/v1/completions": "text_completion",
+        "/v1/embeddings": "list",
+    }
+
+    # Responses that already carry these keys need no normalization
+    REQUIRED_RESPONSE_KEYS = frozenset({"object", "model", "usage"})
+
     # Parameters that may need special handling
-    VLLM_EXTRA_PARAMS = {
+    VLLM_EXTRA_PARAMS = frozenset({
         "top_k",
         "min_p",
         "repetition_penalty",
@@ -69,7 +81,7 @@ class OpenAICompatibleAdapter(AdapterBase):
         "ignore_eos",
         "skip_special_tokens",
         "spaces_between_special_tokens",
-    }
+    })
 
     async def build_upstream_request(
         self,
@@ -91,44 +103,29 @@ class OpenAICompatibleAdapter(AdapterBase):
         base_url = route_ctx.upstream_base_url.rstrip("/")
         url = f"{base_url}{upstream_path}"
 
-        # Build headers
-        headers = {
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-        }
-
-        # Add authentication (many local servers don't require auth)
-        if route_ctx.upstream_auth_type == "bearer" and route_ctx.upstream_credentials:
-            headers["Authorization"] = f"Bearer {route_ctx.upstream_credentials}"
-        elif route_ctx.upstream_auth_type == "header" and route_ctx.upstream_credentials:
-            # Custom header format: "X-API-Key: value"
-            try:
-                header_name, header_value = route_ctx.upstream_credentials.split(":", 1)
-                headers[header_name.strip()] = header_value.strip()
-            except ValueError:
-                pass
-
-        # Add injected headers
-        headers.update(route_ctx.inject_headers)
-
-        # Add request tracking
-        headers["X-Request-ID"] = route_ctx.request_id
-
-        # Build request body
-        body = openai_request.copy()
-
-        # Apply model override
-        if route_ctx.model_override:
-            body["model"] = route_ctx.model_override
-        elif route_ctx.upstream_model and "model" in body:
-            body["model"] = route_ctx.upstream_model
-
-        # Handle extra_body for vLLM-specific parameters
-        extra_body = body.pop("extra_body", {})
-        if extra_body:
-            # Merge extra parameters into body
-            for key in self.VLLM_EXTRA_PARAMS:
-                if key in extra_body:
+        # Build headers (many local servers don't require auth)
+        headers = self.build_upstream_headers(route_ctx)
+
+        # Build request body (copy-on-write: the caller's dict is reused
+        # unless the model or extra_body handling has to change it)
+        body = openai_request
+
+        model = route_ctx.model_override or (
+            route_ctx.upstream_model if "model" in body else None
+        )
+        if (model and body.get("model") != model) or "extra_body" in body:
+            body = dict(body)
+
+            # Apply model override
+            if model:
+                body["model"] = model
+
+            # Handle extra_body for vLLM-specific parameters
+            extra_body = body.pop("extra_body", None)
+            if extra_body and isinstance(extra_body, dict):
+                # Merge extra parameters into body (extra_body is usually
+                # the smaller side, so intersect from its keys)
+                for key in extra_body.keys() & self.VLLM_EXTRA_PARAMS:
                     body[key] = extra_body[key]
 
         stream = body.get("stream", False)
@@ -151,7 +148,7 @@ class OpenAICompatibleAdapter(AdapterBase):
         if upstream_response.status_code >= 400:
             # Parse error response
             try:
-                error_body = upstream_response.json()
+                error_body = load_response_json(upstream_response)
             except Exception:
                 error_body = {"error": {"message": upstream_response.text}}
 
@@ -170,7 +167,7 @@ class OpenAICompatibleAdapter(AdapterBase):
 
         # Parse successful response
         try:
-            response_body = upstream_response.json()
+            response_body = load_response_json(upstream_response)
         except Exception as e:
             raise AdapterError(
                 message=f"Failed to parse upstream response: {e}",
@@ -190,15 +187,16 @@ class OpenAICompatibleAdapter(AdapterBase):
     ) -> Dict[str, Any]:
         """Normalize response to match OpenAI format exactly."""
 
+        # Fast path: compliant upstreams (vLLM, sglang) need no changes
+        if self.REQUIRED_RESPONSE_KEYS <= response.keys():
+            return response
+
         # Ensure required fields exist
         if "object" not in response:
             # Infer object type from endpoint
-            if "chat" in route_ctx.endpoint:
-                response["object"] = "chat.completion"
-            elif "embedding" in route_ctx.endpoint:
-                response["object"] = "list"
-            elif "completion" in route_ctx.endpoint:
-                response["object"] = "text_completion"
+            object_type = self.ENDPOINT_OBJECT_TYPES.get(route_ctx.endpoint)
+            if object_type:
+                response["object"] = object_type
 
         # Ensure model field
         if "model" not in response and route_ctx.virtual_model:
@@ -225,54 +223,45 @@ class OpenAICompatibleAdapter(AdapterBase):
         Most compatible servers use the same SSE format as OpenAI.
         We handle minor variations here.
         """
-        buffer = b""
-
-        async for chunk in upstream_stream:
-            buffer += chunk
+        async for line_str in iter_sse_lines(upstream_stream):
+            # Handle SSE format
+            if line_str.startswith("data: "):
+                data = line_str[6:]
 
-            # Process complete lines
-            while b"\n" in buffer:
-                line, buffer = buffer.split(b"\n", 1)
-                line = line.strip()
+                if data == "[DONE]":
+                    yield "[DONE]"
+                    return
 
-                if not line:
+                # Validate and normalize JSON
+                try:
+                    chunk_obj = orjson.loads(data)
+                except orjson.JSONDecodeError:
                     continue
 
+                modified = False
+
+                # Ensure object type
+                if "object" not in chunk_obj:
+                    chunk_obj["object"] = "chat.completion.chunk"
+                    modified = True
+
+                # Ensure model
+                if "model" not in chunk_obj:
+                    chunk_obj["model"] = route_ctx.virtual_model
+                    modified = True
+
+                # Re-serialize only when the chunk actually changed
+                yield orjson.dumps(chunk_obj).decode() if modified else data
+
+            # Handle alternative formats (some servers use different delimiters)
+            elif line_str.startswith("{"):
                 try:
-                    line_str = line.decode("utf-8")
-                except UnicodeDecodeError:
+                    chunk_obj = orjson.loads(line_str)
+                except orjson.JSONDecodeError:
                     continue
 
-                # Handle SSE format
-                if line_str.startswith("data: "):
-                    data = line_str[6:]
-
-                    if data == "[DONE]":
-                        yield "[DONE]"
-                        return
-
-                    # Validate and normalize JSON
-                    try:
-                        chunk_obj = json.loads(data)
-
-                        # Ensure object type
-                        if "object" not in chunk_obj:
-                            chunk_obj["object"] = "chat.completion.chunk"
-
-                        # Ensure model
-                        if "model" not in chunk_obj:
-                            chunk_obj["model"] = route_ctx.virtual_model
-
-                        yield json.dumps(chunk_obj)
-                    except json.JSONDecodeError:
-                        continue
-
-                # Handle alternative formats (some servers use different delimiters)
-                elif line_str.startswith("{"):
-                    try:
-                        chunk_obj = json.loads(line_str)
-                        if "object" not in chunk_obj:
-                            chunk_obj["object"] = "chat.completion.chunk"
-                        yield json.dumps(chunk_obj)
-                    except json.JSONDecodeError:
-                        continue
+                if "object" not in chunk_obj:
+                    chunk_obj["object"] = "chat.completion.chunk"
+                    yield orjson.dumps(chunk_obj).decode()
+                else:
+                    yield line_str
@@ -8,19 +8,33 @@ SD WebUI API: https://github.com/AUTOMATIC1111/stable-diffusion-webui/wiki/API
 """
 
 import base64
-import json
-from typing import Any, AsyncIterator, Dict, Set
+import time
+from typing import Any, AsyncIterator, Dict, Set, Tuple
 
 import httpx
+import orjson
 
 from app.gateway.adapters.base import (
     AdapterBase,
     AdapterError,
     RouteContext,
     UpstreamRequest,
+    load_response_json,
 )
 
 
+# Size mapping (OpenAI sizes to width/height), module-level so the request
+# builders resolve it as a global instead of a class attribute
+_SIZE_MAP: Dict[str, Tuple[int, int]] = {
+    "256x256": (256, 256),
+    "512x512": (512, 512),
+    "1024x1024": (1024, 1024),
+    "1024x1792": (1024, 1792),
+    "1792x1024": (1792, 1024),
+}
+_DEFAULT_SIZE = (1024, 1024)
+
+
 class StableDiffusionAdapter(AdapterBase):
     """
     Adapter for Stable Diffusion WebUI/A1111 API.
@@ -67,13 +81,7 @@ class StableDiffusionAdapter(AdapterBase):
     DEFAULT_SAMPLER = "DPM++ 2M Karras"
 
     # Size mapping (OpenAI sizes to width/height)
-    SIZE_MAP = {
-        "256x256": (256, 256),
-        "512x512": (512, 512),
-        "1024x1024": (1024, 1024),
-        "1024x1792": (1024, 1792),
-        "1792x1024": (1792, 1024),
-    }
+    SIZE_MAP = _SIZE_MAP
 
     async def build_upstream_request(
         self,
@@ -105,57 +113,40 @@ class StableDiffusionAdapter(AdapterBase):
         base_url = route_ctx.upstream_base_url.rstrip("/")
         url = f"{base_url}{self.TXT2IMG_PATH}"
 
-        # Build headers
-        headers = {
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-        }
-
-        # SD WebUI may require authentication
-        if route_ctx.upstream_auth_type == "bearer" and route_ctx.upstream_credentials:
-            headers["Authorization"] = f"Bearer {route_ctx.upstream_credentials}"
-        elif route_ctx.upstream_auth_type == "header" and route_ctx.upstream_credentials:
-            try:
-                header_name, header_value = route_ctx.upstream_credentials.split(":", 1)
-                headers[header_name.strip()] = header_value.strip()
-            except ValueError:
-                pass
-
-        headers.update(route_ctx.inject_headers)
+        # Build headers (SD WebUI may require authentication)
+        headers = self.build_upstream_headers(route_ctx, include_request_id=False)
 
         # Parse size
         size_str = openai_request.get("size", "1024x1024")
-        width, height = self.SIZE_MAP.get(size_str, (1024, 1024))
+        width, height = _SIZE_MAP.get(size_str, _DEFAULT_SIZE)
 
-        # Build SD request body
+        steps = openai_request.get("steps", self.DEFAULT_STEPS)
+        cfg_scale = openai_request.get("cfg_scale", self.DEFAULT_CFG_SCALE)
+
+        # Quality mapping (OpenAI "hd" -> higher steps)
+        if openai_request.get("quality", "standard") == "hd":
+            steps = max(steps, 30)
+            cfg_scale = max(cfg_scale, 8)
+
+        # Build SD request body in its final shape (one dict display, no
+        # follow-up mutations); it is serialized once, by orjson, on send
         body = {
             "prompt": openai_request.get("prompt", ""),
             "negative_prompt": openai_request.get("negative_prompt", ""),
-            "steps": openai_request.get("steps", self.DEFAULT_STEPS),
-            "cfg_scale": openai_request.get("cfg_scale", self.DEFAULT_CFG_SCALE),
+            "steps": steps,
+            "cfg_scale": cfg_scale,
             "width": width,
             "height": height,
             "batch_size": openai_request.get("n", 1),
             "sampler_name": openai_request.get("sampler", self.DEFAULT_SAMPLER),
+            # Seed for reproducibility (-1 = random)
+            "seed": openai_request.get("seed", -1),
         }
 
-        # Quality mapping (OpenAI "hd" -> higher steps)
-        quality = openai_request.get("quality", "standard")
-        if quality == "hd":
-            body["steps"] = max(body["steps"], 30)
-            body["cfg_scale"] = max(body["cfg_scale"], 8)
-
         # Model override (SD checkpoint)
-        if route_ctx.model_override:
-            body["override_settings"] = {"sd_model_checkpoint": route_ctx.model_override}
-        elif route_ctx.upstream_model:
-            body["override_settings"] = {"sd_model_checkpoint": route_ctx.upstream_model}
-
-        # Seed for reproducibility
-        if "seed" in openai_request:
-            body["seed"] = openai_request["seed"]
-        else:
-            body["seed"] = -1  # Random
+        checkpoint = route_ctx.model_override or route_ctx.upstream_model
+        if checkpoint:
+            body["override_settings"] = {"sd_model_checkpoint": checkpoint}
 
         return UpstreamRequest(
             method="POST",
@@ -175,25 +166,19 @@ class StableDiffusionAdapter(AdapterBase):
         base_url = route_ctx.upstream_base_url.rstrip("/")
         url = f"{base_url}{self.IMG2IMG_PATH}"
 
-        headers = {
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-        }
-
-        if route_ctx.upstream_auth_type == "bearer" and route_ctx.upstream_credentials:
-            headers["Authorization"] = f"Bearer {route_ctx.upstream_credentials}"
-
-        headers.update(route_ctx.inject_headers)
+        headers = self.build_upstream_headers(route_ctx, include_request_id=False)
 
         # Parse size
         size_str = openai_request.get("size", "1024x1024")
-        width, height = self.SIZE_MAP.get(size_str, (1024, 1024))
-
-        # Get input image (should be base64)
-        input_image = openai_request.get("image", "")
-        if input_image.startswith("data:"):
-            # Remove data URL prefix
-            input_image = input_image.split(",", 1)[-1]
+        width, height = _SIZE_MAP.get(size_str, _DEFAULT_SIZE)
+
+        # Get input image (base64, data URL or raw bytes). Callers holding
+        # the decoded file (e.g. multipart uploads) can pass "image_bytes"
+        # so it is base64-encoded exactly once, here.
+        raw_image = openai_request.get("image_bytes")
+        input_image = self._to_base64_image(
+            raw_image if raw_image is not None else openai_request.get("image", "")
+        )
 
         body = {
             "init_images": [input_image],
@@ -209,11 +194,11 @@ class StableDiffusionAdapter(AdapterBase):
         }
 
         # Mask for inpainting (edits endpoint)
-        if "mask" in openai_request:
-            mask = openai_request["mask"]
-            if mask.startswith("data:"):
-                mask = mask.split(",", 1)[-1]
-            body["mask"] = mask
+        mask = openai_request.get("mask_bytes")
+        if mask is None:
+            mask = openai_request.get("mask")
+        if mask is not None:
+            body["mask"] = self._to_base64_image(mask)
             body["inpainting_fill"] = 1  # Fill masked area
 
         return UpstreamRequest(
@@ -224,6 +209,22 @@ class StableDiffusionAdapter(AdapterBase):
             stream=False
         )
 
+    @staticmethod
+    def _to_base64_image(image: Any) -> str:
+        """
+        Normalize an input image to the bare base64 string SD expects.
+
+        Raw bytes (e.g. from a multipart upload) are encoded exactly once;
+        data URLs have their "data:...;base64," prefix sliced off without
+        splitting the multi-MB string.
+        """
+        if isinstance(image, (bytes, bytearray, memoryview)):
+            return base64.b64encode(image).decode("ascii")
+        if image.startswith("data:"):
+            # Remove data URL prefix
+            return image[image.find(",") + 1:]
+        return image
+
     async def parse_upstream_response(
         self,
         upstream_response: httpx.Response,
@@ -233,7 +234,7 @@ class StableDiffusionAdapter(AdapterBase):
 
         if upstream_response.status_code >= 400:
             try:
-                error_body = upstream_response.json()
+                error_body = load_response_json(upstream_response)
             except Exception:
                 error_body = {"error": upstream_response.text}
 
@@ -245,7 +246,7 @@ class StableDiffusionAdapter(AdapterBase):
             )
 
         try:
-            sd_response = upstream_response.json()
+            sd_response = load_response_json(upstream_response)
         except Exception as e:
             raise AdapterError(
                 message=f"Failed to parse SD response: {e}",
@@ -279,29 +280,27 @@ class StableDiffusionAdapter(AdapterBase):
             ]
         }
         """
-        import time
-
-        images = sd_response.get("images", [])
+        # Take ownership of the (potentially multi-MB) base64 strings and
+        # drop the upstream container so only one reference stays alive
+        images = sd_response.pop("images", None) or []
 
         # Parse generation info
         info = {}
         info_str = sd_response.get("info", "{}")
         try:
-            info = json.loads(info_str) if isinstance(info_str, str) else info_str
-        except json.JSONDecodeError:
+            info = orjson.loads(info_str) if isinstance(info_str, str) else info_str
+        except orjson.JSONDecodeError:
             pass
 
-        data = []
-        for i, image_b64 in enumerate(images):
-            item = {
-                "b64_json": image_b64,
-            }
-
-            # Add revised prompt if available
-            if info.get("prompt"):
-                item["revised_prompt"] = info.get("prompt")
-
-            data.append(item)
+        # Add revised prompt if available
+        revised_prompt = info.get("prompt")
+        if revised_prompt:
+            data = [
+                {"b64_json": image_b64, "revised_prompt": revised_prompt}
+                for image_b64 in images
+            ]
+        else:
+            data = [{"b64_json": image_b64} for image_b64 in images]
 
         return {
             "created": int(time.time()),
@@ -309,15 +308,19 @@ class StableDiffusionAdapter(AdapterBase):
             "model": route_ctx.virtual_model,
         }
 
-    async def stream_translate(
+    def stream_translate(
         self,
         upstream_stream: AsyncIterator[bytes],
         route_ctx: RouteContext
     ) -> AsyncIterator[str]:
-        """SD image generation doesn't support streaming."""
+        """
+        SD image generation doesn't support streaming.
+
+        A plain method rather than an async generator: it raises as soon as
+        it is called, without allocating a generator first.
+        """
         raise AdapterError(
             message="Streaming not supported for image generation",
             error_type="invalid_request_error",
             status_code=400
         )
-        yield ""
@@ -40,6 +40,7 @@ from app.gateway.middleware.trace import (
     TracingMiddleware,
     RequestContext,
     RequestTimer,
+    add_trace_headers,
     generate_request_id,
     generate_trace_id,
     get_request_id,
@@ -70,6 +71,7 @@ __all__ = [
     "TracingMiddleware",
     "RequestContext",
     "RequestTimer",
+    "add_trace_headers",
     "generate_request_id",
     "generate_trace_id",
     "get_request_id",
@@ -5,38 +5,191 @@ This module handles API key authentication for the AI Gateway.
 External clients use Bearer tokens to authenticate with the gateway.
 
 Features:
-- API key validation (bcrypt hash comparison)
+- API key validation (HMAC-SHA256; legacy bcrypt hashes are upgraded on use)
 - Key expiration checking
 - Access control (allowed models/endpoints)
 - Request context enrichment
 """
 
+import asyncio
+import fnmatch
 import hashlib
+import hmac
+import re
 import secrets
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Any, Dict, List, Optional, Set
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple
 from uuid import UUID
 
 import bcrypt
-from sqlalchemy import select, update
+from sqlalchemy import DateTime, Row, column, select, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.core.database import async_session_factory
 from app.models.gateway import GatewayAPIKey, LogPayloadMode
 
 
-@dataclass
+# Pepper for HMAC-SHA256 API key hashes. Changing it (or SECRET_KEY, while
+# API_KEY_PEPPER is unset) invalidates every HMAC-hashed key; main.py warns
+# at startup when the fallback is in use.
+_API_KEY_PEPPER = (
+    settings.security.api_key_pepper or settings.security.secret_key
+).encode()
+
+# Successful bcrypt verifications, so repeated requests with the same key
+# skip the (deliberately slow) hash check. Entries are keyed by a keyed
+# BLAKE2b digest of the raw key, so the cache never holds usable keys.
+VERIFY_CACHE_MAX_SIZE = 10_000
+VERIFY_CACHE_TTL_SECONDS = 300
+
+_verify_cache: "OrderedDict[bytes, Tuple[str, float]]" = OrderedDict()
+_VERIFY_CACHE_SECRET = settings.security.secret_key.encode()[:64]
+
+
+@lru_cache(maxsize=4096)
+def _pattern_set(patterns: Tuple[str, ...]) -> FrozenSet[str]:
+    """
+    Intern an allow-list as a frozenset.
+
+    Keys reuse the same frozenset object across requests, so its (cached)
+    hash makes the _compile_patterns lookup O(1).
+    """
+    return frozenset(patterns)
+
+
+# Characters that make an fnmatch pattern a wildcard
+_WILDCARD_CHARS = frozenset("*?[")
+
+
+@lru_cache(maxsize=4096)
+def _compile_patterns(
+    patterns: FrozenSet[str]
+) -> Tuple[FrozenSet[str], Optional["re.Pattern[str]"]]:
+    """
+    Split patterns into exact names and one combined wildcard regex.
+
+    Most allow-lists are plain names, which are checked by set membership;
+    only patterns containing wildcard characters go into the regex (None
+    when there are none).
+    """
+    exact = frozenset(p for p in patterns if _WILDCARD_CHARS.isdisjoint(p))
+    wildcards = [p for p in patterns if p not in exact]
+    if not wildcards:
+        return exact, None
+    return exact, re.compile("|".join(f"(?:{fnmatch.translate(p)})" for p in wildcards))
+
+
+def matches_any_pattern(value: str, patterns: Iterable[str]) -> bool:
+    """Check if value matches any wildcard pattern (fnmatch syntax)."""
+    exact, wildcard = _compile_patterns(frozenset(patterns))
+    if value in exact:
+        return True
+    return wildcard is not None and wildcard.match(value) is not None
+
+
+# last_used_at timestamps are buffered in-process and written in bulk, so
+# authentication never waits on (or contends for) the key row
+LAST_USED_FLUSH_INTERVAL_SECONDS = 5.0
+
+_last_used_buffer: Dict[UUID, datetime] = {}
+_last_used_flusher: Optional["asyncio.Task[None]"] = None
+
+
+def record_last_used(key_id: UUID) -> None:
+    """Buffer a last_used_at update and make sure the flusher is running."""
+    global _last_used_flusher
+    _last_used_buffer[key_id] = datetime.now(timezone.utc)
+
+    if _last_used_flusher is None or _last_used_flusher.done():
+        _last_used_flusher = asyncio.create_task(_flush_last_used_periodically())
+
+
+async def flush_last_used() -> None:
+    """Write all buffered last_used_at timestamps with one UPDATE ... FROM (VALUES ...)."""
+    if not _last_used_buffer:
+        return
+
+    pending = list(_last_used_buffer.items())
+    _last_used_buffer.clear()
+
+    rows = values(
+        column("id", PG_UUID(as_uuid=True)),
+        column("last_used_at", DateTime(timezone=True)),
+        name="last_used",
+    ).data(pending)
+    stmt = (
+        update(GatewayAPIKey)
+        .where(GatewayAPIKey.id == rows.c.id)
+        .values(last_used_at=rows.c.last_used_at)
+    )
+
+    async with async_session_factory() as session:
+        await session.execute(stmt)
+        await session.commit()
+
+
+async def _flush_last_used_periodically() -> None:
+    """Background loop behind record_last_used()."""
+    while True:
+        await asyncio.sleep(LAST_USED_FLUSH_INTERVAL_SECONDS)
+        try:
+            await flush_last_used()
+        except Exception:
+            # Non-critical, timestamps are best-effort
+            pass
+
+
+async def stop_last_used_flusher() -> None:
+    """Stop the background flusher and write any remaining timestamps."""
+    global _last_used_flusher
+    if _last_used_flusher is not None:
+        _last_used_flusher.cancel()
+        _last_used_flusher = None
+    await flush_last_used()
+
+
+def _verify_cache_key(api_key: str) -> bytes:
+    """Derive the cache key for a raw API key."""
+    return hashlib.blake2b(
+        api_key.encode(),
+        digest_size=16,
+        key=_VERIFY_CACHE_SECRET
+    ).digest()
+
+
+@dataclass(frozen=True)
 class AuthContext:
-    """Authentication context for a gateway request."""
+    """
+    Authentication context for a gateway request.
+
+    Immutable and slotted (no per-instance __dict__); built once per request.
+    """
+
+    __slots__ = (
+        "api_key_id",
+        "tenant_id",
+        "user_id",
+        "allowed_models",
+        "allowed_endpoints",
+        "rate_limit",
+        "quota",
+        "log_payload_mode",
+        "key_prefix",
+    )
 
     api_key_id: UUID
     tenant_id: UUID
     user_id: Optional[UUID]
 
     # Access control
-    allowed_models: Set[str]
-    allowed_endpoints: Set[str]
+    allowed_models: FrozenSet[str]
+    allowed_endpoints: FrozenSet[str]
 
     # Rate limit config
     rate_limit: Dict[str, Any]
@@ -48,6 +201,14 @@ class AuthContext:
     # Raw key prefix for logging
     key_prefix: str
 
+    def allows_model(self, model: str) -> bool:
+        """Check a model against allowed_models (empty means unrestricted)."""
+        return not self.allowed_models or matches_any_pattern(model, self.allowed_models)
+
+    def allows_endpoint(self, endpoint: str) -> bool:
+        """Check an endpoint against allowed_endpoints (empty means unrestricted)."""
+        return not self.allowed_endpoints or matches_any_pattern(endpoint, self.allowed_endpoints)
+
 
 class AuthenticationError(Exception):
     """Exception raised when authentication fails."""
@@ -82,6 +243,12 @@ class APIKeyGenerator:
     PREFIX_LENGTH = 8
     SECRET_LENGTH = 32
 
+    # Hash schemes, stored in GatewayAPIKey.hash_version. Keys carry 128 bits
+    # of randomness, so a slow KDF adds nothing over a peppered HMAC.
+    HASH_VERSION_BCRYPT = 1
+    HASH_VERSION_HMAC = 2
+    HASH_VERSION = HASH_VERSION_HMAC
+
     @classmethod
     def generate(cls) -> tuple[str, str, str]:
         """
@@ -91,11 +258,12 @@ class APIKeyGenerator:
             Tuple of (full_key, prefix, hash)
             - full_key: The complete key to show to user once
             - prefix: The first part of the key (for display)
-            - hash: Bcrypt hash to store in database
+            - hash: HMAC-SHA256 hash to store in database (HASH_VERSION)
         """
-        # Generate random components
-        prefix = secrets.token_hex(cls.PREFIX_LENGTH // 2)
-        secret = secrets.token_hex(cls.SECRET_LENGTH // 2)
+        # Draw both random components with one CSPRNG call and one hex encode
+        random_hex = secrets.token_hex((cls.PREFIX_LENGTH + cls.SECRET_LENGTH) // 2)
+        prefix = random_hex[:cls.PREFIX_LENGTH]
+        secret = random_hex[cls.PREFIX_LENGTH:]
 
         # Full key
         full_key = f"sk-{prefix}-{secret}"
@@ -104,18 +272,57 @@ class APIKeyGenerator:
         display_prefix = f"sk-{prefix}"
 
         # Hash for storage
-        key_hash = bcrypt.hashpw(full_key.encode(), bcrypt.gensalt()).decode()
+        key_hash = cls.hash_key(full_key)
 
         return full_key, display_prefix, key_hash
 
     @classmethod
-    def verify(cls, key: str, key_hash: str) -> bool:
+    def hash_key(cls, key: str) -> str:
+        """Hash a key with the current scheme (HMAC-SHA256)."""
+        return hmac.new(_API_KEY_PEPPER, key.encode(), hashlib.sha256).hexdigest()
+
+    @classmethod
+    def verify(cls, key: str, key_hash: str, hash_version: int = HASH_VERSION) -> bool:
         """Verify a key against its hash."""
+        if hash_version == cls.HASH_VERSION_HMAC:
+            return hmac.compare_digest(cls.hash_key(key), key_hash)
+
         try:
             return bcrypt.checkpw(key.encode(), key_hash.encode())
         except Exception:
             return False
 
+    @classmethod
+    async def verify_cached(cls, key: str, key_hash: str) -> bool:
+        """
+        Verify a key against a legacy bcrypt hash, reusing recent successful checks.
+
+        A cache hit only counts if it was recorded for the same stored hash,
+        so rotated keys are re-verified. Misses run bcrypt in the default
+        executor to keep the event loop responsive.
+        """
+        cache_key = _verify_cache_key(key)
+        now = time.monotonic()
+
+        cached = _verify_cache.get(cache_key)
+        if cached is not None:
+            cached_hash, expires_at = cached
+            if cached_hash == key_hash and expires_at > now:
+                _verify_cache.move_to_end(cache_key)
+                return True
+            _verify_cache.pop(cache_key, None)
+
+        loop = asyncio.get_running_loop()
+        if not await loop.run_in_executor(
+            None, cls.verify, key, key_hash, cls.HASH_VERSION_BCRYPT
+        ):
+            return False
+
+        _verify_cache[cache_key] = (key_hash, now + VERIFY_CACHE_TTL_SECONDS)
+        if len(_verify_cache) > VERIFY_CACHE_MAX_SIZE:
+            _verify_cache.popitem(last=False)
+        return True
+
     @classmethod
     def get_prefix(cls, key: str) -> str:
         """Extract the prefix from a key for lookup."""
@@ -181,7 +388,14 @@ class GatewayAuthenticator:
             )
 
         # 4. Verify hash
-        if not APIKeyGenerator.verify(api_key, key_record.key_hash):
+        legacy_hash = key_record.hash_version != APIKeyGenerator.HASH_VERSION_HMAC
+        if legacy_hash:
+            verified = await APIKeyGenerator.verify_cached(api_key, key_record.key_hash)
+        else:
+            verified = APIKeyGenerator.verify(
+                api_key, key_record.key_hash, APIKeyGenerator.HASH_VERSION_HMAC
+            )
+        if not verified:
             raise AuthenticationError(
                 "Invalid API key",
                 status_code=401
@@ -194,26 +408,32 @@ class GatewayAuthenticator:
                 status_code=403
             )
 
-        # 6. Check expiration
-        if key_record.expires_at and key_record.expires_at < datetime.utcnow():
+        # 6. Check expiration (epoch compare; expires_at is timezone-aware)
+        if key_record.expires_at and key_record.expires_at.timestamp() < time.time():
             raise AuthenticationError(
                 "API key has expired",
                 status_code=403
             )
 
         # 7. Check access control
-        await self._check_access(key_record, endpoint, model)
+        allowed_models = _pattern_set(tuple(key_record.allowed_models or ()))
+        allowed_endpoints = _pattern_set(tuple(key_record.allowed_endpoints or ()))
+        await self._check_access(allowed_models, allowed_endpoints, endpoint, model)
 
-        # 8. Update last used timestamp (async, non-blocking)
-        await self._update_last_used(key_record.id)
+        # 8. Update last used timestamp (buffered, non-blocking)
+        self._update_last_used(key_record.id)
+
+        # 9. Upgrade legacy bcrypt hashes now that the raw key is known
+        if legacy_hash:
+            await self._upgrade_key_hash(key_record.id, api_key)
 
         # Build auth context
         return AuthContext(
             api_key_id=key_record.id,
             tenant_id=key_record.tenant_id,
             user_id=key_record.user_id,
-            allowed_models=set(key_record.allowed_models or []),
-            allowed_endpoints=set(key_record.allowed_endpoints or []),
+            allowed_models=allowed_models,
+            allowed_endpoints=allowed_endpoints,
             rate_limit=key_record.rate_limit or {},
             quota=key_record.quota or {},
             log_payload_mode=key_record.log_payload_mode or LogPayloadMode.METADATA_ONLY,
@@ -244,21 +464,39 @@ class GatewayAuthenticator:
 
         return token
 
-    async def _lookup_key(self, prefix: str) -> Optional[GatewayAPIKey]:
-        """Look up API key by prefix."""
-        stmt = select(GatewayAPIKey).where(GatewayAPIKey.key_prefix == prefix)
+    # Columns needed to authenticate a request, selected as a plain row
+    # to skip ORM entity construction and identity-map bookkeeping
+    AUTH_COLUMNS = (
+        GatewayAPIKey.id,
+        GatewayAPIKey.tenant_id,
+        GatewayAPIKey.user_id,
+        GatewayAPIKey.key_prefix,
+        GatewayAPIKey.key_hash,
+        GatewayAPIKey.hash_version,
+        GatewayAPIKey.enabled,
+        GatewayAPIKey.expires_at,
+        GatewayAPIKey.allowed_models,
+        GatewayAPIKey.allowed_endpoints,
+        GatewayAPIKey.rate_limit,
+        GatewayAPIKey.quota,
+        GatewayAPIKey.log_payload_mode,
+    )
+
+    async def _lookup_key(self, prefix: str) -> Optional[Row]:
+        """Look up API key by prefix (unique index)."""
+        stmt = select(*self.AUTH_COLUMNS).where(GatewayAPIKey.key_prefix == prefix)
         result = await self.db.execute(stmt)
-        return result.scalar_one_or_none()
+        return result.one_or_none()
 
     async def _check_access(
         self,
-        key_record: GatewayAPIKey,
+        allowed_models: FrozenSet[str],
+        allowed_endpoints: FrozenSet[str],
         endpoint: str,
         model: Optional[str]
     ) -> None:
         """Check if the key has access to the endpoint and model."""
         # Check endpoint access
-        allowed_endpoints = key_record.allowed_endpoints or []
         if allowed_endpoints:
             if not self._matches_pattern(endpoint, allowed_endpoints):
                 raise AuthenticationError(
@@ -268,7 +506,6 @@ class GatewayAuthenticator:
 
         # Check model access
         if model:
-            allowed_models = key_record.allowed_models or []
             if allowed_models:
                 if not self._matches_pattern(model, allowed_models):
                     raise AuthenticationError(
@@ -276,27 +513,29 @@ class GatewayAuthenticator:
                         status_code=403
                     )
 
-    def _matches_pattern(self, value: str, patterns: List[str]) -> bool:
+    def _matches_pattern(self, value: str, patterns: Iterable[str]) -> bool:
         """Check if value matches any pattern (supports wildcards)."""
-        import fnmatch
+        return matches_any_pattern(value, patterns)
 
-        for pattern in patterns:
-            if fnmatch.fnmatch(value, pattern):
-                return True
-        return False
+    def _update_last_used(self, key_id: UUID) -> None:
+        """Update the last_used_at timestamp (flushed in the background)."""
+        record_last_used(key_id)
 
-    async def _update_last_used(self, key_id: UUID) -> None:
-        """Update the last_used_at timestamp."""
+    async def _upgrade_key_hash(self, key_id: UUID, api_key: str) -> None:
+        """Re-hash a verified legacy key with the current scheme."""
         try:
             stmt = (
                 update(GatewayAPIKey)
                 .where(GatewayAPIKey.id == key_id)
-                .values(last_used_at=datetime.utcnow())
+                .values(
+                    key_hash=APIKeyGenerator.hash_key(api_key),
+                    hash_version=APIKeyGenerator.HASH_VERSION
+                )
             )
             await self.db.execute(stmt)
             await self.db.commit()
         except Exception:
-            # Non-critical, don't fail the request
+            # Non-critical, the bcrypt hash keeps working
             pass
 
 
@@ -327,16 +566,10 @@ class AccessControlChecker:
         Raises:
             AuthenticationError: If access is denied
         """
-        # If allowed_models is empty, all models are allowed
-        if not auth_ctx.allowed_models:
+        # Empty allowed_models means all models are allowed
+        if auth_ctx.allows_model(virtual_model):
             return
 
-        # Check against allowed patterns
-        import fnmatch
-        for pattern in auth_ctx.allowed_models:
-            if fnmatch.fnmatch(virtual_model, pattern):
-                return
-
         raise AuthenticationError(
             f"Access denied to model: {virtual_model}",
             status_code=403
@@ -357,16 +590,10 @@ class AccessControlChecker:
         Raises:
             AuthenticationError: If access is denied
         """
-        # If allowed_endpoints is empty, all endpoints are allowed
-        if not auth_ctx.allowed_endpoints:
+        # Empty allowed_endpoints means all endpoints are allowed
+        if auth_ctx.allows_endpoint(endpoint):
             return
 
-        # Check against allowed patterns
-        import fnmatch
-        for pattern in auth_ctx.allowed_endpoints:
-            if fnmatch.fnmatch(endpoint, pattern):
-                return
-
         raise AuthenticationError(
             f"Access denied to endpoint: {endpoint}",
             status_code=403
@@ -7,16 +7,83 @@ Supports multiple rate limit types:
 - Tokens per minute/hour/day
 - Per API key, per tenant, and global limits
 
-Uses sliding window algorithm for accurate rate limiting.
+Minute limits use a sliding window; hour and day limits use fixed-window
+counters.
 """
 
 import asyncio
+import secrets
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
-from uuid import UUID
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
+from uuid import UUID, uuid4
 
 import redis.asyncio as redis
+from redis.exceptions import NoScriptError
+
+
+def _member_amount(member: Union[bytes, str]) -> int:
+    """Return the amount encoded as the last ":" field of a window member."""
+    separator = b":" if isinstance(member, bytes) else ":"
+    return int(member.rsplit(separator, 1)[-1])
+
+
+@lru_cache(maxsize=4096)
+def _redis_key(*parts: Any) -> str:
+    """
+    Join key parts with ":".
+
+    Memoized so the UUID formatting and string building for a given key
+    prefix happen once instead of on every request.
+    """
+    return ":".join(map(str, parts))
+
+
+# Quota period identifiers per reset interval
+_PERIOD_FORMATS = {
+    "daily": "%Y-%m-%d",
+    "weekly": "%Y-W%W",
+    "monthly": "%Y-%m",
+}
+
+
+@lru_cache(maxsize=64)
+def _period_key(interval: str, minute: int) -> str:
+    """
+    Period identifier for a UTC minute bucket.
+
+    Memoized per (interval, minute), so all requests within the same minute
+    share one strftime() result. Period boundaries always fall on a minute
+    boundary, so the bucket never straddles two periods.
+    """
+    period_format = _PERIOD_FORMATS.get(interval)
+    if period_format is None:
+        return "forever"
+    return datetime.fromtimestamp(minute * 60, timezone.utc).strftime(period_format)
+
+
+@lru_cache(maxsize=64)
+def _period_reset_time(interval: str, hour: int) -> int:
+    """Unix timestamp when the period containing a UTC hour bucket resets."""
+    now = datetime.fromtimestamp(hour * 3600, timezone.utc)
+
+    if interval == "daily":
+        reset = (now + timedelta(days=1)).replace(hour=0)
+    elif interval == "weekly":
+        days_until_monday = (7 - now.weekday()) % 7 or 7
+        reset = (now + timedelta(days=days_until_monday)).replace(hour=0)
+    elif interval == "monthly":
+        if now.month == 12:
+            reset = now.replace(year=now.year + 1, month=1, day=1, hour=0)
+        else:
+            reset = now.replace(month=now.month + 1, day=1, hour=0)
+    else:
+        reset = now + timedelta(days=365 * 10)  # Far future
+
+    return int(reset.timestamp())
 
 
 @dataclass
@@ -40,20 +107,235 @@ class RateLimitConfig:
     requests_per_day: Optional[int] = None
     tokens_per_minute: Optional[int] = None
     tokens_per_day: Optional[int] = None
+    max_concurrent_requests: Optional[int] = None
+
+
+# Multi-window rate limit check script.
+# KEYS[i] is the window key, ARGV = [now, member_prefix, limit_1,
+# window_1, inc_1, reset_1, pending_1, ...]. member_prefix is
+# "{now}:{request_token}", preformatted in Python. reset_i is the end of the
+# current bucket for fixed windows and 0 for sliding windows. pending_i is
+# the amount this process admitted locally and has not yet written to the
+# window; it counts towards the limit. Every window is checked first; counts
+# are only added when all windows pass, so a rejected request consumes
+# nothing. An allowed result is followed by each window's total after the
+# increment (pending included).
+_CHECK_MULTI_LUA = """
+    local now = tonumber(ARGV[1])
+    local member_prefix = ARGV[2] .. ':'
+    local trim_limit = 1000
+
+    local totals = {}
+
+    for i, key in ipairs(KEYS) do
+        local base = 2 + (i - 1) * 5
+        local limit = tonumber(ARGV[base + 1])
+        local window = tonumber(ARGV[base + 2])
+        local increment = tonumber(ARGV[base + 3])
+        local fixed_reset = tonumber(ARGV[base + 4])
+        local pending = tonumber(ARGV[base + 5])
+
+        local current
+        if fixed_reset > 0 then
+            current = tonumber(redis.call('GET', key) or 0)
+        else
+            -- Remove old entries and subtract their amounts. Expired
+            -- members are always the lowest ranks, so they are dropped by
+            -- rank, at most trim_limit per call to keep the script short;
+            -- any remainder is trimmed by the next calls.
+            local sum_key = key .. ':sum'
+            local expired = redis.call(
+                'ZRANGEBYSCORE', key, '-inf', now - window, 'LIMIT', 0, trim_limit
+            )
+            if #expired > 0 then
+                local removed = 0
+                for _, member in ipairs(expired) do
+                    removed = removed + tonumber(string.match(member, '(%d+)$'))
+                end
+                redis.call('ZREMRANGEBYRANK', key, 0, #expired - 1)
+                current = redis.call('DECRBY', sum_key, removed)
+                if current < 0 then
+                    redis.call('SET', sum_key, 0)
+                    current = 0
+                end
+            else
+                current = tonumber(redis.call('GET', sum_key) or 0)
+            end
+        end
+
+        current = current + pending
+        if current + increment > limit then
+            -- Rate limit exceeded
+            local reset_at = fixed_reset
+            if fixed_reset == 0 then
+                reset_at = now + window
+                local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+                if oldest[2] then
+                    reset_at = tonumber(oldest[2]) + window
+                end
+            end
+            return {i, 0, current, limit, reset_at}
+        end
+        totals[i] = current + increment
+    end
+
+    -- Add new entries
+    for i, key in ipairs(KEYS) do
+        local base = 2 + (i - 1) * 5
+        local window = tonumber(ARGV[base + 2])
+        local increment = tonumber(ARGV[base + 3])
+        local fixed_reset = tonumber(ARGV[base + 4])
+
+        if fixed_reset > 0 then
+            redis.call('INCRBY', key, increment)
+        else
+            local sum_key = key .. ':sum'
+            redis.call('ZADD', key, now, member_prefix .. increment)
+            redis.call('INCRBY', sum_key, increment)
+            redis.call('EXPIRE', sum_key, window + 1)
+        end
+        redis.call('EXPIRE', key, window + 1)
+    end
+
+    local result = {0, 1, 0, 0, now + 60}
+    for i = 1, #KEYS do
+        result[5 + i] = totals[i]
+    end
+    return result
+"""
+
+
+# Quota counters expire at the end of their period. EXPIREAT is only set
+# when INCRBY creates the counter, so later increments cost one command.
+_QUOTA_INCR_LUA = """
+    local function incr(key, amount, reset_at)
+        local value = redis.call('INCRBY', key, amount)
+        if value == amount then
+            redis.call('EXPIREAT', key, reset_at)
+        end
+        return value
+    end
+"""
+
+# Quota check-and-reserve script.
+# KEYS = [tokens_key, requests_key], ARGV = [max_tokens, max_requests,
+# tokens, requests, reset_at]. A limit of 0 disables that check. Both
+# counters are only incremented when both checks pass. Returns
+# {allowed, failed_check (1 = tokens, 2 = requests), current, limit}.
+_QUOTA_RESERVE_LUA = _QUOTA_INCR_LUA + """
+    local max_tokens = tonumber(ARGV[1])
+    local max_requests = tonumber(ARGV[2])
+    local tokens = tonumber(ARGV[3])
+    local requests = tonumber(ARGV[4])
+    local reset_at = tonumber(ARGV[5])
+
+    local current_tokens = tonumber(redis.call('GET', KEYS[1]) or 0)
+    if max_tokens > 0 and current_tokens + tokens > max_tokens then
+        return {0, 1, current_tokens, max_tokens}
+    end
+
+    local current_requests = tonumber(redis.call('GET', KEYS[2]) or 0)
+    if max_requests > 0 and current_requests + requests > max_requests then
+        return {0, 2, current_requests, max_requests}
+    end
+
+    if tokens > 0 then
+        current_tokens = incr(KEYS[1], tokens, reset_at)
+    end
+    if requests > 0 then
+        incr(KEYS[2], requests, reset_at)
+    end
+
+    return {1, 0, current_tokens, max_tokens}
+"""
+
+# Quota usage recording script.
+# KEYS = [tokens_key, requests_key], ARGV = [tokens, requests, reset_at].
+_QUOTA_RECORD_LUA = _QUOTA_INCR_LUA + """
+    local reset_at = tonumber(ARGV[3])
+    for i = 1, 2 do
+        local amount = tonumber(ARGV[i])
+        if amount > 0 then
+            incr(KEYS[i], amount, reset_at)
+        end
+    end
+    return 1
+"""
+
+
+# Concurrency slot acquisition script.
+# KEYS = [slots_key], ARGV = [now, slot_ttl, max_concurrent, slot_id].
+# Slots older than slot_ttl are treated as leaked (client gone without
+# releasing) and dropped. Returns 1 if the slot was taken, 0 if full.
+_ACQUIRE_SLOT_LUA = """
+    local now = tonumber(ARGV[1])
+    local ttl = tonumber(ARGV[2])
+
+    redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - ttl)
+    if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+        return 0
+    end
 
+    redis.call('ZADD', KEYS[1], now, ARGV[4])
+    redis.call('EXPIRE', KEYS[1], ttl)
+    return 1
+"""
+
+
+class _LuaScriptClient:
+    """Runs a class's LUA_SCRIPTS through EVALSHA with cached SHA1 digests."""
+
+    # Lua scripts loaded with SCRIPT LOAD and invoked through EVALSHA
+    LUA_SCRIPTS: Dict[str, str] = {}
+
+    redis: redis.Redis
+    _script_shas: Dict[str, str]
+
+    async def initialize(self) -> None:
+        """Initialize Lua scripts for atomic operations."""
+        for name, source in self.LUA_SCRIPTS.items():
+            self._script_shas[name] = await self.redis.script_load(source)
+
+    async def _eval_script(self, name: str, keys: List[str], args: List[Any]) -> Any:
+        """
+        Run a Lua script by SHA1.
+
+        The script is loaded on first use if initialize() has not run. If
+        Redis has lost its script cache (restart, SCRIPT FLUSH, failover),
+        the script is loaded again and the call is retried once.
+        """
+        sha = self._script_shas.get(name)
+        if sha is None:
+            sha = self._script_shas[name] = await self.redis.script_load(self.LUA_SCRIPTS[name])
 
-class RateLimiter:
+        try:
+            return await self.redis.evalsha(sha, len(keys), *keys, *args)
+        except NoScriptError:
+            sha = self._script_shas[name] = await self.redis.script_load(self.LUA_SCRIPTS[name])
+            return await self.redis.evalsha(sha, len(keys), *keys, *args)
+
+
+class RateLimiter(_LuaScriptClient):
     """
-    Redis-based rate limiter using sliding window algorithm.
+    Redis-based rate limiter.
+
+    Minute windows use a sliding window (sorted set of timestamps). Hour and
+    day windows use fixed-window counters, which need O(1) memory per key
+    instead of one sorted set member per request or token.
 
     Keys are structured as:
-        gateway:rl:{scope}:{identifier}:{window}:{bucket}
+        gateway:rl:{scope}:{identifier}:{window}[:{bucket}]
 
     Where:
         - scope: "key" | "tenant" | "global"
         - identifier: API key ID, tenant ID, or "global"
         - window: "rpm" | "rph" | "rpd" | "tpm" | "tpd"
-        - bucket: Current time bucket (minute/hour/day)
+        - bucket: Fixed-window index (now // duration), fixed windows only
+
+    A sliding window stores one sorted set member per request, formatted as
+    "{now}:{request_token}:{amount}", plus a "{key}:sum" counter that holds
+    the total amount inside the window. Limits are checked against the sum,
+    so a request costs O(1) regardless of its token count.
     """
 
     # Window configurations (name, duration_seconds, bucket_size_seconds)
@@ -65,45 +347,70 @@ class RateLimiter:
         "tpd": (86400, 3600),   # Tokens per day, 1-hour buckets
     }
 
-    def __init__(self, redis_client: redis.Redis, key_prefix: str = "gateway:rl"):
+    # Windows counted with a fixed-window INCRBY counter instead of a ZSET
+    FIXED_WINDOWS = frozenset({"rph", "rpd", "tpd"})
+
+    LUA_SCRIPTS = {
+        "check_multi": _CHECK_MULTI_LUA,
+        "acquire_slot": _ACQUIRE_SLOT_LUA,
+    }
+
+    # Upper bound on how long a concurrency slot is held if never released
+    CONCURRENCY_SLOT_TTL_SECONDS = 600
+
+    # Local admission (opt-in): after a minute window passes in Redis, this
+    # process may admit further requests for it in-process, within the same
+    # minute, up to a local budget of min(LOCAL_ADMISSION_RATIO x limit,
+    # limit - window total reported by that Redis check). Locally admitted
+    # amounts are written to Redis in the background, and until then they
+    # are sent along with every Redis check of the window as pending.
+    #
+    # Bounds: every Redis check sees the window total plus this process's
+    # unflushed amounts, and local admissions never exceed the headroom that
+    # check reported, so a single process cannot exceed the limit over any
+    # sliding minute. Other processes' unflushed amounts are invisible,
+    # though: with several processes the limit can be overshot by what the
+    # others admitted locally and have not flushed yet (up to
+    # LOCAL_ADMISSION_RATIO x limit each per Redis check, flushed every
+    # LOCAL_FLUSH_INTERVAL_SECONDS). Only enable it where that is acceptable.
+    LOCAL_WINDOWS = frozenset({"rpm", "tpm"})
+    LOCAL_ADMISSION_RATIO = 0.5
+    LOCAL_CACHE_MAX_SIZE = 4096
+    LOCAL_FLUSH_INTERVAL_SECONDS = 1.0
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        key_prefix: str = "gateway:rl",
+        local_admission: bool = False
+    ):
         self.redis = redis_client
         self.key_prefix = key_prefix
-        self._lua_scripts: Dict[str, Any] = {}
-
-    async def initialize(self) -> None:
-        """Initialize Lua scripts for atomic operations."""
-        # Sliding window rate limit check script
-        self._lua_scripts["check_and_increment"] = self.redis.register_script("""
-            local key = KEYS[1]
-            local limit = tonumber(ARGV[1])
-            local window = tonumber(ARGV[2])
-            local now = tonumber(ARGV[3])
-            local increment = tonumber(ARGV[4])
-
-            -- Remove old entries
-            redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
-
-            -- Get current count
-            local current = redis.call('ZCARD', key)
-
-            if current + increment > limit then
-                -- Rate limit exceeded
-                local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
-                local reset_at = now + window
-                if oldest[2] then
-                    reset_at = tonumber(oldest[2]) + window
-                end
-                return {0, current, limit, reset_at}
-            end
+        self._script_shas: Dict[str, str] = {}
+
+        self.local_admission = local_admission
+        # window key -> [minute, remaining local budget in that minute]
+        self._local_budgets: "OrderedDict[str, List[int]]" = OrderedDict()
+        # window key -> [window duration, locally admitted amount not yet in Redis]
+        self._local_pending: Dict[str, List[int]] = {}
+        # Pending amounts taken by a flush that has not completed yet
+        self._local_flushing: Dict[str, List[int]] = {}
+        self._local_flusher: Optional["asyncio.Task[None]"] = None
+
+    def _window_key(self, key_base: str, window_type: str, now: int) -> Tuple[str, int]:
+        """
+        Build the Redis key for a window.
 
-            -- Add new entries
-            for i = 1, increment do
-                redis.call('ZADD', key, now, now .. ':' .. i .. ':' .. math.random(1000000))
-            end
-            redis.call('EXPIRE', key, window + 1)
+        Returns:
+            (key, fixed_reset) where fixed_reset is the Unix time the current
+            fixed-window bucket ends, or 0 for sliding windows
+        """
+        if window_type not in self.FIXED_WINDOWS:
+            return f"{key_base}:{window_type}", 0
 
-            return {1, current + increment, limit, now + window}
-        """)
+        duration, _ = self.WINDOWS[window_type]
+        bucket = now // duration
+        return f"{key_base}:{window_type}:{bucket}", (bucket + 1) * duration
 
     async def check_rate_limit(
         self,
@@ -116,83 +423,48 @@ class RateLimiter:
         """
         Check rate limits for a request.
 
-        Checks in order:
-        1. API key limits
-        2. Tenant limits (if different from key limits)
-        3. Global limits
+        All configured windows for the API key (rpm, rph, rpd, tpm, tpd)
+        are checked and incremented by a single Lua script call, so the
+        whole check costs one Redis round trip. With local_admission
+        enabled, minute windows with local budget left are admitted
+        in-process and skip Redis (see LOCAL_ADMISSION_RATIO).
 
         Returns the first limit that is exceeded, or allows the request.
         """
         now = int(time.time())
 
-        # Check request limits
+        windows = []
         if request_count > 0:
-            # Requests per minute
             if config.requests_per_minute:
-                result = await self._check_window(
-                    scope="key",
-                    identifier=str(api_key_id),
-                    window_type="rpm",
-                    limit=config.requests_per_minute,
-                    increment=request_count,
-                    now=now
-                )
-                if not result.allowed:
-                    return result
-
-            # Requests per hour
+                windows.append(("rpm", config.requests_per_minute, request_count))
             if config.requests_per_hour:
-                result = await self._check_window(
-                    scope="key",
-                    identifier=str(api_key_id),
-                    window_type="rph",
-                    limit=config.requests_per_hour,
-                    increment=request_count,
-                    now=now
-                )
-                if not result.allowed:
-                    return result
-
-            # Requests per day
+                windows.append(("rph", config.requests_per_hour, request_count))
             if config.requests_per_day:
-                result = await self._check_window(
-                    scope="key",
-                    identifier=str(api_key_id),
-                    window_type="rpd",
-                    limit=config.requests_per_day,
-                    increment=request_count,
-                    now=now
-                )
-                if not result.allowed:
-                    return result
+                windows.append(("rpd", config.requests_per_day, request_count))
 
-        # Check token limits
         if token_count > 0:
-            # Tokens per minute
             if config.tokens_per_minute:
-                result = await self._check_window(
-                    scope="key",
-                    identifier=str(api_key_id),
-                    window_type="tpm",
-                    limit=config.tokens_per_minute,
-                    increment=token_count,
-                    now=now
-                )
-                if not result.allowed:
-                    return result
-
-            # Tokens per day
+                windows.append(("tpm", config.tokens_per_minute, token_count))
             if config.tokens_per_day:
-                result = await self._check_window(
-                    scope="key",
-                    identifier=str(api_key_id),
-                    window_type="tpd",
-                    limit=config.tokens_per_day,
-                    increment=token_count,
-                    now=now
-                )
-                if not result.allowed:
-                    return result
+                windows.append(("tpd", config.tokens_per_day, token_count))
+
+        key_base = _redis_key(self.key_prefix, "key", api_key_id)
+        local_windows: List[Tuple[str, int, int]] = []
+        if self.local_admission:
+            windows, local_windows = self._split_local_windows(key_base, windows, now // 60)
+
+        totals: List[int] = []
+        if windows:
+            result, totals = await self._check_windows(
+                key_base=key_base,
+                windows=windows,
+                now=now
+            )
+            if not result.allowed:
+                return result
+
+        if self.local_admission:
+            self._record_local_windows(key_base, windows, totals, local_windows, now // 60)
 
         # All limits passed
         return RateLimitResult(
@@ -202,38 +474,40 @@ class RateLimiter:
             reset_at=now + 60
         )
 
-    async def _check_window(
+    async def _check_windows(
         self,
-        scope: str,
-        identifier: str,
-        window_type: str,
-        limit: int,
-        increment: int,
+        key_base: str,
+        windows: List[Tuple[str, int, int]],
         now: int
-    ) -> RateLimitResult:
-        """Check a specific rate limit window."""
-        window_duration, _ = self.WINDOWS[window_type]
-        key = f"{self.key_prefix}:{scope}:{identifier}:{window_type}"
-
-        # Use Lua script for atomic check-and-increment
-        if "check_and_increment" in self._lua_scripts:
-            result = await self._lua_scripts["check_and_increment"](
-                keys=[key],
-                args=[limit, window_duration, now, increment]
-            )
-            allowed, current, limit_val, reset_at = result
-        else:
-            # Fallback without Lua (less accurate but works)
-            current = await self.redis.zcard(key)
-            if current + increment > limit:
-                allowed = 0
-                reset_at = now + window_duration
-            else:
-                allowed = 1
-                await self.redis.zadd(key, {f"{now}:{increment}": now})
-                await self.redis.expire(key, window_duration + 1)
-                reset_at = now + window_duration
-            limit_val = limit
+    ) -> Tuple[RateLimitResult, List[int]]:
+        """
+        Check and increment several rate limit windows at once.
+
+        Args:
+            key_base: Key prefix for the scope, "{prefix}:{scope}:{identifier}"
+            windows: (window_type, limit, increment) tuples
+            now: Current Unix timestamp
+
+        Returns:
+            (result, totals): the first exceeded window or an allowed result,
+            and for an allowed request each window's total after the increment
+        """
+        # Atomic check-and-increment; the script is loaded on first use
+        keys = []
+        args = [now, f"{now}:{uuid4().hex}"]
+        for window_type, limit, increment in windows:
+            key, fixed_reset = self._window_key(key_base, window_type, now)
+            keys.append(key)
+            args.extend((
+                limit,
+                self.WINDOWS[window_type][0],
+                increment,
+                fixed_reset,
+                self._pending_amount(key),
+            ))
+
+        reply = await self._eval_script("check_multi", keys, args)
+        index, allowed, current, limit_val, reset_at = reply[:5]
 
         if not allowed:
             retry_after = reset_at - now
@@ -243,14 +517,149 @@ class RateLimiter:
                 remaining=0,
                 reset_at=reset_at,
                 retry_after=retry_after,
-                reason=f"Rate limit exceeded for {window_type}"
-            )
+                reason=f"Rate limit exceeded for {windows[index - 1][0]}"
+            ), []
 
         return RateLimitResult(
             allowed=True,
-            limit=limit_val,
-            remaining=limit_val - current,
-            reset_at=reset_at
+            limit=0,
+            remaining=0,
+            reset_at=now + 60
+        ), [int(total) for total in reply[5:]]
+
+    def _pending_amount(self, key: str) -> int:
+        """Locally admitted amount for a window that Redis does not hold yet."""
+        amount = 0
+        for pending in (self._local_pending, self._local_flushing):
+            entry = pending.get(key)
+            if entry is not None:
+                amount += entry[1]
+        return amount
+
+    def _split_local_windows(
+        self,
+        key_base: str,
+        windows: List[Tuple[str, int, int]],
+        minute: int
+    ) -> Tuple[List[Tuple[str, int, int]], List[Tuple[str, int, int]]]:
+        """Split windows into (checked in Redis, admitted locally)."""
+        remote = []
+        local = []
+        for window in windows:
+            window_type, limit, increment = window
+            if window_type in self.LOCAL_WINDOWS:
+                entry = self._local_budgets.get(f"{key_base}:{window_type}")
+                if entry is not None and entry[0] == minute and increment <= entry[1]:
+                    local.append(window)
+                    continue
+            remote.append(window)
+        return remote, local
+
+    def _record_local_windows(
+        self,
+        key_base: str,
+        remote: List[Tuple[str, int, int]],
+        totals: List[int],
+        local: List[Tuple[str, int, int]],
+        minute: int
+    ) -> None:
+        """Update local budgets and pending amounts for an admitted request."""
+        for (window_type, limit, _), total in zip(remote, totals):
+            if window_type not in self.LOCAL_WINDOWS:
+                continue
+            # Fresh headroom from Redis, capped at this process's share
+            key = f"{key_base}:{window_type}"
+            budget = min(int(limit * self.LOCAL_ADMISSION_RATIO), limit - total)
+            self._local_budgets[key] = [minute, budget]
+            self._local_budgets.move_to_end(key)
+
+        for window_type, _, increment in local:
+            key = f"{key_base}:{window_type}"
+            self._local_budgets[key][1] -= increment
+            self._local_budgets.move_to_end(key)
+
+            pending = self._local_pending.get(key)
+            if pending is None:
+                self._local_pending[key] = [self.WINDOWS[window_type][0], increment]
+            else:
+                pending[1] += increment
+
+        while len(self._local_budgets) > self.LOCAL_CACHE_MAX_SIZE:
+            self._local_budgets.popitem(last=False)
+
+        if local and (self._local_flusher is None or self._local_flusher.done()):
+            self._local_flusher = asyncio.create_task(self._flush_local_periodically())
+
+    async def flush_local_counts(self) -> None:
+        """Write locally admitted amounts to their Redis windows in one pipeline."""
+        if not self._local_pending:
+            return
+
+        # Amounts being written still count as pending for concurrent checks
+        # until the pipeline has run
+        pending = self._local_flushing = self._local_pending
+        self._local_pending = {}
+        now = int(time.time())
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, (duration, amount) in pending.items():
+                    pipe.zadd(key, {f"{now}:{uuid4().hex}:{amount}": now})
+                    pipe.expire(key, duration + 1)
+                    pipe.incrby(f"{key}:sum", amount)
+                    pipe.expire(f"{key}:sum", duration + 1)
+                await pipe.execute()
+        finally:
+            self._local_flushing = {}
+
+    async def _flush_local_periodically(self) -> None:
+        """Background loop behind local admission."""
+        while True:
+            await asyncio.sleep(self.LOCAL_FLUSH_INTERVAL_SECONDS)
+            try:
+                await self.flush_local_counts()
+            except Exception:
+                # Redis unavailable; the next checks go through Redis anyway
+                pass
+
+    async def stop_local_flusher(self) -> None:
+        """Stop the background flusher and write any remaining local counts."""
+        if self._local_flusher is not None:
+            self._local_flusher.cancel()
+            self._local_flusher = None
+        await self.flush_local_counts()
+
+    async def acquire_concurrency_slot(
+        self,
+        api_key_id: UUID,
+        max_concurrent: int
+    ) -> Optional[str]:
+        """
+        Reserve one of max_concurrent in-flight request slots for a key.
+
+        Requests-per-minute does not bound long-running streams, which hold
+        upstream capacity for their whole duration. Callers acquire a slot
+        before starting the upstream call and release it in a finally block.
+        Slots that are never released expire after
+        CONCURRENCY_SLOT_TTL_SECONDS.
+
+        Returns:
+            Slot ID to pass to release_concurrency_slot(), or None if all
+            slots are taken
+        """
+        slot_id = secrets.token_hex(16)
+        acquired = await self._eval_script(
+            "acquire_slot",
+            [_redis_key(self.key_prefix, "key", api_key_id, "concurrent")],
+            [int(time.time()), self.CONCURRENCY_SLOT_TTL_SECONDS, max_concurrent, slot_id]
+        )
+        return slot_id if acquired else None
+
+    async def release_concurrency_slot(self, api_key_id: UUID, slot_id: str) -> None:
+        """Release a slot taken with acquire_concurrency_slot()."""
+        await self.redis.zrem(
+            _redis_key(self.key_prefix, "key", api_key_id, "concurrent"),
+            slot_id
         )
 
     async def record_tokens(
@@ -263,41 +672,63 @@ class RateLimiter:
         Record token usage after request completion.
 
         Called after streaming completes to record actual token usage.
+        All writes go out on one non-transactional pipeline.
         """
         now = int(time.time())
         total_tokens = prompt_tokens + completion_tokens
 
         if total_tokens > 0:
-            # Update token per minute counter
-            key_tpm = f"{self.key_prefix}:key:{api_key_id}:tpm"
-            await self.redis.zadd(key_tpm, {f"{now}:{total_tokens}": now})
-            await self.redis.expire(key_tpm, 61)
-
-            # Update token per day counter
-            key_tpd = f"{self.key_prefix}:key:{api_key_id}:tpd"
-            await self.redis.zadd(key_tpd, {f"{now}:{total_tokens}": now})
-            await self.redis.expire(key_tpd, 86401)
+            key_base = _redis_key(self.key_prefix, "key", api_key_id)
+            key_tpm = f"{key_base}:tpm"
+            key_tpd, _ = self._window_key(key_base, "tpd", now)
+
+            async with self.redis.pipeline(transaction=False) as pipe:
+                # Update token per minute window
+                pipe.zadd(key_tpm, {f"{now}:{uuid4().hex}:{total_tokens}": now})
+                pipe.expire(key_tpm, 61)
+                pipe.incrby(f"{key_tpm}:sum", total_tokens)
+                pipe.expire(f"{key_tpm}:sum", 61)
+
+                # Update token per day counter
+                pipe.incrby(key_tpd, total_tokens)
+                pipe.expire(key_tpd, 86401)
+                await pipe.execute()
 
     async def get_current_usage(
         self,
         api_key_id: UUID
     ) -> Dict[str, int]:
-        """Get current usage for all windows."""
+        """
+        Get current usage for all windows.
+
+        All reads are queued on one non-transactional pipeline, so the
+        lookup costs a single Redis round trip.
+        """
         now = int(time.time())
-        usage = {}
+        key_base = _redis_key(self.key_prefix, "key", api_key_id)
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for window_type, (duration, _) in self.WINDOWS.items():
+                key, fixed_reset = self._window_key(key_base, window_type, now)
+                if fixed_reset:
+                    pipe.get(key)
+                else:
+                    # Expired members are left for the check script, which
+                    # keeps the ":sum" counter in step when trimming.
+                    pipe.zrangebyscore(key, now - duration, "+inf")
+            results = await pipe.execute()
 
-        for window_type, (duration, _) in self.WINDOWS.items():
-            key = f"{self.key_prefix}:key:{api_key_id}:{window_type}"
-            # Remove old entries
-            await self.redis.zremrangebyscore(key, "-inf", now - duration)
-            # Get current count
-            count = await self.redis.zcard(key)
-            usage[window_type] = count
+        usage = {}
+        for window_type, value in zip(self.WINDOWS, results):
+            if window_type in self.FIXED_WINDOWS:
+                usage[window_type] = int(value or 0)
+            else:
+                usage[window_type] = sum(_member_amount(m) for m in value)
 
         return usage
 
 
-class QuotaManager:
+class QuotaManager(_LuaScriptClient):
     """
     Manages usage quotas for API keys.
 
@@ -305,9 +736,100 @@ class QuotaManager:
     Unlike rate limits, quotas track cumulative usage over a period.
     """
 
+    LUA_SCRIPTS = {
+        "reserve": _QUOTA_RESERVE_LUA,
+        "record": _QUOTA_RECORD_LUA,
+    }
+
     def __init__(self, redis_client: redis.Redis, key_prefix: str = "gateway:quota"):
         self.redis = redis_client
         self.key_prefix = key_prefix
+        self._script_shas: Dict[str, str] = {}
+
+    async def check_and_reserve(
+        self,
+        api_key_id: UUID,
+        quota_config: Dict[str, Any],
+        tokens_to_use: int = 0,
+        requests_to_use: int = 1
+    ) -> RateLimitResult:
+        """
+        Atomically check quota limits and reserve usage for a request.
+
+        Replaces a check_quota() + record_usage() pair on the request entry
+        path with one Lua script call. Concurrent requests cannot both pass
+        the check and overshoot the quota. If the request later fails,
+        hand the reservation back with release().
+
+        Args:
+            api_key_id: API key to check
+            quota_config: Quota configuration from API key
+            tokens_to_use: Estimated tokens for this request
+            requests_to_use: Number of requests (usually 1)
+
+        Returns:
+            RateLimitResult indicating if request is allowed
+        """
+        if not quota_config:
+            return RateLimitResult(allowed=True, limit=0, remaining=0, reset_at=0)
+
+        max_tokens = quota_config.get("max_tokens", 0)
+        max_requests = quota_config.get("max_requests", 0)
+        reset_interval = quota_config.get("reset_interval", "monthly")
+
+        period_key = self._get_period_key(reset_interval)
+        key_base = _redis_key(self.key_prefix, api_key_id, period_key)
+        reset_at = self._get_period_reset_time(reset_interval)
+
+        allowed, failed_check, current, limit = await self._eval_script(
+            "reserve",
+            [f"{key_base}:tokens", f"{key_base}:requests"],
+            [
+                max_tokens,
+                max_requests,
+                tokens_to_use,
+                requests_to_use,
+                reset_at,
+            ]
+        )
+
+        if not allowed:
+            return RateLimitResult(
+                allowed=False,
+                limit=limit,
+                remaining=max(0, limit - current),
+                reset_at=reset_at,
+                reason="Token quota exceeded" if failed_check == 1 else "Request quota exceeded"
+            )
+
+        return RateLimitResult(
+            allowed=True,
+            limit=max_tokens or max_requests,
+            remaining=max(0, max_tokens - current) if max_tokens else 0,
+            reset_at=reset_at
+        )
+
+    async def release(
+        self,
+        api_key_id: UUID,
+        quota_config: Dict[str, Any],
+        tokens_reserved: int = 0,
+        requests_reserved: int = 1
+    ) -> None:
+        """Return usage reserved by check_and_reserve() for a failed request."""
+        if not quota_config:
+            return
+
+        reset_interval = quota_config.get("reset_interval", "monthly")
+        period_key = self._get_period_key(reset_interval)
+        key_base = _redis_key(self.key_prefix, api_key_id, period_key)
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            if tokens_reserved > 0:
+                pipe.decrby(f"{key_base}:tokens", tokens_reserved)
+            if requests_reserved > 0:
+                pipe.decrby(f"{key_base}:requests", requests_reserved)
+            await pipe.execute()
 
     async def check_quota(
         self,
@@ -337,7 +859,7 @@ class QuotaManager:
 
         # Get current period key
         period_key = self._get_period_key(reset_interval)
-        key_base = f"{self.key_prefix}:{api_key_id}:{period_key}"
+        key_base = _redis_key(self.key_prefix, api_key_id, period_key)
 
         # Check token quota
         if max_tokens > 0:
@@ -382,72 +904,36 @@ class QuotaManager:
         tokens_used: int,
         requests_used: int = 1
     ) -> None:
-        """Record usage against quota."""
+        """
+        Record usage against quota.
+
+        Both counters are updated by one script call. Each counter gets
+        EXPIREAT at the period end when it is created, instead of an EXPIRE
+        on every write.
+        """
         if not quota_config:
             return
+        if tokens_used <= 0 and requests_used <= 0:
+            return
 
         reset_interval = quota_config.get("reset_interval", "monthly")
         period_key = self._get_period_key(reset_interval)
-        key_base = f"{self.key_prefix}:{api_key_id}:{period_key}"
-        ttl = self._get_period_ttl(reset_interval)
-
-        if tokens_used > 0:
-            token_key = f"{key_base}:tokens"
-            await self.redis.incrby(token_key, tokens_used)
-            await self.redis.expire(token_key, ttl)
-
-        if requests_used > 0:
-            request_key = f"{key_base}:requests"
-            await self.redis.incrby(request_key, requests_used)
-            await self.redis.expire(request_key, ttl)
+        key_base = _redis_key(self.key_prefix, api_key_id, period_key)
+
+        await self._eval_script(
+            "record",
+            [f"{key_base}:tokens", f"{key_base}:requests"],
+            [
+                max(tokens_used, 0),
+                max(requests_used, 0),
+                self._get_period_reset_time(reset_interval),
+            ]
+        )
 
     def _get_period_key(self, interval: str) -> str:
         """Get current period identifier."""
-        import datetime
-        now = datetime.datetime.utcnow()
-
-        if interval == "daily":
-            return now.strftime("%Y-%m-%d")
-        elif interval == "weekly":
-            return now.strftime("%Y-W%W")
-        elif interval == "monthly":
-            return now.strftime("%Y-%m")
-        else:
-            return "forever"
+        return _period_key(interval, int(time.time()) // 60)
 
     def _get_period_reset_time(self, interval: str) -> int:
         """Get Unix timestamp when current period resets."""
-        import datetime
-        now = datetime.datetime.utcnow()
-
-        if interval == "daily":
-            reset = (now + datetime.timedelta(days=1)).replace(
-                hour=0, minute=0, second=0, microsecond=0
-            )
-        elif interval == "weekly":
-            days_until_monday = (7 - now.weekday()) % 7 or 7
-            reset = (now + datetime.timedelta(days=days_until_monday)).replace(
-                hour=0, minute=0, second=0, microsecond=0
-            )
-        elif interval == "monthly":
-            if now.month == 12:
-                reset = now.replace(year=now.year + 1, month=1, day=1,
-                                    hour=0, minute=0, second=0, microsecond=0)
-            else:
-                reset = now.replace(month=now.month + 1, day=1,
-                                    hour=0, minute=0, second=0, microsecond=0)
-        else:
-            reset = now + datetime.timedelta(days=365 * 10)  # Far future
-
-        return int(reset.timestamp())
-
-    def _get_period_ttl(self, interval: str) -> int:
-        """Get TTL for current period keys."""
-        if interval == "daily":
-            return 86400 * 2  # 2 days
-        elif interval == "weekly":
-            return 86400 * 14  # 2 weeks
-        elif interval == "monthly":
-            return 86400 * 62  # ~2 months
-        else:
-            return 86400 * 365  # 1 year
+        return _period_reset_time(interval, int(time.time()) // 3600)
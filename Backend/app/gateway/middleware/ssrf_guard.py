@@ -7,19 +7,27 @@ for the gateway's upstream HTTP calls.
 Protection includes:
 - IP address validation against blocked CIDRs
 - DNS rebinding protection
+- Non-blocking DNS resolution with a short-lived cache
 - Redirect validation
 - Protocol restriction
 
 Reference: OWASP SSRF Prevention Cheat Sheet
 """
 
+import asyncio
 import ipaddress
 import socket
-from typing import List, Optional, Set, Tuple
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple, Union
 from urllib.parse import urlparse
 
 import httpx
 
+IPAddress = Union[ipaddress.IPv4Address, ipaddress.IPv6Address]
+IPNetwork = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
 
 class SSRFError(Exception):
     """Exception raised when SSRF protection is triggered."""
@@ -31,6 +39,58 @@ class SSRFError(Exception):
         self.resolved_ip = resolved_ip
 
 
+class _NetworkSet:
+    """
+    Set of IP networks with hashed longest-prefix lookup.
+
+    Networks are grouped by (version, prefix length) and keyed by their
+    network bits, so a lookup does one shift and one dict probe per distinct
+    prefix length instead of a Python-level scan over every network.
+    """
+
+    __slots__ = ("_tables",)
+
+    def __init__(self, networks: Iterable[IPNetwork]):
+        tables: Dict[int, Dict[int, Dict[int, IPNetwork]]] = {4: {}, 6: {}}
+        for network in networks:
+            shift = network.max_prefixlen - network.prefixlen
+            by_prefix = tables[network.version].setdefault(shift, {})
+            by_prefix.setdefault(int(network.network_address) >> shift, network)
+
+        # Longest prefix (smallest shift) first
+        self._tables = {
+            version: tuple(sorted(by_shift.items()))
+            for version, by_shift in tables.items()
+        }
+
+    def match(self, ip: IPAddress) -> Optional[IPNetwork]:
+        """Return the most specific network containing ip, if any."""
+        value = int(ip)
+        for shift, prefixes in self._tables[ip.version]:
+            network = prefixes.get(value >> shift)
+            if network is not None:
+                return network
+        return None
+
+
+@lru_cache(maxsize=256)
+def _host_allowlist(allow_hosts: Tuple[str, ...]) -> FrozenSet[str]:
+    """Lowercased hostname allowlist, built once per distinct list."""
+    return frozenset(host.lower() for host in allow_hosts)
+
+
+@lru_cache(maxsize=256)
+def _cidr_allowlist(allow_cidrs: Tuple[str, ...]) -> _NetworkSet:
+    """Parsed CIDR allowlist, built once per distinct list. Invalid CIDRs are skipped."""
+    networks = []
+    for cidr in allow_cidrs:
+        try:
+            networks.append(ipaddress.ip_network(cidr, strict=False))
+        except ValueError:
+            continue
+    return _NetworkSet(networks)
+
+
 class SSRFGuard:
     """
     SSRF protection for HTTP requests.
@@ -84,6 +144,11 @@ class SSRFGuard:
         "ff00::/8",         # Multicast
     ]
 
+    # Resolved addresses are reused for this long. Kept short so a DNS change
+    # (including a rebinding attempt) is picked up quickly.
+    DNS_CACHE_TTL_SECONDS = 30.0
+    DNS_CACHE_MAX_SIZE = 1024
+
     # Additional blocked hosts (cloud metadata endpoints)
     BLOCKED_HOSTS = {
         "metadata.google.internal",
@@ -116,13 +181,20 @@ class SSRFGuard:
                 self.blocked_networks.append(ipaddress.ip_network(cidr, strict=False))
             except ValueError:
                 pass  # Skip invalid CIDRs
+        self._blocked_set = _NetworkSet(self.blocked_networks)
 
-        # Blocked hosts
-        self.blocked_hosts = self.BLOCKED_HOSTS.copy()
-        if additional_blocked_hosts:
-            self.blocked_hosts.update(additional_blocked_hosts)
+        # Blocked hosts, lowercased once so lookups are case-insensitive
+        self.blocked_hosts = frozenset(
+            host.lower() for host in self.BLOCKED_HOSTS | (additional_blocked_hosts or set())
+        )
 
-    def validate_url(
+        # hostname -> (resolved IPs, expiry on the monotonic clock)
+        self._dns_cache: "OrderedDict[str, Tuple[List[str], float]]" = OrderedDict()
+        # (hostname, host allowlist, CIDR allowlist) -> (validated IPs, expiry).
+        # Entries never outlive the DNS answer they were validated against.
+        self._validated: "OrderedDict[Tuple[Any, ...], Tuple[List[str], float]]" = OrderedDict()
+
+    async def validate_url(
         self,
         url: str,
         allow_hosts: Optional[List[str]] = None,
@@ -142,6 +214,19 @@ class SSRFGuard:
         Raises:
             SSRFError: If URL fails validation
         """
+        return await self._validate_url(
+            url,
+            _host_allowlist(tuple(allow_hosts)) if allow_hosts is not None else None,
+            _cidr_allowlist(tuple(allow_cidrs)) if allow_cidrs is not None else None
+        )
+
+    async def _validate_url(
+        self,
+        url: str,
+        allow_hosts: Optional[FrozenSet[str]],
+        allow_networks: Optional[_NetworkSet]
+    ) -> Tuple[str, List[str]]:
+        """Validate a URL against precompiled host and CIDR allowlists."""
         parsed = urlparse(url)
 
         # 1. Validate scheme
@@ -164,9 +249,18 @@ class SSRFGuard:
                 url=url
             )
 
+        # Recently validated for the same allowlists: skip DNS and IP checks
+        cache_key = (hostname_lower, allow_hosts, allow_networks)
+        cached = self._validated.get(cache_key)
+        if cached is not None:
+            if cached[1] > time.monotonic():
+                self._validated.move_to_end(cache_key)
+                return url, cached[0]
+            del self._validated[cache_key]
+
         # 3. Resolve DNS and validate IPs
         try:
-            resolved_ips = self._resolve_hostname(hostname)
+            resolved_ips = await self._resolve_hostname(hostname)
         except socket.gaierror as e:
             raise SSRFError(
                 f"DNS resolution failed for {hostname}: {e}",
@@ -181,20 +275,32 @@ class SSRFGuard:
 
         # 4. Validate each resolved IP
         for ip_str in resolved_ips:
-            self._validate_ip(ip_str, url, allow_cidrs)
+            self._validate_ip_fast(ip_str, url, allow_networks)
 
         # 5. Check against allowlist if provided
         if allow_hosts is not None:
-            if hostname_lower not in [h.lower() for h in allow_hosts]:
+            if hostname_lower not in allow_hosts:
                 raise SSRFError(
                     f"Host {hostname} not in allowlist",
                     url=url
                 )
 
+        dns_entry = self._dns_cache.get(hostname)
+        expires = dns_entry[1] if dns_entry is not None else time.monotonic() + self.DNS_CACHE_TTL_SECONDS
+        self._validated[cache_key] = (resolved_ips, expires)
+        if len(self._validated) > self.DNS_CACHE_MAX_SIZE:
+            self._validated.popitem(last=False)
+
         return url, resolved_ips
 
-    def _resolve_hostname(self, hostname: str) -> List[str]:
-        """Resolve hostname to IP addresses."""
+    async def _resolve_hostname(self, hostname: str) -> List[str]:
+        """
+        Resolve hostname to IP addresses.
+
+        Uses the event loop's getaddrinfo (run in the default executor) so
+        DNS lookups never block the loop, and caches results for
+        DNS_CACHE_TTL_SECONDS in a bounded LRU.
+        """
         # Handle IP address literals
         try:
             ipaddress.ip_address(hostname)
@@ -202,21 +308,25 @@ class SSRFGuard:
         except ValueError:
             pass
 
-        # DNS resolution
-        results = []
-        try:
-            # Get both IPv4 and IPv6 addresses
-            infos = socket.getaddrinfo(
-                hostname, None,
-                socket.AF_UNSPEC,
-                socket.SOCK_STREAM
-            )
-            for info in infos:
-                ip = info[4][0]
-                if ip not in results:
-                    results.append(ip)
-        except socket.gaierror:
-            raise
+        now = time.monotonic()
+        cached = self._dns_cache.get(hostname)
+        if cached is not None:
+            if cached[1] > now:
+                self._dns_cache.move_to_end(hostname)
+                return cached[0]
+            del self._dns_cache[hostname]
+
+        # DNS resolution, both IPv4 and IPv6 addresses
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            hostname, None,
+            family=socket.AF_UNSPEC,
+            type=socket.SOCK_STREAM
+        )
+        results = list(dict.fromkeys(info[4][0] for info in infos))
+
+        self._dns_cache[hostname] = (results, now + self.DNS_CACHE_TTL_SECONDS)
+        if len(self._dns_cache) > self.DNS_CACHE_MAX_SIZE:
+            self._dns_cache.popitem(last=False)
 
         return results
 
@@ -227,6 +337,19 @@ class SSRFGuard:
         allow_cidrs: Optional[List[str]] = None
     ) -> None:
         """Validate an IP address against blocked ranges."""
+        self._validate_ip_fast(
+            ip_str,
+            url,
+            _cidr_allowlist(tuple(allow_cidrs)) if allow_cidrs is not None else None
+        )
+
+    def _validate_ip_fast(
+        self,
+        ip_str: str,
+        url: str,
+        allow_networks: Optional[_NetworkSet]
+    ) -> None:
+        """Validate an IP address against blocked ranges and a precompiled allowlist."""
         try:
             ip = ipaddress.ip_address(ip_str)
         except ValueError:
@@ -237,34 +360,24 @@ class SSRFGuard:
             )
 
         # Check against blocked networks
-        for network in self.blocked_networks:
-            if ip in network:
-                raise SSRFError(
-                    f"IP {ip_str} is in blocked range {network}",
-                    url=url,
-                    resolved_ip=ip_str
-                )
+        network = self._blocked_set.match(ip)
+        if network is not None:
+            raise SSRFError(
+                f"IP {ip_str} is in blocked range {network}",
+                url=url,
+                resolved_ip=ip_str
+            )
 
         # If allowlist provided, check against it
-        if allow_cidrs is not None:
-            allowed = False
-            for cidr in allow_cidrs:
-                try:
-                    network = ipaddress.ip_network(cidr, strict=False)
-                    if ip in network:
-                        allowed = True
-                        break
-                except ValueError:
-                    continue
-
-            if not allowed:
+        if allow_networks is not None:
+            if allow_networks.match(ip) is None:
                 raise SSRFError(
                     f"IP {ip_str} not in allowed CIDRs",
                     url=url,
                     resolved_ip=ip_str
                 )
 
-    def validate_redirect(
+    async def validate_redirect(
         self,
         original_url: str,
         redirect_url: str,
@@ -301,14 +414,18 @@ class SSRFGuard:
                 )
 
         # Validate the redirect URL
-        return self.validate_url(redirect_url, allow_hosts, allow_cidrs)
+        return await self.validate_url(redirect_url, allow_hosts, allow_cidrs)
 
 
 class SSRFProtectedTransport(httpx.AsyncHTTPTransport):
     """
     Custom httpx transport with SSRF protection.
 
-    Validates all request URLs and redirect targets before connecting.
+    Validates all request URLs and redirect targets before connecting, then
+    connects to the validated IP address itself. The Host header and the TLS
+    server name (SNI and certificate check) keep the original hostname, so
+    DNS is resolved once per request and a DNS rebind between validation
+    and connect cannot redirect the request to a blocked address.
     """
 
     def __init__(
@@ -323,16 +440,39 @@ class SSRFProtectedTransport(httpx.AsyncHTTPTransport):
         self.allow_hosts = allow_hosts
         self.allow_cidrs = allow_cidrs
 
+        # Allowlists are compiled once for the lifetime of the transport
+        self._allow_hosts = _host_allowlist(tuple(allow_hosts)) if allow_hosts is not None else None
+        self._allow_networks = _cidr_allowlist(tuple(allow_cidrs)) if allow_cidrs is not None else None
+
     async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
         """Handle request with SSRF validation."""
         # Validate URL before making request
-        self.ssrf_guard.validate_url(
+        _, resolved_ips = await self.ssrf_guard._validate_url(
             str(request.url),
-            self.allow_hosts,
-            self.allow_cidrs
+            self._allow_hosts,
+            self._allow_networks
         )
 
-        return await super().handle_async_request(request)
+        # Pin the connection to a validated address. Every resolved address
+        # passed validation, so when one cannot be reached (e.g. an IPv6
+        # answer on an IPv4-only host) the next one is tried in order.
+        hostname = request.url.host
+        original_url = request.url
+        if resolved_ips[0] != hostname:
+            if "Host" not in request.headers:
+                request.headers["Host"] = original_url.netloc.decode("ascii")
+            if original_url.scheme == "https":
+                request.extensions["sni_hostname"] = hostname
+
+        last_index = len(resolved_ips) - 1
+        for index, pinned_ip in enumerate(resolved_ips):
+            if pinned_ip != hostname:
+                request.url = original_url.copy_with(host=pinned_ip)
+            try:
+                return await super().handle_async_request(request)
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                if index == last_index:
+                    raise
 
 
 # Singleton guard instance
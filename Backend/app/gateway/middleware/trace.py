@@ -12,48 +12,130 @@ Features:
 """
 
 import contextvars
-import secrets
+import os
+import threading
 import time
-from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional
 from uuid import UUID
 
-# Context variables for request tracking
-request_id_var: contextvars.ContextVar[str] = contextvars.ContextVar("request_id")
+if TYPE_CHECKING:
+    from starlette.responses import Response
+
+# Context variables for request tracking (all have defaults, so .get()
+# never raises outside a request)
+request_id_var: contextvars.ContextVar[str] = contextvars.ContextVar("request_id", default="")
 trace_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("trace_id", default=None)
 request_context_var: contextvars.ContextVar[Optional["RequestContext"]] = contextvars.ContextVar(
     "request_context", default=None
 )
 
+# Random bytes for request/trace IDs are drawn from a buffer refilled with
+# one os.urandom() call per _ENTROPY_BUFFER_SIZE bytes, instead of one
+# urandom syscall per ID.
+_ENTROPY_BUFFER_SIZE = 4096
+_entropy = bytearray(os.urandom(_ENTROPY_BUFFER_SIZE))
+_entropy_pos = 0
+_entropy_lock = threading.Lock()
+
+
+def _refill_entropy() -> None:
+    """Replace the whole entropy buffer with fresh random bytes."""
+    global _entropy_pos
+    _entropy[:] = os.urandom(_ENTROPY_BUFFER_SIZE)
+    _entropy_pos = 0
+
+
+# Forked workers must not hand out the same bytes as their parent
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_refill_entropy)
+
+
+def _random_bytes(nbytes: int) -> bytes:
+    """Return nbytes of random data from the entropy buffer."""
+    global _entropy_pos
+    with _entropy_lock:
+        if _entropy_pos + nbytes > _ENTROPY_BUFFER_SIZE:
+            _refill_entropy()
+        start = _entropy_pos
+        _entropy_pos = start + nbytes
+        return bytes(_entropy[start:start + nbytes])
+
+
+def _random_hex(nbytes: int) -> str:
+    """Return nbytes of random data from the entropy buffer as hex."""
+    return _random_bytes(nbytes).hex()
+
 
-@dataclass
 class RequestContext:
-    """Context for a gateway request."""
-
-    request_id: str
-    trace_id: Optional[str]
-    start_time: float
-    tenant_id: Optional[UUID] = None
-    api_key_id: Optional[UUID] = None
-    endpoint: str = ""
-    virtual_model: Optional[str] = None
-    upstream_id: Optional[UUID] = None
-    upstream_model: Optional[str] = None
-    client_ip: Optional[str] = None
-    user_agent: Optional[str] = None
-    extra: Dict[str, Any] = field(default_factory=dict)
+    """
+    Context for a gateway request.
+
+    Slotted (no per-instance __dict__) since one is built per request. A
+    plain class rather than a dataclass: dataclass(slots=True) needs
+    Python 3.10 and explicit __slots__ cannot coexist with field defaults.
+    """
+
+    __slots__ = (
+        "request_id",
+        "trace_id",
+        "start_time",
+        "tenant_id",
+        "api_key_id",
+        "endpoint",
+        "virtual_model",
+        "upstream_id",
+        "upstream_model",
+        "client_ip",
+        "user_agent",
+        "extra",
+    )
+
+    def __init__(
+        self,
+        request_id: str,
+        trace_id: Optional[str],
+        start_time: float,
+        tenant_id: Optional[UUID] = None,
+        api_key_id: Optional[UUID] = None,
+        endpoint: str = "",
+        virtual_model: Optional[str] = None,
+        upstream_id: Optional[UUID] = None,
+        upstream_model: Optional[str] = None,
+        client_ip: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        extra: Optional[Dict[str, Any]] = None
+    ):
+        self.request_id = request_id
+        self.trace_id = trace_id
+        self.start_time = start_time
+        self.tenant_id = tenant_id
+        self.api_key_id = api_key_id
+        self.endpoint = endpoint
+        self.virtual_model = virtual_model
+        self.upstream_id = upstream_id
+        self.upstream_model = upstream_model
+        self.client_ip = client_ip
+        self.user_agent = user_agent
+        self.extra: Dict[str, Any] = {} if extra is None else extra
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"RequestContext({fields})"
 
 
 def generate_request_id() -> str:
     """
     Generate a unique request ID.
 
-    Format: req_<timestamp_hex>_<random>
-    Example: req_18d5b3f2_a7b9c4d2e1f0
+    Format: req_<timestamp_ms:12 hex><random:12 hex>
+    Example: req_018d5b3f2a10a7b9c4d2e1f0
+
+    The millisecond timestamp is packed big-endian into the same buffer
+    as the random bytes, so IDs still sort by creation time and the
+    whole ID is produced by a single hex conversion.
     """
-    timestamp = int(time.time() * 1000)
-    random_part = secrets.token_hex(6)
-    return f"req_{timestamp:x}_{random_part}"
+    buf = int(time.time() * 1000).to_bytes(6, "big") + _random_bytes(6)
+    return "req_" + buf.hex()
 
 
 def generate_trace_id() -> str:
@@ -62,31 +144,49 @@ def generate_trace_id() -> str:
 
     Format: 32 hex characters
     """
-    return secrets.token_hex(16)
+    return _random_hex(16)
+
+
+# traceparent validation (W3C Trace Context)
+_HEX_DIGITS = frozenset("0123456789abcdef")
+_INVALID_TRACE_ID = "0" * 32
+
+
+# Response header names as ASGI raw header keys (lowercase bytes), so
+# responses skip re-encoding the names on every request
+REQUEST_ID_HEADER_RAW = b"x-request-id"
+TRACE_ID_HEADER_RAW = b"x-trace-id"
+
+
+def add_trace_headers(
+    response: "Response",
+    request_id: str,
+    trace_id: Optional[str] = None
+) -> None:
+    """Append X-Request-ID (and X-Trace-ID if given) to a response's raw headers."""
+    response.raw_headers.append((REQUEST_ID_HEADER_RAW, request_id.encode("latin-1")))
+    if trace_id:
+        response.raw_headers.append((TRACE_ID_HEADER_RAW, trace_id.encode("latin-1")))
 
 
 def get_request_id() -> str:
-    """Get current request ID from context."""
-    try:
-        return request_id_var.get()
-    except LookupError:
-        return generate_request_id()
+    """
+    Get current request ID from context.
+
+    Returns "" outside a traced request; entry points that need an ID
+    call generate_request_id() themselves.
+    """
+    return request_id_var.get()
 
 
 def get_trace_id() -> Optional[str]:
     """Get current trace ID from context."""
-    try:
-        return trace_id_var.get()
-    except LookupError:
-        return None
+    return trace_id_var.get()
 
 
 def get_request_context() -> Optional[RequestContext]:
     """Get current request context."""
-    try:
-        return request_context_var.get()
-    except LookupError:
-        return None
+    return request_context_var.get()
 
 
 def set_request_context(ctx: RequestContext) -> contextvars.Token:
@@ -115,9 +215,21 @@ class TracingMiddleware:
     def __init__(self, otel_enabled: bool = False):
         self.otel_enabled = otel_enabled
         self._tracer = None
+        # OpenTelemetry is imported on first use of .tracer, not at construction
+        self._otel_initialized = not otel_enabled
 
-        if otel_enabled:
+    @property
+    def tracer(self) -> Optional[Any]:
+        """
+        OpenTelemetry tracer, or None when disabled or not installed.
+
+        Initialized once on first access. Hot paths should read it into a
+        local and check for None before starting spans.
+        """
+        if not self._otel_initialized:
+            self._otel_initialized = True
             self._init_otel()
+        return self._tracer
 
     def _init_otel(self) -> None:
         """Initialize OpenTelemetry tracer."""
@@ -166,13 +278,22 @@ class TracingMiddleware:
         Format: version-trace_id-parent_id-flags
         Example: 00-0af7651916cd43dd8448eb211c80319c-b9c7c989f97918e1-01
         """
-        try:
-            parts = traceparent.split("-")
-            if len(parts) >= 2:
-                return parts[1]
-        except Exception:
-            pass
-        return None
+        # Version 00 is exactly 55 characters with dashes at fixed offsets,
+        # so malformed or oversized headers fail in O(1) before any slicing
+        if (
+            len(traceparent) != 55
+            or traceparent[0] != "0"
+            or traceparent[1] != "0"
+            or traceparent[2] != "-"
+            or traceparent[35] != "-"
+            or traceparent[52] != "-"
+        ):
+            return None
+        trace_id = traceparent[3:35]
+        # The spec requires lowercase hex and forbids the all-zero ID
+        if trace_id == _INVALID_TRACE_ID or not _HEX_DIGITS.issuperset(trace_id):
+            return None
+        return trace_id
 
     def create_context(
         self,
@@ -194,6 +315,12 @@ class TracingMiddleware:
         set_request_context(ctx)
         return ctx
 
+    def apply_response_headers(self, response: "Response") -> None:
+        """Add the current request/trace IDs to a response's raw headers."""
+        ctx = get_request_context()
+        if ctx:
+            add_trace_headers(response, ctx.request_id, ctx.trace_id)
+
     def get_response_headers(self) -> Dict[str, str]:
         """Get headers to include in response."""
         ctx = get_request_context()
@@ -208,37 +335,47 @@ class TracingMiddleware:
 
 
 class RequestTimer:
-    """Timer for measuring request duration."""
+    """
+    Timer for measuring request duration.
+
+    Readings are integer nanoseconds from time.monotonic_ns() (immune to
+    wall-clock adjustments), so durations use integer arithmetic without
+    float rounding. Only differences between readings are meaningful.
+    """
+
+    __slots__ = ("start_time", "end_time", "first_token_time")
 
     def __init__(self):
-        self.start_time: Optional[float] = None
-        self.end_time: Optional[float] = None
-        self.first_token_time: Optional[float] = None
+        self.start_time: Optional[int] = None
+        self.end_time: Optional[int] = None
+        self.first_token_time: Optional[int] = None
 
     def start(self) -> None:
         """Start the timer."""
-        self.start_time = time.time()
+        self.start_time = time.monotonic_ns()
 
     def stop(self) -> None:
         """Stop the timer."""
-        self.end_time = time.time()
+        self.end_time = time.monotonic_ns()
 
     def record_first_token(self) -> None:
         """Record time to first token (for streaming)."""
         if self.first_token_time is None:
-            self.first_token_time = time.time()
+            self.first_token_time = time.monotonic_ns()
 
     @property
     def total_ms(self) -> Optional[int]:
         """Get total duration in milliseconds."""
         if self.start_time is None:
             return None
-        end = self.end_time or time.time()
-        return int((end - self.start_time) * 1000)
+        end = self.end_time
+        if end is None:
+            end = time.monotonic_ns()
+        return (end - self.start_time) // 1_000_000
 
     @property
     def ttft_ms(self) -> Optional[int]:
         """Get time to first token in milliseconds."""
         if self.start_time is None or self.first_token_time is None:
             return None
-        return int((self.first_token_time - self.start_time) * 1000)
+        return (self.first_token_time - self.start_time) // 1_000_000
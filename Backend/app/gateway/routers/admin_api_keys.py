@@ -8,10 +8,11 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from pydantic import BaseModel, Field
-from sqlalchemy import select, func
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pydantic import BaseModel, Field, field_validator
+from sqlalchemy import delete, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
 from app.core.database import get_db
 from app.core.dependencies import get_tenant_id, get_current_user
@@ -22,6 +23,10 @@ from app.gateway.middleware.auth import APIKeyGenerator
 
 router = APIRouter(prefix="/api/gateway/api-keys", tags=["gateway-admin"])
 
+# Response value for each stored payload mode (NULL rows report the default)
+_PAYLOAD_MODE_VALUES = {mode: mode.value for mode in LogPayloadMode}
+_PAYLOAD_MODE_VALUES[None] = LogPayloadMode.METADATA_ONLY.value
+
 
 # =============================================================================
 # Schemas
@@ -76,6 +81,26 @@ class APIKeyResponse(BaseModel):
     class Config:
         from_attributes = True
 
+    @field_validator("allowed_models", "allowed_endpoints", mode="before")
+    @classmethod
+    def default_empty_list(cls, v):
+        return [] if v is None else v
+
+    @field_validator("rate_limit", "quota", mode="before")
+    @classmethod
+    def default_empty_dict(cls, v):
+        return {} if v is None else v
+
+    @field_validator("log_payload_mode", mode="before")
+    @classmethod
+    def payload_mode_value(cls, v):
+        return _PAYLOAD_MODE_VALUES.get(v, v)
+
+
+# Columns APIKeyResponse reads; list queries load only these (key_hash and
+# the audit columns never leave the database)
+_RESPONSE_COLUMNS = tuple(getattr(GatewayAPIKey, name) for name in APIKeyResponse.model_fields)
+
 
 class APIKeyCreateResponse(BaseModel):
     """Schema for API key creation response (includes full key)."""
@@ -111,50 +136,46 @@ async def list_api_keys(
 ):
     """List all API keys for the current tenant."""
 
-    stmt = select(GatewayAPIKey).where(GatewayAPIKey.tenant_id == tenant_id)
+    filters = [GatewayAPIKey.tenant_id == tenant_id]
 
     if enabled is not None:
-        stmt = stmt.where(GatewayAPIKey.enabled == enabled)
+        filters.append(GatewayAPIKey.enabled == enabled)
     if search:
-        stmt = stmt.where(GatewayAPIKey.name.ilike(f"%{search}%"))
+        filters.append(GatewayAPIKey.name.ilike(f"%{search}%"))
+
+    # Paginate; the window count carries the filtered total on every row,
+    # saving a separate COUNT query
+    stmt = (
+        select(GatewayAPIKey, func.count().over().label("total"))
+        .options(load_only(*_RESPONSE_COLUMNS, raiseload=True))
+        .where(*filters)
+        .order_by(GatewayAPIKey.created_at.desc())
+        .offset((page - 1) * page_size)
+        .limit(page_size)
+    )
 
-    # Count total
-    count_stmt = select(func.count()).select_from(stmt.subquery())
-    total = (await db.execute(count_stmt)).scalar() or 0
+    rows = (await db.execute(stmt)).all()
 
-    # Paginate
-    stmt = stmt.order_by(GatewayAPIKey.created_at.desc())
-    stmt = stmt.offset((page - 1) * page_size).limit(page_size)
+    if rows:
+        total = rows[0].total
+    elif page > 1:
+        # Past the last page there are no rows to carry the total
+        count_stmt = select(func.count()).select_from(GatewayAPIKey).where(*filters)
+        total = (await db.execute(count_stmt)).scalar() or 0
+    else:
+        total = 0
 
-    result = await db.execute(stmt)
-    keys = result.scalars().all()
-
-    items = [
-        APIKeyResponse(
-            id=k.id,
-            name=k.name,
-            description=k.description,
-            key_prefix=k.key_prefix,
-            allowed_models=k.allowed_models or [],
-            allowed_endpoints=k.allowed_endpoints or [],
-            rate_limit=k.rate_limit or {},
-            quota=k.quota or {},
-            log_payload_mode=k.log_payload_mode.value if k.log_payload_mode else "metadata_only",
-            expires_at=k.expires_at,
-            enabled=k.enabled,
-            last_used_at=k.last_used_at,
-            created_at=k.created_at,
-            updated_at=k.updated_at
-        )
-        for k in keys
-    ]
+    items = [APIKeyResponse.model_validate(row.GatewayAPIKey) for row in rows]
 
-    return APIKeyListResponse(
+    # Serialize straight to JSON bytes in pydantic-core; returning a Response
+    # skips FastAPI's re-validation of the already-built model
+    response = APIKeyListResponse(
         items=items,
         total=total,
         page=page,
         page_size=page_size
     )
+    return Response(content=response.model_dump_json(), media_type="application/json")
 
 
 @router.post("", response_model=APIKeyCreateResponse, status_code=201)
@@ -192,6 +213,7 @@ async def create_api_key(
         description=data.description,
         key_prefix=prefix,
         key_hash=key_hash,
+        hash_version=APIKeyGenerator.HASH_VERSION,
         allowed_models=data.allowed_models,
         allowed_endpoints=data.allowed_endpoints,
         rate_limit=data.rate_limit,
@@ -223,32 +245,14 @@ async def get_api_key(
 ):
     """Get an API key by ID."""
 
-    stmt = select(GatewayAPIKey).where(
-        GatewayAPIKey.id == key_id,
-        GatewayAPIKey.tenant_id == tenant_id
-    )
-    result = await db.execute(stmt)
-    api_key = result.scalar_one_or_none()
+    # Primary-key lookup (served from the identity map when already loaded),
+    # with the tenant checked on the returned row.
+    api_key = await db.get(GatewayAPIKey, key_id)
 
-    if not api_key:
+    if not api_key or api_key.tenant_id != tenant_id:
         raise HTTPException(status_code=404, detail="API key not found")
 
-    return APIKeyResponse(
-        id=api_key.id,
-        name=api_key.name,
-        description=api_key.description,
-        key_prefix=api_key.key_prefix,
-        allowed_models=api_key.allowed_models or [],
-        allowed_endpoints=api_key.allowed_endpoints or [],
-        rate_limit=api_key.rate_limit or {},
-        quota=api_key.quota or {},
-        log_payload_mode=api_key.log_payload_mode.value if api_key.log_payload_mode else "metadata_only",
-        expires_at=api_key.expires_at,
-        enabled=api_key.enabled,
-        last_used_at=api_key.last_used_at,
-        created_at=api_key.created_at,
-        updated_at=api_key.updated_at
-    )
+    return APIKeyResponse.model_validate(api_key)
 
 
 @router.put("/{key_id}", response_model=APIKeyResponse)
@@ -260,40 +264,32 @@ async def update_api_key(
 ):
     """Update an API key."""
 
-    stmt = select(GatewayAPIKey).where(
-        GatewayAPIKey.id == key_id,
-        GatewayAPIKey.tenant_id == tenant_id
-    )
-    result = await db.execute(stmt)
-    api_key = result.scalar_one_or_none()
+    update_data = data.model_dump(exclude_unset=True)
+
+    if update_data:
+        # Single UPDATE ... RETURNING round trip instead of select + flush + refresh
+        stmt = (
+            update(GatewayAPIKey)
+            .where(
+                GatewayAPIKey.id == key_id,
+                GatewayAPIKey.tenant_id == tenant_id
+            )
+            .values(**update_data)
+            .returning(GatewayAPIKey)
+        )
+        result = await db.execute(stmt)
+        api_key = result.scalar_one_or_none()
+        if api_key:
+            await db.commit()
+    else:
+        api_key = await db.get(GatewayAPIKey, key_id)
+        if api_key and api_key.tenant_id != tenant_id:
+            api_key = None
 
     if not api_key:
         raise HTTPException(status_code=404, detail="API key not found")
 
-    # Update fields
-    update_data = data.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(api_key, key, value)
-
-    await db.commit()
-    await db.refresh(api_key)
-
-    return APIKeyResponse(
-        id=api_key.id,
-        name=api_key.name,
-        description=api_key.description,
-        key_prefix=api_key.key_prefix,
-        allowed_models=api_key.allowed_models or [],
-        allowed_endpoints=api_key.allowed_endpoints or [],
-        rate_limit=api_key.rate_limit or {},
-        quota=api_key.quota or {},
-        log_payload_mode=api_key.log_payload_mode.value if api_key.log_payload_mode else "metadata_only",
-        expires_at=api_key.expires_at,
-        enabled=api_key.enabled,
-        last_used_at=api_key.last_used_at,
-        created_at=api_key.created_at,
-        updated_at=api_key.updated_at
-    )
+    return APIKeyResponse.model_validate(api_key)
 
 
 @router.delete("/{key_id}", status_code=204)
@@ -304,17 +300,15 @@ async def delete_api_key(
 ):
     """Delete an API key."""
 
-    stmt = select(GatewayAPIKey).where(
+    stmt = delete(GatewayAPIKey).where(
         GatewayAPIKey.id == key_id,
         GatewayAPIKey.tenant_id == tenant_id
     )
     result = await db.execute(stmt)
-    api_key = result.scalar_one_or_none()
 
-    if not api_key:
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="API key not found")
 
-    await db.delete(api_key)
     await db.commit()
 
     return None
@@ -335,31 +329,35 @@ async def regenerate_api_key(
     IMPORTANT: The full key is only returned once in this response.
     """
 
-    stmt = select(GatewayAPIKey).where(
-        GatewayAPIKey.id == key_id,
-        GatewayAPIKey.tenant_id == tenant_id
+    # Generate new key
+    full_key, prefix, key_hash = APIKeyGenerator.generate()
+
+    stmt = (
+        update(GatewayAPIKey)
+        .where(
+            GatewayAPIKey.id == key_id,
+            GatewayAPIKey.tenant_id == tenant_id
+        )
+        .values(
+            key_prefix=prefix,
+            key_hash=key_hash,
+            hash_version=APIKeyGenerator.HASH_VERSION,
+            last_used_at=None  # Reset usage tracking
+        )
+        .returning(GatewayAPIKey.id, GatewayAPIKey.name, GatewayAPIKey.created_at)
     )
     result = await db.execute(stmt)
-    api_key = result.scalar_one_or_none()
+    row = result.one_or_none()
 
-    if not api_key:
+    if not row:
         raise HTTPException(status_code=404, detail="API key not found")
 
-    # Generate new key
-    full_key, prefix, key_hash = APIKeyGenerator.generate()
-
-    # Update key
-    api_key.key_prefix = prefix
-    api_key.key_hash = key_hash
-    api_key.last_used_at = None  # Reset usage tracking
-
     await db.commit()
-    await db.refresh(api_key)
 
     return APIKeyCreateResponse(
-        id=api_key.id,
-        name=api_key.name,
+        id=row.id,
+        name=row.name,
         key=full_key,
         key_prefix=prefix,
-        created_at=api_key.created_at
+        created_at=row.created_at
     )
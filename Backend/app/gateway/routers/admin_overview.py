@@ -4,18 +4,25 @@ Gateway Control Plane - Overview API.
 This module provides overview/statistics endpoint for the gateway dashboard.
 """
 
-from datetime import datetime, timedelta
+import sys
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 from pydantic import BaseModel
-from sqlalchemy import select, func, case, and_, text
+from sqlalchemy import ARRAY, Integer, select, func, and_, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.core.dependencies import get_tenant_id
-from app.models.gateway import GatewayRequest, GatewayUpstream
+from app.gateway.services.request_rollup import (
+    NO_UPSTREAM,
+    NO_VIRTUAL_MODEL,
+    histogram_percentile,
+)
+from app.models.gateway import GatewayRequestRollup, GatewayUpstream
 
 
 router = APIRouter(prefix="/api/gateway/overview", tags=["gateway-admin"])
@@ -57,6 +64,36 @@ class GatewayOverviewResponse(BaseModel):
     requests_by_hour: List[HourlyCount]
 
 
+# =============================================================================
+# Helpers
+# =============================================================================
+
+if sys.version_info >= (3, 11):
+    # fromisoformat accepts a trailing "Z" since Python 3.11
+    _fromisoformat = datetime.fromisoformat
+else:
+    def _fromisoformat(value: str) -> datetime:
+        if value.endswith("Z"):
+            value = value[:-1] + "+00:00"
+        return datetime.fromisoformat(value)
+
+
+def _parse_iso_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO 8601 query parameter, returning None if absent or invalid."""
+    if not value:
+        return None
+    try:
+        return _fromisoformat(value)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=256)
+def _hour_label(hour: datetime) -> str:
+    """ISO label for an hour bucket; successive dashboard polls reuse the same buckets."""
+    return hour.isoformat()
+
+
 # =============================================================================
 # Endpoints
 # =============================================================================
@@ -77,135 +114,111 @@ async def get_gateway_overview(
     - Token usage and costs
     - Top models and upstreams
     - Hourly request distribution
+
+    Figures are read from the hourly request rollups, so the range is
+    resolved to whole hours and P95 latency is a histogram estimate.
     """
-    # Parse date range
-    if end_date:
-        try:
-            end_dt = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-        except ValueError:
-            end_dt = datetime.utcnow()
-    else:
-        end_dt = datetime.utcnow()
-
-    if start_date:
-        try:
-            start_dt = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-        except ValueError:
-            start_dt = end_dt - timedelta(hours=24)
-    else:
-        start_dt = end_dt - timedelta(hours=24)
-
-    # Base filter for tenant and date range
+    # Parse date range (invalid or missing values fall back to the last 24h)
+    end_dt = _parse_iso_datetime(end_date) or datetime.now(timezone.utc)
+    start_dt = _parse_iso_datetime(start_date) or end_dt - timedelta(hours=24)
+
+    # Statistics come from the hourly rollups, so the range is widened to
+    # whole hours: the bucket containing start_dt through the one holding end_dt
     base_filter = and_(
-        GatewayRequest.tenant_id == tenant_id,
-        GatewayRequest.created_at >= start_dt,
-        GatewayRequest.created_at <= end_dt
+        GatewayRequestRollup.tenant_id == tenant_id,
+        GatewayRequestRollup.bucket_start >= start_dt.replace(minute=0, second=0, microsecond=0),
+        GatewayRequestRollup.bucket_start <= end_dt
     )
 
-    # 1. Get aggregate statistics
+    # 1. Aggregate statistics and the merged latency histogram
     stats_query = select(
-        func.count(GatewayRequest.id).label('total_requests'),
-        func.count(
-            case(
-                (GatewayRequest.error_type.isnot(None), 1),
-                (GatewayRequest.status_code >= 400, 1)
-            )
-        ).label('total_errors'),
-        func.coalesce(func.avg(GatewayRequest.latency_ms), 0).label('avg_latency_ms'),
-        func.coalesce(func.sum(GatewayRequest.total_tokens), 0).label('total_tokens'),
-        func.coalesce(func.sum(GatewayRequest.cost_usd), 0).label('total_cost_usd'),
+        func.coalesce(func.sum(GatewayRequestRollup.request_count), 0).label('total_requests'),
+        func.coalesce(func.sum(GatewayRequestRollup.error_count), 0).label('total_errors'),
+        func.coalesce(func.sum(GatewayRequestRollup.latency_count), 0).label('latency_count'),
+        func.coalesce(func.sum(GatewayRequestRollup.latency_sum_ms), 0).label('latency_sum_ms'),
+        func.gateway_int_array_sum(
+            GatewayRequestRollup.latency_histogram, type_=ARRAY(Integer)
+        ).label('latency_histogram'),
+        func.coalesce(func.sum(GatewayRequestRollup.total_tokens), 0).label('total_tokens'),
+        func.coalesce(func.sum(GatewayRequestRollup.cost_usd), 0).label('total_cost_usd'),
     ).where(base_filter)
 
-    stats_result = await db.execute(stats_query)
-    stats_row = stats_result.one()
-
-    total_requests = stats_row.total_requests or 0
-    total_errors = stats_row.total_errors or 0
-    avg_latency_ms = float(stats_row.avg_latency_ms or 0)
-    total_tokens = int(stats_row.total_tokens or 0)
-    total_cost_usd = float(stats_row.total_cost_usd or 0)
-
-    # Calculate error rate
-    error_rate = (total_errors / total_requests * 100) if total_requests > 0 else 0
-
-    # 2. Calculate P95 latency using percentile_cont
-    p95_latency_ms = 0.0
-    if total_requests > 0:
-        # Use percentile_cont for P95 calculation
-        p95_query = select(
-            func.percentile_cont(0.95).within_group(
-                GatewayRequest.latency_ms
-            ).label('p95_latency')
-        ).where(
-            and_(base_filter, GatewayRequest.latency_ms.isnot(None))
-        )
-        try:
-            p95_result = await db.execute(p95_query)
-            p95_row = p95_result.one_or_none()
-            if p95_row and p95_row.p95_latency:
-                p95_latency_ms = float(p95_row.p95_latency)
-        except Exception:
-            # Fallback: use simple approximation if percentile_cont not available
-            p95_latency_ms = avg_latency_ms * 1.5
-
-    # 3. Get top models
+    # 2. Top models
+    model_count = func.sum(GatewayRequestRollup.request_count)
     top_models_query = (
         select(
-            GatewayRequest.virtual_model.label('model'),
-            func.count(GatewayRequest.id).label('count')
+            GatewayRequestRollup.virtual_model.label('model'),
+            model_count.label('count')
         )
-        .where(and_(base_filter, GatewayRequest.virtual_model.isnot(None)))
-        .group_by(GatewayRequest.virtual_model)
-        .order_by(func.count(GatewayRequest.id).desc())
+        .where(and_(base_filter, GatewayRequestRollup.virtual_model != NO_VIRTUAL_MODEL))
+        .group_by(GatewayRequestRollup.virtual_model)
+        .order_by(model_count.desc())
         .limit(10)
     )
-    top_models_result = await db.execute(top_models_query)
-    top_models = [
-        ModelCount(model=row.model, count=row.count)
-        for row in top_models_result.all()
-    ]
 
-    # 4. Get top upstreams (with names)
+    # 3. Top upstreams (with names)
+    upstream_count = func.sum(GatewayRequestRollup.request_count)
     top_upstreams_query = (
         select(
             GatewayUpstream.name.label('upstream'),
-            func.count(GatewayRequest.id).label('count')
+            upstream_count.label('count')
         )
-        .select_from(GatewayRequest)
-        .join(GatewayUpstream, GatewayRequest.upstream_id == GatewayUpstream.id, isouter=True)
-        .where(and_(base_filter, GatewayRequest.upstream_id.isnot(None)))
+        .select_from(GatewayRequestRollup)
+        .join(GatewayUpstream, GatewayRequestRollup.upstream_id == GatewayUpstream.id, isouter=True)
+        .where(and_(base_filter, GatewayRequestRollup.upstream_id != NO_UPSTREAM))
         .group_by(GatewayUpstream.name)
-        .order_by(func.count(GatewayRequest.id).desc())
+        .order_by(upstream_count.desc())
         .limit(10)
     )
-    top_upstreams_result = await db.execute(top_upstreams_query)
-    top_upstreams = [
-        UpstreamCount(upstream=row.upstream or "Unknown", count=row.count)
-        for row in top_upstreams_result.all()
-    ]
 
-    # 5. Get requests by hour
-    # Use date_trunc for PostgreSQL - need to use literal_column for proper grouping
-    hour_trunc = func.date_trunc('hour', GatewayRequest.created_at)
+    # 4. Requests by hour
     requests_by_hour_query = (
         select(
-            hour_trunc.label('hour'),
-            func.count(GatewayRequest.id).label('count')
+            GatewayRequestRollup.bucket_start.label('hour'),
+            func.sum(GatewayRequestRollup.request_count).label('count')
         )
         .where(base_filter)
-        .group_by(hour_trunc)
-        .order_by(hour_trunc)
+        .group_by(GatewayRequestRollup.bucket_start)
+        .order_by(GatewayRequestRollup.bucket_start)
     )
-    requests_by_hour_result = await db.execute(requests_by_hour_query)
+
+    # The queries read the small rollup table, so they run one after another
+    # on the request's session rather than holding extra pooled connections
+    stats_row = (await db.execute(stats_query)).one()
+    top_models_rows = (await db.execute(top_models_query)).all()
+    top_upstreams_rows = (await db.execute(top_upstreams_query)).all()
+    requests_by_hour_rows = (await db.execute(requests_by_hour_query)).all()
+
+    total_requests = int(stats_row.total_requests or 0)
+    total_errors = int(stats_row.total_errors or 0)
+    latency_count = int(stats_row.latency_count or 0)
+    avg_latency_ms = float(stats_row.latency_sum_ms) / latency_count if latency_count else 0.0
+    p95_latency_ms = histogram_percentile(stats_row.latency_histogram or [], 0.95)
+    total_tokens = int(stats_row.total_tokens or 0)
+    total_cost_usd = float(stats_row.total_cost_usd or 0)
+
+    # Calculate error rate
+    error_rate = (total_errors / total_requests * 100) if total_requests > 0 else 0
+
+    top_models = [
+        ModelCount(model=row.model, count=int(row.count))
+        for row in top_models_rows
+    ]
+    top_upstreams = [
+        UpstreamCount(upstream=row.upstream or "Unknown", count=int(row.count))
+        for row in top_upstreams_rows
+    ]
     requests_by_hour = [
         HourlyCount(
-            hour=row.hour.isoformat() if row.hour else "",
-            count=row.count
+            hour=_hour_label(row.hour) if row.hour else "",
+            count=int(row.count)
         )
-        for row in requests_by_hour_result.all()
+        for row in requests_by_hour_rows
     ]
 
-    return GatewayOverviewResponse(
+    # Serialize straight to JSON bytes in pydantic-core; returning a Response
+    # skips FastAPI's re-validation of the already-built model
+    response = GatewayOverviewResponse(
         total_requests=total_requests,
         total_errors=total_errors,
         error_rate=round(error_rate, 2),
@@ -217,3 +230,4 @@ async def get_gateway_overview(
         top_upstreams=top_upstreams,
         requests_by_hour=requests_by_hour
     )
+    return Response(content=response.model_dump_json(), media_type="application/json")
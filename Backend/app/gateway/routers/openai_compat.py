@@ -22,13 +22,14 @@ from typing import Any, AsyncIterator, Dict, List, Optional
 from uuid import UUID
 
 import httpx
+import orjson
 from fastapi import APIRouter, Depends, Header, HTTPException, Request
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.gateway.adapters import AdapterError, RouteContext, get_adapter
+from app.gateway.adapters import AdapterError, LazyJSONBody, RouteContext, get_adapter
 from app.gateway.middleware import (
     AuthContext,
     AuthenticationError,
@@ -40,7 +41,7 @@ from app.gateway.middleware import (
     TracingMiddleware,
     RequestContext,
     RequestTimer,
-    get_ssrf_guard,
+    add_trace_headers,
     generate_request_id,
 )
 from app.gateway.routing import (
@@ -48,8 +49,8 @@ from app.gateway.routing import (
     RoutingContext,
     NoRouteFoundError,
     NoHealthyUpstreamError,
-    get_circuit_breaker_registry,
 )
+from app.gateway.services import request_rollup, routing_cache, upstream_clients
 from app.models.gateway import (
     GatewayUpstream,
     GatewayRoute,
@@ -66,6 +67,26 @@ router = APIRouter(prefix="/v1", tags=["gateway"])
 # Dependencies
 # =============================================================================
 
+async def read_json_body(request: Request) -> Any:
+    """
+    Parse the request's JSON body, once per request.
+
+    The auth dependency and the endpoint both need the body; the parsed
+    value is kept on request.state so the second caller reuses it.
+
+    Raises:
+        ValueError: If the body is not valid JSON
+    """
+    try:
+        return request.state.json_body
+    except AttributeError:
+        pass
+
+    body = orjson.loads(await request.body())
+    request.state.json_body = body
+    return body
+
+
 async def get_auth_context(
     request: Request,
     authorization: Optional[str] = Header(None),
@@ -80,7 +101,7 @@ async def get_auth_context(
         model = None
         if request.method == "POST":
             try:
-                body = await request.json()
+                body = await read_json_body(request)
                 model = body.get("model")
             except Exception:
                 pass
@@ -97,39 +118,8 @@ async def get_routing_engine(
     auth_ctx: AuthContext = Depends(get_auth_context),
     db: AsyncSession = Depends(get_db)
 ) -> RoutingEngine:
-    """Build routing engine with current routes and upstreams."""
-    tenant_id = auth_ctx.tenant_id
-
-    # Fetch routes
-    routes_stmt = select(GatewayRoute).where(
-        GatewayRoute.tenant_id == tenant_id,
-        GatewayRoute.enabled == True
-    ).order_by(GatewayRoute.priority)
-    routes_result = await db.execute(routes_stmt)
-    routes = list(routes_result.scalars().all())
-
-    # Fetch upstreams
-    upstreams_stmt = select(GatewayUpstream).where(
-        GatewayUpstream.tenant_id == tenant_id,
-        GatewayUpstream.enabled == True
-    )
-    upstreams_result = await db.execute(upstreams_stmt)
-    upstreams = {u.id: u for u in upstreams_result.scalars().all()}
-
-    # Fetch virtual models
-    models_stmt = select(GatewayVirtualModel).where(
-        GatewayVirtualModel.tenant_id == tenant_id,
-        GatewayVirtualModel.enabled == True
-    )
-    models_result = await db.execute(models_stmt)
-    virtual_models = {m.name: m for m in models_result.scalars().all()}
-
-    return RoutingEngine(
-        routes=routes,
-        upstreams=upstreams,
-        virtual_models=virtual_models,
-        circuit_breakers=get_circuit_breaker_registry()
-    )
+    """Get the routing engine for the tenant's current routes and upstreams."""
+    return await routing_cache.get_routing_engine_for_tenant(db, auth_ctx.tenant_id)
 
 
 # =============================================================================
@@ -147,16 +137,16 @@ async def get_upstream_credentials(
     from app.models.gateway import GatewaySecret
     from app.gateway.services.secret_manager import SecretManager
 
-    stmt = select(GatewaySecret).where(GatewaySecret.id == upstream.credentials_secret_id)
+    stmt = select(GatewaySecret.ciphertext).where(GatewaySecret.id == upstream.credentials_secret_id)
     result = await db.execute(stmt)
-    secret = result.scalar_one_or_none()
+    ciphertext = result.scalar_one_or_none()
 
-    if not secret:
+    if not ciphertext:
         return None
 
-    # Decrypt using secret manager
+    # Decrypt using secret manager (unchanged ciphertexts hit its cache)
     secret_manager = SecretManager()
-    return secret_manager.decrypt(secret.ciphertext)
+    return secret_manager.decrypt_cached(ciphertext)
 
 
 def build_route_context(
@@ -188,10 +178,30 @@ def build_route_context(
         upstream_credentials=credentials,
         inject_headers=transform.get("inject_headers", {}),
         model_override=transform.get("model_override"),
-        timeout_ms=action.get("timeout_ms_override", upstream.timeout_ms or 120000)
+        timeout_ms=action.get("timeout_ms_override", upstream.timeout_ms or 120000),
+        # Non-streaming results are re-serialized as-is, so adapters that
+        # support it may return the raw upstream body
+        extra={"passthrough_raw": True}
     )
 
 
+# Static headers for SSE responses (per-request IDs are appended separately)
+SSE_RESPONSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+}
+
+
+def build_json_response(result: Dict[str, Any], request_id: str) -> Response:
+    """Serialize an adapter result, forwarding raw upstream bytes when available."""
+    if isinstance(result, LazyJSONBody):
+        response = Response(content=result.raw, media_type="application/json")
+    else:
+        response = JSONResponse(content=result)
+    add_trace_headers(response, request_id)
+    return response
+
+
 async def execute_upstream_request(
     route_ctx: RouteContext,
     request_body: Dict[str, Any],
@@ -203,25 +213,21 @@ async def execute_upstream_request(
     # Build upstream request
     upstream_request = await adapter.build_upstream_request(request_body, route_ctx)
 
-    # Validate URL against SSRF
-    ssrf_guard = get_ssrf_guard()
-    ssrf_guard.validate_url(
-        upstream_request.url,
-        allow_hosts=upstream.allow_hosts,
-        allow_cidrs=upstream.allow_cidrs
-    )
-
-    # Execute request
-    async with httpx.AsyncClient(
+    if upstream_request.body:
+        content = orjson.dumps(upstream_request.body)
+    else:
+        content = upstream_request.content or None
+
+    # Execute request on the upstream's pooled client; the transport
+    # validates the URL against SSRF and connects to the validated address
+    client = upstream_clients.get_upstream_client(upstream)
+    response = await client.request(
+        method=upstream_request.method,
+        url=upstream_request.url,
+        headers=upstream_request.headers,
+        content=content,
         timeout=httpx.Timeout(route_ctx.timeout_ms / 1000)
-    ) as client:
-        response = await client.request(
-            method=upstream_request.method,
-            url=upstream_request.url,
-            headers=upstream_request.headers,
-            json=upstream_request.body if upstream_request.body else None,
-            content=upstream_request.content if upstream_request.content else None
-        )
+    )
 
     return response
 
@@ -238,48 +244,44 @@ async def stream_response(
     # Build upstream request
     upstream_request = await adapter.build_upstream_request(request_body, route_ctx)
 
-    # Validate URL
-    ssrf_guard = get_ssrf_guard()
-    ssrf_guard.validate_url(
-        upstream_request.url,
-        allow_hosts=upstream.allow_hosts,
-        allow_cidrs=upstream.allow_cidrs
-    )
-
-    async with httpx.AsyncClient(
+    # Stream on the upstream's pooled client; the transport validates the
+    # URL against SSRF and connects to the validated address
+    client = upstream_clients.get_upstream_client(upstream)
+    async with client.stream(
+        method=upstream_request.method,
+        url=upstream_request.url,
+        headers=upstream_request.headers,
+        content=(
+            orjson.dumps(upstream_request.body)
+            if upstream_request.body is not None else None
+        ),
         timeout=httpx.Timeout(route_ctx.timeout_ms / 1000)
-    ) as client:
-        async with client.stream(
-            method=upstream_request.method,
-            url=upstream_request.url,
-            headers=upstream_request.headers,
-            json=upstream_request.body
-        ) as response:
-            if response.status_code >= 400:
-                error_body = await response.aread()
-                try:
-                    error_json = json.loads(error_body)
-                    error_msg = error_json.get("error", {}).get("message", "Unknown error")
-                except Exception:
-                    error_msg = error_body.decode()
-                raise AdapterError(
-                    message=error_msg,
-                    status_code=response.status_code
-                )
-
-            first_chunk = True
-            async for chunk in adapter.stream_translate(
-                response.aiter_bytes(),
-                route_ctx
-            ):
-                if first_chunk:
-                    timer.record_first_token()
-                    first_chunk = False
-
-                if chunk == "[DONE]":
-                    yield "data: [DONE]\n\n"
-                else:
-                    yield f"data: {chunk}\n\n"
+    ) as response:
+        if response.status_code >= 400:
+            error_body = await response.aread()
+            try:
+                error_json = json.loads(error_body)
+                error_msg = error_json.get("error", {}).get("message", "Unknown error")
+            except Exception:
+                error_msg = error_body.decode()
+            raise AdapterError(
+                message=error_msg,
+                status_code=response.status_code
+            )
+
+        first_chunk = True
+        async for chunk in adapter.stream_translate(
+            response.aiter_bytes(),
+            route_ctx
+        ):
+            if first_chunk:
+                timer.record_first_token()
+                first_chunk = False
+
+            if chunk == "[DONE]":
+                yield "data: [DONE]\n\n"
+            else:
+                yield f"data: {chunk}\n\n"
 
 
 async def log_request(
@@ -324,6 +326,15 @@ async def log_request(
         )
         db.add(log_entry)
         await db.commit()
+        request_rollup.record_request(
+            tenant_id=auth_ctx.tenant_id,
+            virtual_model=virtual_model,
+            upstream_id=log_entry.upstream_id,
+            status_code=status_code,
+            error_type=error_type,
+            latency_ms=log_entry.latency_ms,
+            total_tokens=log_entry.total_tokens
+        )
     except Exception:
         # Don't fail request on logging error
         pass
@@ -354,7 +365,7 @@ async def chat_completions(
     endpoint = "/v1/chat/completions"
 
     try:
-        body = await request.json()
+        body = await read_json_body(request)
     except Exception:
         raise HTTPException(status_code=400, detail={
             "error": {"message": "Invalid JSON body", "type": "invalid_request_error"}
@@ -396,15 +407,13 @@ async def chat_completions(
 
         if stream:
             # Streaming response
-            return StreamingResponse(
+            streaming = StreamingResponse(
                 stream_response(route_ctx, body, selected.upstream, timer),
                 media_type="text/event-stream",
-                headers={
-                    "X-Request-ID": request_id,
-                    "Cache-Control": "no-cache",
-                    "Connection": "keep-alive",
-                }
+                headers=SSE_RESPONSE_HEADERS
             )
+            add_trace_headers(streaming, request_id)
+            return streaming
         else:
             # Non-streaming response
             response = await execute_upstream_request(route_ctx, body, selected.upstream)
@@ -431,10 +440,7 @@ async def chat_completions(
                 usage=usage
             )
 
-            return JSONResponse(
-                content=result,
-                headers={"X-Request-ID": request_id}
-            )
+            return build_json_response(result, request_id)
 
     except NoRouteFoundError as e:
         timer.stop()
@@ -488,7 +494,7 @@ async def embeddings(
     endpoint = "/v1/embeddings"
 
     try:
-        body = await request.json()
+        body = await read_json_body(request)
     except Exception:
         raise HTTPException(status_code=400, detail={
             "error": {"message": "Invalid JSON body", "type": "invalid_request_error"}
@@ -538,10 +544,7 @@ async def embeddings(
             timer=timer, usage=usage
         )
 
-        return JSONResponse(
-            content=result,
-            headers={"X-Request-ID": request_id}
-        )
+        return build_json_response(result, request_id)
 
     except (NoRouteFoundError, NoHealthyUpstreamError, AdapterError) as e:
         timer.stop()
@@ -572,7 +575,7 @@ async def images_generations(
     endpoint = "/v1/images/generations"
 
     try:
-        body = await request.json()
+        body = await read_json_body(request)
     except Exception:
         raise HTTPException(status_code=400, detail={
             "error": {"message": "Invalid JSON body", "type": "invalid_request_error"}
@@ -606,6 +609,9 @@ async def images_generations(
         response = await execute_upstream_request(route_ctx, body, selected.upstream)
         adapter = get_adapter(selected.upstream.type.value)
         result = await adapter.parse_upstream_response(response, route_ctx)
+        # Image responses can be tens of MB; release the raw upstream body
+        # now that the base64 strings have been moved into the result
+        del response
 
         timer.stop()
 
@@ -617,10 +623,7 @@ async def images_generations(
             timer=timer
         )
 
-        return JSONResponse(
-            content=result,
-            headers={"X-Request-ID": request_id}
-        )
+        return build_json_response(result, request_id)
 
     except (NoRouteFoundError, NoHealthyUpstreamError, AdapterError) as e:
         timer.stop()
@@ -652,7 +655,7 @@ async def rerank(
     endpoint = "/v1/rerank"
 
     try:
-        body = await request.json()
+        body = await read_json_body(request)
     except Exception:
         raise HTTPException(status_code=400, detail={
             "error": {"message": "Invalid JSON body", "type": "invalid_request_error"}
@@ -701,10 +704,7 @@ async def rerank(
             timer=timer
         )
 
-        return JSONResponse(
-            content=result,
-            headers={"X-Request-ID": request_id}
-        )
+        return build_json_response(result, request_id)
 
     except (NoRouteFoundError, NoHealthyUpstreamError, AdapterError) as e:
         timer.stop()
@@ -736,11 +736,7 @@ async def list_models(
 
     # Filter by allowed models if key has restrictions
     if auth_ctx.allowed_models:
-        import fnmatch
-        models = [
-            m for m in models
-            if any(fnmatch.fnmatch(m.name, pattern) for pattern in auth_ctx.allowed_models)
-        ]
+        models = [m for m in models if auth_ctx.allows_model(m.name)]
 
     # Format response
     data = []
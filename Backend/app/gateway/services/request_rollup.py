@@ -0,0 +1,221 @@
+"""
+Request Rollup Service.
+
+This module maintains the gateway_request_rollups table: hourly aggregates
+of gateway requests per (tenant, virtual model, upstream) that back the
+overview dashboard.
+
+Requests are counted in-process and written in bulk with an additive
+INSERT ... ON CONFLICT DO UPDATE, so several gateway workers can flush
+into the same rows without coordination.
+"""
+
+import asyncio
+import math
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.database import async_session_factory
+from app.models.gateway import GatewayRequestRollup
+
+
+# Histogram layout, shared with the 20260120_0001 migration: bucket i
+# covers [2^(i/8) - 1, 2^((i+1)/8) - 1) ms, i.e. ~9% wide, and the last
+# bucket (from ~17 minutes up) is open-ended
+LATENCY_BUCKETS = 160
+LATENCY_BUCKETS_PER_DOUBLING = 8
+
+# Sentinels for missing dimensions (they are part of the primary key)
+NO_VIRTUAL_MODEL = ""
+NO_UPSTREAM = UUID(int=0)
+
+ROLLUP_FLUSH_INTERVAL_SECONDS = 10.0
+
+_RollupKey = Tuple[UUID, datetime, str, UUID]
+
+
+class _RollupCounts:
+    """Pending increments for one rollup row."""
+
+    __slots__ = (
+        "request_count", "error_count", "latency_count", "latency_sum_ms",
+        "latency_histogram", "total_tokens", "cost_usd",
+    )
+
+    def __init__(self):
+        self.request_count = 0
+        self.error_count = 0
+        self.latency_count = 0
+        self.latency_sum_ms = 0
+        self.latency_histogram: List[int] = [0] * LATENCY_BUCKETS
+        self.total_tokens = 0
+        self.cost_usd = Decimal(0)
+
+    def merge(self, other: "_RollupCounts") -> None:
+        """Add another set of pending increments into this one."""
+        self.request_count += other.request_count
+        self.error_count += other.error_count
+        self.latency_count += other.latency_count
+        self.latency_sum_ms += other.latency_sum_ms
+        self.latency_histogram = [
+            a + b for a, b in zip(self.latency_histogram, other.latency_histogram)
+        ]
+        self.total_tokens += other.total_tokens
+        self.cost_usd += other.cost_usd
+
+
+_pending: Dict[_RollupKey, _RollupCounts] = {}
+_flusher: Optional["asyncio.Task[None]"] = None
+
+
+def latency_bucket(latency_ms: int) -> int:
+    """Map a latency to its histogram bucket index."""
+    if latency_ms <= 0:
+        return 0
+    return min(
+        LATENCY_BUCKETS - 1,
+        int(LATENCY_BUCKETS_PER_DOUBLING * math.log2(latency_ms + 1))
+    )
+
+
+def histogram_percentile(histogram: Sequence[int], q: float) -> float:
+    """
+    Estimate the q-th quantile (0..1) of a latency histogram.
+
+    Returns the geometric midpoint of the bucket holding the quantile, so
+    the estimate is within about 5% of the true value.
+    """
+    total = sum(histogram)
+    if total <= 0:
+        return 0.0
+
+    target = q * total
+    cumulative = 0
+    for index, count in enumerate(histogram):
+        cumulative += count
+        if count and cumulative >= target:
+            return 2 ** ((index + 0.5) / LATENCY_BUCKETS_PER_DOUBLING) - 1
+    return 2 ** ((len(histogram) - 0.5) / LATENCY_BUCKETS_PER_DOUBLING) - 1
+
+
+def record_request(
+    tenant_id: UUID,
+    virtual_model: Optional[str],
+    upstream_id: Optional[UUID],
+    status_code: Optional[int],
+    error_type: Optional[str],
+    latency_ms: Optional[int],
+    total_tokens: Optional[int] = None,
+    cost_usd: Optional[Decimal] = None
+) -> None:
+    """Count a request into its hourly rollup and make sure the flusher is running."""
+    global _flusher
+
+    bucket_start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    key = (
+        tenant_id,
+        bucket_start,
+        virtual_model or NO_VIRTUAL_MODEL,
+        upstream_id or NO_UPSTREAM,
+    )
+    counts = _pending.get(key)
+    if counts is None:
+        counts = _pending[key] = _RollupCounts()
+
+    counts.request_count += 1
+    if error_type is not None or (status_code is not None and status_code >= 400):
+        counts.error_count += 1
+    if latency_ms is not None:
+        counts.latency_count += 1
+        counts.latency_sum_ms += latency_ms
+        counts.latency_histogram[latency_bucket(latency_ms)] += 1
+    if total_tokens:
+        counts.total_tokens += total_tokens
+    if cost_usd:
+        counts.cost_usd += cost_usd
+
+    if _flusher is None or _flusher.done():
+        _flusher = asyncio.create_task(_flush_periodically())
+
+
+async def flush_rollups() -> None:
+    """Add all pending counts to gateway_request_rollups with one upsert."""
+    if not _pending:
+        return
+
+    pending = list(_pending.items())
+    _pending.clear()
+
+    rows = [
+        {
+            "tenant_id": tenant_id,
+            "bucket_start": bucket_start,
+            "virtual_model": virtual_model,
+            "upstream_id": upstream_id,
+            "request_count": counts.request_count,
+            "error_count": counts.error_count,
+            "latency_count": counts.latency_count,
+            "latency_sum_ms": counts.latency_sum_ms,
+            "latency_histogram": counts.latency_histogram,
+            "total_tokens": counts.total_tokens,
+            "cost_usd": counts.cost_usd,
+        }
+        for (tenant_id, bucket_start, virtual_model, upstream_id), counts in pending
+    ]
+
+    table = GatewayRequestRollup.__table__
+    stmt = insert(table).values(rows)
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["tenant_id", "bucket_start", "virtual_model", "upstream_id"],
+        set_={
+            "request_count": table.c.request_count + excluded.request_count,
+            "error_count": table.c.error_count + excluded.error_count,
+            "latency_count": table.c.latency_count + excluded.latency_count,
+            "latency_sum_ms": table.c.latency_sum_ms + excluded.latency_sum_ms,
+            "latency_histogram": func.gateway_int_array_add(
+                table.c.latency_histogram, excluded.latency_histogram
+            ),
+            "total_tokens": table.c.total_tokens + excluded.total_tokens,
+            "cost_usd": table.c.cost_usd + excluded.cost_usd,
+        },
+    )
+
+    try:
+        async with async_session_factory() as session:
+            await session.execute(stmt)
+            await session.commit()
+    except Exception:
+        # Put the counts back so the next flush retries them
+        for key, counts in pending:
+            existing = _pending.get(key)
+            if existing is None:
+                _pending[key] = counts
+            else:
+                existing.merge(counts)
+        raise
+
+
+async def _flush_periodically() -> None:
+    """Background loop behind record_request()."""
+    while True:
+        await asyncio.sleep(ROLLUP_FLUSH_INTERVAL_SECONDS)
+        try:
+            await flush_rollups()
+        except Exception:
+            # Counts stay buffered and are retried on the next tick
+            pass
+
+
+async def stop_rollup_flusher() -> None:
+    """Stop the background flusher and write any remaining counts."""
+    global _flusher
+    if _flusher is not None:
+        _flusher.cancel()
+        _flusher = None
+    await flush_rollups()
@@ -0,0 +1,114 @@
+"""
+Routing Engine Cache.
+
+Building a RoutingEngine loads every enabled route, upstream and virtual
+model of a tenant. This module keeps the built engine per tenant and only
+rebuilds it when the tenant's routing_version (gateway_tenant_configs) has
+moved, so a gateway request normally costs one primary-key lookup instead
+of three table scans.
+
+Every write to a tenant's routing inputs must call bump_routing_version()
+in the same transaction; the version then moves for all gateway workers
+exactly when the new data becomes visible. Writes that bypass the API
+(manual SQL, scripts) do not bump it, so an engine is also rebuilt once it
+is older than ROUTING_CACHE_TTL_SECONDS.
+"""
+
+import time
+from typing import Dict, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import async_session_factory
+from app.gateway.routing import RoutingEngine, get_circuit_breaker_registry
+from app.models.gateway import (
+    GatewayRoute,
+    GatewayTenantConfig,
+    GatewayUpstream,
+    GatewayVirtualModel,
+)
+
+
+ROUTING_CACHE_TTL_SECONDS = 60.0
+
+# tenant_id -> (routing_version, expires_at, engine)
+_engines: Dict[UUID, Tuple[int, float, RoutingEngine]] = {}
+
+
+async def get_routing_version(db: AsyncSession, tenant_id: UUID) -> int:
+    """Current routing version of a tenant (0 until its first routing change)."""
+    stmt = select(GatewayTenantConfig.routing_version).where(
+        GatewayTenantConfig.tenant_id == tenant_id
+    )
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none() or 0
+
+
+async def bump_routing_version(db: AsyncSession, tenant_id: UUID) -> None:
+    """Invalidate cached routing engines for a tenant once the caller commits."""
+    table = GatewayTenantConfig.__table__
+    stmt = insert(table).values(tenant_id=tenant_id, routing_version=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["tenant_id"],
+        set_={"routing_version": table.c.routing_version + 1, "updated_at": func.now()},
+    )
+    await db.execute(stmt)
+
+
+async def _build_routing_engine(tenant_id: UUID) -> RoutingEngine:
+    """
+    Load a tenant's routing inputs and build the engine.
+
+    Uses a dedicated session: the loaded instances outlive the request and
+    are shared by concurrent requests, so they must not belong to (and be
+    expired by a rollback of) any request's session.
+    """
+    async with async_session_factory() as session:
+        # Fetch routes
+        routes_stmt = select(GatewayRoute).where(
+            GatewayRoute.tenant_id == tenant_id,
+            GatewayRoute.enabled == True
+        ).order_by(GatewayRoute.priority)
+        routes_result = await session.execute(routes_stmt)
+        routes = list(routes_result.scalars().all())
+
+        # Fetch upstreams
+        upstreams_stmt = select(GatewayUpstream).where(
+            GatewayUpstream.tenant_id == tenant_id,
+            GatewayUpstream.enabled == True
+        )
+        upstreams_result = await session.execute(upstreams_stmt)
+        upstreams = {u.id: u for u in upstreams_result.scalars().all()}
+
+        # Fetch virtual models
+        models_stmt = select(GatewayVirtualModel).where(
+            GatewayVirtualModel.tenant_id == tenant_id,
+            GatewayVirtualModel.enabled == True
+        )
+        models_result = await session.execute(models_stmt)
+        virtual_models = {m.name: m for m in models_result.scalars().all()}
+
+    return RoutingEngine(
+        routes=routes,
+        upstreams=upstreams,
+        virtual_models=virtual_models,
+        circuit_breakers=get_circuit_breaker_registry()
+    )
+
+
+async def get_routing_engine_for_tenant(db: AsyncSession, tenant_id: UUID) -> RoutingEngine:
+    """Return the tenant's routing engine, rebuilding it if its version moved or it expired."""
+    version = await get_routing_version(db, tenant_id)
+
+    cached = _engines.get(tenant_id)
+    if cached is not None and cached[0] == version and cached[1] > time.monotonic():
+        return cached[2]
+
+    # The version is read before the data, so the engine is at least as new
+    # as the version it is cached under
+    engine = await _build_routing_engine(tenant_id)
+    _engines[tenant_id] = (version, time.monotonic() + ROUTING_CACHE_TTL_SECONDS, engine)
+    return engine
@@ -8,8 +8,11 @@ Uses Fernet symmetric encryption (AES-128-CBC with HMAC-SHA256).
 """
 
 import base64
+import hashlib
 import os
-from typing import Optional
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
 
 from cryptography.fernet import Fernet, InvalidToken
 
@@ -26,6 +29,12 @@ class SecretManager:
     Secrets are encrypted using Fernet (AES-128-CBC with HMAC-SHA256).
     The encryption key is loaded from environment variable GATEWAY_SECRET_ENCRYPTION_KEY.
 
+    The key is used directly (no password KDF) and parsed once by the
+    singleton, so encrypt/decrypt of a credential takes microseconds and is
+    called inline from async handlers; offloading it to a thread would cost
+    more than the work itself. Keep it that way if a KDF is ever introduced:
+    derive the key once here, never per operation.
+
     Usage:
         manager = SecretManager()
         ciphertext = manager.encrypt("my-api-key")
@@ -35,6 +44,10 @@ class SecretManager:
     _instance: Optional["SecretManager"] = None
     ENV_KEY_NAME = "GATEWAY_SECRET_ENCRYPTION_KEY"
 
+    # Recently decrypted values, keyed by a digest of the ciphertext
+    DECRYPT_CACHE_MAX_SIZE = 1024
+    DECRYPT_CACHE_TTL_SECONDS = 300
+
     def __new__(cls) -> "SecretManager":
         """Singleton pattern for secret manager."""
         if cls._instance is None:
@@ -71,6 +84,7 @@ class SecretManager:
                 pass
 
             self._fernet = Fernet(key.encode())
+            self._decrypt_cache: "OrderedDict[bytes, Tuple[str, float]]" = OrderedDict()
             self._initialized = True
         except Exception as e:
             raise SecretManagerError(f"Invalid encryption key format: {e}")
@@ -115,6 +129,33 @@ class SecretManager:
         except Exception as e:
             raise SecretManagerError(f"Decryption failed: {e}")
 
+    def decrypt_cached(self, ciphertext: str) -> str:
+        """
+        Decrypt a ciphertext, reusing the result of a recent decryption.
+
+        Entries are keyed by a BLAKE2b digest of the ciphertext itself, so a
+        rotated credential (new ciphertext) can never be served stale.
+
+        Raises:
+            SecretManagerError: If decryption fails
+        """
+        cache_key = hashlib.blake2b(ciphertext.encode(), digest_size=16).digest()
+        now = time.monotonic()
+
+        cached = self._decrypt_cache.get(cache_key)
+        if cached is not None:
+            plaintext, expires_at = cached
+            if expires_at > now:
+                self._decrypt_cache.move_to_end(cache_key)
+                return plaintext
+            del self._decrypt_cache[cache_key]
+
+        plaintext = self.decrypt(ciphertext)
+        self._decrypt_cache[cache_key] = (plaintext, now + self.DECRYPT_CACHE_TTL_SECONDS)
+        if len(self._decrypt_cache) > self.DECRYPT_CACHE_MAX_SIZE:
+            self._decrypt_cache.popitem(last=False)
+        return plaintext
+
     @classmethod
     def generate_key(cls) -> str:
         """
@@ -0,0 +1,122 @@
+"""
+Upstream HTTP Clients.
+
+This module keeps long-lived httpx clients for talking to upstreams, so
+requests reuse pooled keep-alive connections instead of paying a TCP and
+TLS handshake each time.
+
+Proxied traffic goes through SSRF-protected clients. Their transport
+carries the upstream's allowlists and pins connections to validated
+addresses, so there is one client per upstream rather than a single shared
+one: a pooled connection is never reused for another upstream's hostname.
+Timeouts are passed per request.
+
+A client is replaced when its upstream's allowlists change and dropped when
+the upstream is updated or deleted (evict_upstream_client). Replaced
+clients may still carry in-flight requests, so they are closed after a
+grace period instead of immediately.
+"""
+
+import asyncio
+from typing import Dict, Optional, Set, Tuple
+from uuid import UUID
+
+import httpx
+
+from app.gateway.middleware.ssrf_guard import create_ssrf_protected_client
+from app.models.gateway import GatewayUpstream
+
+
+UPSTREAM_POOL_LIMITS = httpx.Limits(max_connections=200, max_keepalive_connections=100)
+HEALTH_CHECK_TIMEOUT_SECONDS = 10.0
+RETIRED_CLIENT_GRACE_SECONDS = 600.0
+
+_Allowlists = Tuple[Optional[Tuple[str, ...]], Optional[Tuple[str, ...]]]
+
+# upstream_id -> (allowlists the client was built with, client)
+_upstream_clients: Dict[UUID, Tuple[_Allowlists, httpx.AsyncClient]] = {}
+_retired_clients: Set[httpx.AsyncClient] = set()
+_retire_tasks: Set[asyncio.Task] = set()
+_health_check_client: Optional[httpx.AsyncClient] = None
+
+
+def get_upstream_client(upstream: GatewayUpstream) -> httpx.AsyncClient:
+    """Get the pooled SSRF-protected client for an upstream."""
+    allowlists = (
+        tuple(upstream.allow_hosts) if upstream.allow_hosts is not None else None,
+        tuple(upstream.allow_cidrs) if upstream.allow_cidrs is not None else None,
+    )
+    cached = _upstream_clients.get(upstream.id)
+    if cached is not None:
+        if cached[0] == allowlists and not cached[1].is_closed:
+            return cached[1]
+        _retire_client(cached[1])
+
+    client = create_ssrf_protected_client(
+        allow_hosts=upstream.allow_hosts,
+        allow_cidrs=upstream.allow_cidrs,
+        limits=UPSTREAM_POOL_LIMITS
+    )
+    _upstream_clients[upstream.id] = (allowlists, client)
+    return client
+
+
+def evict_upstream_client(upstream_id: UUID) -> None:
+    """Drop the pooled client of an updated or deleted upstream."""
+    cached = _upstream_clients.pop(upstream_id, None)
+    if cached is not None:
+        _retire_client(cached[1])
+
+
+def _retire_client(client: httpx.AsyncClient) -> None:
+    """Close a client that is no longer handed out, once in-flight requests had time to finish."""
+    if client.is_closed or client in _retired_clients:
+        return
+
+    _retired_clients.add(client)
+    task = asyncio.get_running_loop().create_task(_close_after_grace(client))
+    _retire_tasks.add(task)
+    task.add_done_callback(_retire_tasks.discard)
+
+
+async def _close_after_grace(client: httpx.AsyncClient) -> None:
+    try:
+        await asyncio.sleep(RETIRED_CLIENT_GRACE_SECONDS)
+    finally:
+        _retired_clients.discard(client)
+        if not client.is_closed:
+            await client.aclose()
+
+
+def get_health_check_client() -> httpx.AsyncClient:
+    """Get the shared client used by upstream connectivity tests."""
+    global _health_check_client
+    if _health_check_client is None or _health_check_client.is_closed:
+        _health_check_client = httpx.AsyncClient(
+            limits=UPSTREAM_POOL_LIMITS,
+            timeout=httpx.Timeout(HEALTH_CHECK_TIMEOUT_SECONDS)
+        )
+    return _health_check_client
+
+
+async def close_upstream_clients() -> None:
+    """Close all pooled upstream clients, including retired ones."""
+    global _health_check_client
+    clients = [client for _, client in _upstream_clients.values()]
+    _upstream_clients.clear()
+
+    # Skip the grace period of retired clients and close them right away
+    retire_tasks = list(_retire_tasks)
+    for task in retire_tasks:
+        task.cancel()
+    await asyncio.gather(*retire_tasks, return_exceptions=True)
+    clients.extend(_retired_clients)
+    _retired_clients.clear()
+
+    if _health_check_client is not None:
+        clients.append(_health_check_client)
+        _health_check_client = None
+
+    for client in clients:
+        if not client.is_closed:
+            await client.aclose()
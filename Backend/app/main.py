@@ -189,6 +189,11 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         redis_enabled=settings.redis.enabled,
         cors_origins=settings.app.cors_origins_list,
     )
+    if not settings.security.api_key_pepper:
+        logger.warning(
+            "API_KEY_PEPPER is not set; gateway API key hashes are peppered with "
+            "SECRET_KEY, so rotating SECRET_KEY will invalidate every gateway API key"
+        )
 
     yield
 
@@ -210,6 +215,27 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     except Exception as e:
         logger.warning("Failed to close Redis pool", error=str(e))
 
+    # Write buffered gateway API key usage timestamps
+    try:
+        from app.gateway.middleware.auth import stop_last_used_flusher
+        await stop_last_used_flusher()
+    except Exception as e:
+        logger.warning("Failed to flush API key usage timestamps", error=str(e))
+
+    # Write buffered gateway request rollups
+    try:
+        from app.gateway.services.request_rollup import stop_rollup_flusher
+        await stop_rollup_flusher()
+    except Exception as e:
+        logger.warning("Failed to flush gateway request rollups", error=str(e))
+
+    # Close pooled gateway upstream connections
+    try:
+        from app.gateway.services.upstream_clients import close_upstream_clients
+        await close_upstream_clients()
+    except Exception as e:
+        logger.warning("Failed to close upstream HTTP clients", error=str(e))
+
     await close_db()
 
 
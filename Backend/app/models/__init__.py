@@ -64,6 +64,8 @@ from app.models.gateway import (
     GatewayRoute,
     GatewayAPIKey,
     GatewayRequest,
+    GatewayRequestRollup,
+    GatewayTenantConfig,
     # Gateway enums
     UpstreamType,
     AuthType,
@@ -152,6 +154,8 @@ __all__ = [
     "GatewayRoute",
     "GatewayAPIKey",
     "GatewayRequest",
+    "GatewayRequestRollup",
+    "GatewayTenantConfig",
     # Gateway enums
     "UpstreamType",
     "LogPayloadMode",
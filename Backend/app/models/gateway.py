@@ -8,6 +8,7 @@ This module contains all database models for the AI Gateway / Model Forwarding s
 - GatewayRoute: Routing policies
 - GatewayAPIKey: External API keys
 - GatewayRequest: Request logs for observability
+- GatewayRequestRollup: Hourly request aggregates for dashboards
 
 Reference documentation:
 - Architecture: /Docs/gateway-architecture.md
@@ -23,6 +24,7 @@ from typing import Any, Dict, List, Optional
 
 from sqlalchemy import (
     ARRAY,
+    BigInteger,
     Boolean,
     Column,
     DateTime,
@@ -150,6 +152,9 @@ class GatewayUpstream(Base):
         Index("ix_gateway_upstreams_type", "type"),
         Index("ix_gateway_upstreams_enabled", "enabled"),
         Index("ix_gateway_upstreams_deployment_id", "deployment_id"),
+        Index("ix_gateway_upstreams_tenant_created", "tenant_id", "created_at"),
+        # ix_gateway_upstreams_name_trgm (GIN, gin_trgm_ops) is created by
+        # migration 20260121_0001 only, since it needs the pg_trgm extension
         UniqueConstraint("tenant_id", "name", name="uq_gateway_upstreams_tenant_name"),
     )
 
@@ -371,7 +376,7 @@ class GatewayAPIKey(Base):
     __tablename__ = "gateway_api_keys"
     __table_args__ = (
         Index("ix_gateway_api_keys_tenant_id", "tenant_id"),
-        Index("ix_gateway_api_keys_key_prefix", "key_prefix"),
+        Index("ix_gateway_api_keys_prefix", "key_prefix", unique=True),
         Index("ix_gateway_api_keys_enabled", "enabled"),
         Index("ix_gateway_api_keys_user_id", "user_id"),
         UniqueConstraint("tenant_id", "name", name="uq_gateway_api_keys_tenant_name"),
@@ -383,9 +388,10 @@ class GatewayAPIKey(Base):
     name = Column(String(255), nullable=False)
     description = Column(String(1000))
 
-    # Key storage (bcrypt hash, only prefix shown to users)
+    # Key storage (hash only, only prefix shown to users)
     key_prefix = Column(String(12), nullable=False)  # e.g., "sk-abc123"
-    key_hash = Column(String(255), nullable=False)   # bcrypt hash
+    key_hash = Column(String(255), nullable=False)   # bcrypt or HMAC-SHA256 hash
+    hash_version = Column(Integer, default=1, server_default="1", nullable=False)  # 1=bcrypt, 2=HMAC-SHA256
 
     # Access control
     allowed_models = Column(ARRAY(String), default=list)
@@ -451,7 +457,22 @@ class GatewayRequest(Base):
         Index("ix_gateway_requests_status_code", "status_code"),
         Index("ix_gateway_requests_error_type", "error_type"),
         Index("ix_gateway_requests_created_at", "created_at"),
-        Index("ix_gateway_requests_tenant_created", "tenant_id", "created_at"),
+        # Covers the columns aggregated over a tenant's time range, so such
+        # scans can be index-only
+        Index(
+            "ix_gateway_requests_tenant_created_cover",
+            "tenant_id",
+            "created_at",
+            postgresql_include=[
+                "latency_ms",
+                "total_tokens",
+                "cost_usd",
+                "virtual_model",
+                "upstream_id",
+                "error_type",
+                "status_code",
+            ],
+        ),
     )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -508,3 +529,69 @@ class GatewayRequest(Base):
 
     def __repr__(self):
         return f"<GatewayRequest(id={self.id}, request_id={self.request_id}, endpoint={self.endpoint})>"
+
+
+class GatewayRequestRollup(Base):
+    """
+    Hourly aggregate of gateway requests.
+
+    One row per (tenant, hour, virtual model, upstream), incremented by the
+    gateway as requests are logged. Dashboards read these rows instead of
+    scanning gateway_requests, so their cost depends on the number of
+    buckets rather than the number of requests.
+
+    Missing dimensions use sentinels so they can be part of the primary key:
+    "" for no virtual model and the nil UUID for no upstream.
+
+    latency_histogram holds request counts per latency bucket, where bucket
+    i covers [2^(i/8) - 1, 2^((i+1)/8) - 1) milliseconds (the last bucket is
+    open-ended). Histograms are merged element-wise with the
+    gateway_int_array_sum aggregate.
+    """
+
+    __tablename__ = "gateway_request_rollups"
+    __table_args__ = (
+        Index("ix_gateway_request_rollups_tenant_bucket", "tenant_id", "bucket_start"),
+    )
+
+    tenant_id = Column(UUID(as_uuid=True), primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    virtual_model = Column(String(500), primary_key=True, default="")
+    upstream_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.UUID(int=0))
+
+    request_count = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+
+    # Latency (only requests that recorded one)
+    latency_count = Column(Integer, nullable=False, default=0)
+    latency_sum_ms = Column(Numeric(precision=20, scale=0), nullable=False, default=0)
+    latency_histogram = Column(ARRAY(Integer), nullable=False, default=list)
+
+    total_tokens = Column(Numeric(precision=20, scale=0), nullable=False, default=0)
+    cost_usd = Column(Numeric(precision=16, scale=8), nullable=False, default=0)
+
+    def __repr__(self):
+        return (
+            f"<GatewayRequestRollup(tenant_id={self.tenant_id}, bucket_start={self.bucket_start}, "
+            f"virtual_model={self.virtual_model})>"
+        )
+
+
+class GatewayTenantConfig(Base):
+    """
+    Per-tenant gateway state.
+
+    routing_version is bumped in the same transaction as every change to the
+    tenant's routing inputs (upstreams, routes, virtual models), so gateway
+    workers can keep a built routing engine until the version moves.
+    """
+
+    __tablename__ = "gateway_tenant_configs"
+
+    tenant_id = Column(UUID(as_uuid=True), primary_key=True)
+    routing_version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(),
+                        onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<GatewayTenantConfig(tenant_id={self.tenant_id}, routing_version={self.routing_version})>"
@@ -0,0 +1,8 @@
+"""Shared pytest configuration."""
+
+import os
+
+# Settings are validated at import time; provide throwaway secrets so the
+# app modules can be imported without a .env file
+os.environ.setdefault("SECRET_KEY", "test-secret-key-0123456789abcdefghijklmnop")
+os.environ.setdefault("CREDENTIAL_MASTER_KEY", "test-master-key-0123456789abcdefghijklmnop")
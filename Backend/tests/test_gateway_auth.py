@@ -0,0 +1,112 @@
+"""Tests for gateway API key hashing and the bcrypt to HMAC upgrade."""
+
+import uuid
+from types import SimpleNamespace
+
+import bcrypt
+import pytest
+
+from app.gateway.middleware.auth import (
+    APIKeyGenerator,
+    AuthenticationError,
+    GatewayAuthenticator,
+)
+from app.models.gateway import GatewayAPIKey
+
+
+class FakeSession:
+    """Records executed statements instead of talking to a database."""
+
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+
+    async def commit(self):
+        self.commits += 1
+
+
+def _key_record(api_key, key_hash, hash_version):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        tenant_id=uuid.uuid4(),
+        user_id=uuid.uuid4(),
+        key_prefix=APIKeyGenerator.get_prefix(api_key),
+        key_hash=key_hash,
+        hash_version=hash_version,
+        enabled=True,
+        expires_at=None,
+        allowed_models=None,
+        allowed_endpoints=None,
+        rate_limit=None,
+        quota=None,
+        log_payload_mode=None,
+    )
+
+
+def _authenticator(monkeypatch, record):
+    db = FakeSession()
+    authenticator = GatewayAuthenticator(db)
+
+    async def lookup_key(prefix):
+        return record if prefix == record.key_prefix else None
+
+    monkeypatch.setattr(authenticator, "_lookup_key", lookup_key)
+    monkeypatch.setattr(authenticator, "_update_last_used", lambda key_id: None)
+    return authenticator, db
+
+
+def test_generated_keys_use_hmac():
+    full_key, _, key_hash = APIKeyGenerator.generate()
+
+    assert key_hash == APIKeyGenerator.hash_key(full_key)
+    assert APIKeyGenerator.verify(full_key, key_hash, APIKeyGenerator.HASH_VERSION_HMAC)
+    assert not APIKeyGenerator.verify(full_key + "x", key_hash, APIKeyGenerator.HASH_VERSION_HMAC)
+
+
+async def test_bcrypt_key_is_upgraded_to_hmac(monkeypatch):
+    api_key, _, _ = APIKeyGenerator.generate()
+    bcrypt_hash = bcrypt.hashpw(api_key.encode(), bcrypt.gensalt(rounds=4)).decode()
+    record = _key_record(api_key, bcrypt_hash, APIKeyGenerator.HASH_VERSION_BCRYPT)
+    authenticator, db = _authenticator(monkeypatch, record)
+
+    ctx = await authenticator.authenticate(f"Bearer {api_key}", "/v1/chat/completions")
+
+    assert ctx.api_key_id == record.id
+    assert db.commits == 1
+    (stmt,) = db.statements
+    assert stmt.table.name == GatewayAPIKey.__tablename__
+    params = stmt.compile().params
+    assert params["key_hash"] == APIKeyGenerator.hash_key(api_key)
+    assert params["hash_version"] == APIKeyGenerator.HASH_VERSION_HMAC
+
+    # The upgraded hash verifies on the HMAC path
+    assert APIKeyGenerator.verify(api_key, params["key_hash"], APIKeyGenerator.HASH_VERSION_HMAC)
+
+
+async def test_wrong_key_against_bcrypt_hash_is_not_upgraded(monkeypatch):
+    api_key, _, _ = APIKeyGenerator.generate()
+    bcrypt_hash = bcrypt.hashpw(api_key.encode(), bcrypt.gensalt(rounds=4)).decode()
+    wrong_key = api_key[:-1] + ("0" if api_key[-1] != "0" else "1")
+    record = _key_record(api_key, bcrypt_hash, APIKeyGenerator.HASH_VERSION_BCRYPT)
+    authenticator, db = _authenticator(monkeypatch, record)
+
+    with pytest.raises(AuthenticationError) as exc_info:
+        await authenticator.authenticate(f"Bearer {wrong_key}", "/v1/chat/completions")
+
+    assert exc_info.value.status_code == 401
+    assert db.statements == []
+    assert db.commits == 0
+
+
+async def test_hmac_key_is_not_rehashed(monkeypatch):
+    api_key, _, key_hash = APIKeyGenerator.generate()
+    record = _key_record(api_key, key_hash, APIKeyGenerator.HASH_VERSION_HMAC)
+    authenticator, db = _authenticator(monkeypatch, record)
+
+    await authenticator.authenticate(f"Bearer {api_key}", "/v1/chat/completions")
+
+    assert db.statements == []
+    assert db.commits == 0
@@ -0,0 +1,23 @@
+"""Tests for lazily decoded passthrough response bodies."""
+
+import pytest
+
+from app.gateway.adapters.base import AdapterError, LazyJSONBody
+
+
+def test_fields_are_decoded_on_access():
+    body = LazyJSONBody(b'{"id": "x", "usage": {"total_tokens": 3}}')
+
+    assert body.get("usage") == {"total_tokens": 3}
+    assert body.get("missing", {}) == {}
+    assert dict(body) == {"id": "x", "usage": {"total_tokens": 3}}
+
+
+def test_malformed_body_raises_parse_error():
+    body = LazyJSONBody(b'{"id": "x", "usage": {"total_')
+
+    with pytest.raises(AdapterError) as exc_info:
+        body.get("usage", {})
+
+    assert exc_info.value.status_code == 502
+    assert exc_info.value.error_type == "parse_error"
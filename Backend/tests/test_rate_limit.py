@@ -0,0 +1,123 @@
+"""Tests for the rate limiter's in-process admission of minute windows."""
+
+import uuid
+
+from app.gateway.middleware.rate_limit import RateLimitConfig, RateLimiter
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.increments = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def zadd(self, key, mapping):
+        (member,) = mapping
+        self.increments.append((key, int(member.rsplit(":", 1)[1])))
+
+    def incrby(self, key, amount):
+        pass
+
+    def expire(self, key, seconds):
+        pass
+
+    async def execute(self):
+        for key, amount in self.increments:
+            self.redis.totals[key] = self.redis.totals.get(key, 0) + amount
+
+
+class FakeRedis:
+    """
+    Window totals in a dict, with evalsha following _CHECK_MULTI_LUA.
+
+    Each window is denied when stored total + pending + increment exceeds
+    its limit; otherwise every window is incremented and the totals
+    (including pending) are returned.
+    """
+
+    def __init__(self):
+        self.totals = {}
+        self.pending_seen = []
+
+    async def script_load(self, script):
+        return "sha"
+
+    async def evalsha(self, sha, numkeys, *keys_and_args):
+        keys = keys_and_args[:numkeys]
+        args = keys_and_args[numkeys:]
+        now = args[0]
+        windows = [args[i:i + 5] for i in range(2, len(args), 5)]
+
+        totals = []
+        for index, (key, (limit, window, increment, reset, pending)) in enumerate(
+            zip(keys, windows), start=1
+        ):
+            self.pending_seen.append(pending)
+            current = self.totals.get(key, 0) + pending
+            if current + increment > limit:
+                return [index, 0, current, limit, now + window]
+            totals.append(current + increment)
+
+        for key, (_, _, increment, _, _) in zip(keys, windows):
+            self.totals[key] = self.totals.get(key, 0) + increment
+        return [0, 1, 0, 0, now + 60, *totals]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+async def _admit(limiter, api_key_id, tenant_id, config, attempts, flush_every=None):
+    admitted = 0
+    for attempt in range(1, attempts + 1):
+        result = await limiter.check_rate_limit(api_key_id, tenant_id, config)
+        admitted += result.allowed
+        if flush_every and attempt % flush_every == 0:
+            await limiter.flush_local_counts()
+    return admitted
+
+
+async def test_local_admission_never_exceeds_limit_in_one_process():
+    redis = FakeRedis()
+    limiter = RateLimiter(redis, local_admission=True)
+    config = RateLimitConfig(requests_per_minute=10)
+
+    try:
+        admitted = await _admit(limiter, uuid.uuid4(), uuid.uuid4(), config, attempts=30)
+    finally:
+        await limiter.stop_local_flusher()
+
+    assert admitted == 10
+    # Some requests skipped Redis, and their amounts reached Redis later
+    assert any(pending > 0 for pending in redis.pending_seen)
+    assert sum(redis.totals.values()) == 10
+
+
+async def test_local_admission_bound_holds_across_flushes():
+    redis = FakeRedis()
+    limiter = RateLimiter(redis, local_admission=True)
+    config = RateLimitConfig(requests_per_minute=10)
+
+    try:
+        admitted = await _admit(
+            limiter, uuid.uuid4(), uuid.uuid4(), config, attempts=30, flush_every=2
+        )
+    finally:
+        await limiter.stop_local_flusher()
+
+    assert admitted == 10
+
+
+async def test_local_admission_is_off_by_default():
+    redis = FakeRedis()
+    limiter = RateLimiter(redis)
+    config = RateLimitConfig(requests_per_minute=10)
+
+    admitted = await _admit(limiter, uuid.uuid4(), uuid.uuid4(), config, attempts=15)
+
+    assert admitted == 10
+    assert redis.pending_seen == [0] * 15
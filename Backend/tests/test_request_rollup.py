@@ -0,0 +1,69 @@
+"""Tests for the latency histogram used by the request rollups."""
+
+import math
+
+import pytest
+
+from app.gateway.services.request_rollup import (
+    LATENCY_BUCKETS,
+    LATENCY_BUCKETS_PER_DOUBLING,
+    histogram_percentile,
+    latency_bucket,
+)
+
+
+def _histogram(*latencies_ms):
+    histogram = [0] * LATENCY_BUCKETS
+    for latency_ms in latencies_ms:
+        histogram[latency_bucket(latency_ms)] += 1
+    return histogram
+
+
+@pytest.mark.parametrize("latency_ms", [-5, 0])
+def test_latency_bucket_non_positive_is_first_bucket(latency_ms):
+    assert latency_bucket(latency_ms) == 0
+
+
+def test_latency_bucket_one_doubling_per_eight_buckets():
+    assert latency_bucket(1) == LATENCY_BUCKETS_PER_DOUBLING
+    assert latency_bucket(3) == 2 * LATENCY_BUCKETS_PER_DOUBLING
+    assert latency_bucket(1023) == 10 * LATENCY_BUCKETS_PER_DOUBLING
+
+
+def test_latency_bucket_edges():
+    # Bucket i starts at 2**(i/8) - 1 ms
+    for index in range(1, LATENCY_BUCKETS):
+        edge = math.ceil(2 ** (index / LATENCY_BUCKETS_PER_DOUBLING) - 1)
+        assert latency_bucket(edge) >= index
+        assert latency_bucket(edge - 1) < index
+
+
+def test_latency_bucket_is_clamped_to_last_bucket():
+    assert latency_bucket(2 ** 20) == LATENCY_BUCKETS - 1
+    assert latency_bucket(10 ** 12) == LATENCY_BUCKETS - 1
+
+
+@pytest.mark.parametrize("histogram", [[], [0] * LATENCY_BUCKETS])
+def test_percentile_of_empty_histogram_is_zero(histogram):
+    assert histogram_percentile(histogram, 0.95) == 0.0
+
+
+def test_percentile_of_single_sample_is_within_five_percent():
+    for latency_ms in (100, 250, 1_000, 30_000):
+        estimate = histogram_percentile(_histogram(latency_ms), 0.95)
+        assert estimate == pytest.approx(latency_ms, rel=0.05)
+
+
+def test_percentile_picks_bucket_reaching_the_quantile():
+    histogram = _histogram(*([10] * 95), *([1_000] * 5))
+
+    assert histogram_percentile(histogram, 0.5) == pytest.approx(10, rel=0.1)
+    assert histogram_percentile(histogram, 0.95) == pytest.approx(10, rel=0.1)
+    assert histogram_percentile(histogram, 0.96) == pytest.approx(1_000, rel=0.05)
+    assert histogram_percentile(histogram, 1.0) == pytest.approx(1_000, rel=0.05)
+
+
+def test_percentile_at_zero_skips_leading_empty_buckets():
+    histogram = _histogram(500)
+
+    assert histogram_percentile(histogram, 0.0) == pytest.approx(500, rel=0.05)
@@ -0,0 +1,56 @@
+"""Tests for address pinning in the SSRF-protected transport."""
+
+import httpx
+import pytest
+
+from app.gateway.middleware.ssrf_guard import SSRFProtectedTransport
+
+
+class FakeGuard:
+    def __init__(self, resolved_ips):
+        self.resolved_ips = resolved_ips
+
+    async def _validate_url(self, url, allow_hosts, allow_networks):
+        return url, self.resolved_ips
+
+
+def _transport(monkeypatch, resolved_ips, unreachable):
+    attempts = []
+
+    async def handle_async_request(self, request):
+        attempts.append((request.url.host, request.headers["Host"], request.extensions.get("sni_hostname")))
+        if request.url.host in unreachable:
+            raise httpx.ConnectError("unreachable", request=request)
+        return httpx.Response(200, request=request)
+
+    monkeypatch.setattr(httpx.AsyncHTTPTransport, "handle_async_request", handle_async_request)
+    return SSRFProtectedTransport(FakeGuard(resolved_ips)), attempts
+
+
+async def test_unreachable_address_falls_back_to_the_next(monkeypatch):
+    transport, attempts = _transport(
+        monkeypatch, ["2001:db8::1", "192.0.2.10"], unreachable={"2001:db8::1"}
+    )
+
+    response = await transport.handle_async_request(
+        httpx.Request("GET", "https://api.example.com/v1/models")
+    )
+
+    assert response.status_code == 200
+    assert attempts == [
+        ("2001:db8::1", "api.example.com", "api.example.com"),
+        ("192.0.2.10", "api.example.com", "api.example.com"),
+    ]
+
+
+async def test_last_connect_error_is_raised(monkeypatch):
+    transport, attempts = _transport(
+        monkeypatch, ["192.0.2.10", "192.0.2.11"], unreachable={"192.0.2.10", "192.0.2.11"}
+    )
+
+    with pytest.raises(httpx.ConnectError):
+        await transport.handle_async_request(
+            httpx.Request("GET", "http://api.example.com/v1/models")
+        )
+
+    assert [host for host, _, _ in attempts] == ["192.0.2.10", "192.0.2.11"]
@@ -0,0 +1,49 @@
+"""Tests for request and trace ID generation."""
+
+import os
+import re
+
+import pytest
+
+from app.gateway.middleware import trace
+from app.gateway.middleware.trace import generate_request_id, generate_trace_id
+
+
+def test_id_formats():
+    assert re.fullmatch(r"req_[0-9a-f]{24}", generate_request_id())
+    assert re.fullmatch(r"[0-9a-f]{32}", generate_trace_id())
+
+
+def test_request_ids_sort_by_creation_time():
+    first = generate_request_id()
+    second = generate_request_id()
+
+    assert first[4:16] <= second[4:16]
+
+
+def test_ids_stay_unique_across_buffer_refills():
+    # Enough IDs to wrap the entropy buffer several times
+    count = 4 * trace._ENTROPY_BUFFER_SIZE // 16
+    trace_ids = {generate_trace_id() for _ in range(count)}
+
+    assert len(trace_ids) == count
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_forked_child_does_not_repeat_parent_ids():
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        os.write(write_fd, generate_trace_id().encode())
+        os.close(write_fd)
+        os._exit(0)
+
+    os.close(write_fd)
+    parent_id = generate_trace_id()
+    with os.fdopen(read_fd, "rb") as pipe:
+        child_id = pipe.read().decode()
+    os.waitpid(pid, 0)
+
+    assert len(child_id) == 32
+    assert child_id != parent_id